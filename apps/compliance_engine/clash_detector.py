@@ -2,81 +2,463 @@
 import ifcopenshell
 import ifcopenshell.geom
 import json
-from typing import List, Dict, Tuple
-from io import BytesIO
+import logging
+import multiprocessing
+import time
+from typing import List, Dict, Tuple, Union
 import numpy as np
+from .mesh_distance import mesh_distance
+from .geometry_store import geometry_hash
+from .clash_grouping import clash_location, group_clashes
+
+logger = logging.getLogger(__name__)
 
 class AdvancedClashDetector:
-    def __init__(self, tolerance_hard: float = 0.01, tolerance_soft: float = 0.05):
+    DEFAULT_CLASH_SETS = [
+        {'group_a': 'IfcWall', 'group_b': 'IfcDuctSegment'},
+        {'group_a': 'IfcBeam', 'group_b': 'IfcPipeSegment'}
+    ]
+    
+    def __init__(self, tolerance_hard: float = 0.01, tolerance_soft: float = 0.05, workers: int = None,
+                 geometry_store=None, progress=None, group_radius: float = 0.5):
         self.tolerance_hard = tolerance_hard
         self.tolerance_soft = tolerance_soft
+        self.group_radius = group_radius  # Clashes of one family this close share a clash group
+        self.workers = workers or multiprocessing.cpu_count()
+        self.geometry_store = geometry_store  # Optional GeometryStore shared across runs
+        self.progress = progress  # Optional callback(phase, fraction) for long-running callers
         self.settings = ifcopenshell.geom.settings()
-        self.settings.set(self.settings.INCLUDE_CURVES, True)
-        self.settings.set(self.settings.USE_PYTHON_OPENCASCADE, True)
+        # Triangulated meshes in world coordinates so bboxes and distances are comparable across elements
+        self.settings.set("use-world-coords", True)
         self.results = {}  # For engine integration
+        self.geometry = {}  # GlobalId -> {'verts', 'faces', 'bbox'}, tessellated once per model
+        self._geometry_file = None
+        self.failed_elements = []  # Elements whose geometry could not be tessellated
+        self.timings = {}  # Phase -> wall time in ms for the current run
+    
+    def detect_clashes(self, ifc_model: Union[ifcopenshell.file, str], clash_sets: List[Dict[str, str]] = None, soft_clearance: bool = True,
+                       content_hash: str = None, baseline: Dict = None) -> Dict:
+        """
+        Run every clash set against the model.
+        
+        ifc_model is a parsed ifcopenshell.file (preferred, so callers that
+        already parsed the model do not pay for a second parse) or IFC text.
+        
+        baseline is an optional {'content_hash', 'clash_results'} pair from the
+        previous revision's check. When its settings match this run and its
+        geometry sidecar is available, only pairs involving added or modified
+        elements are re-tested and the remaining clashes are carried over.
+        """
+        ifc_file = ifcopenshell.file.from_string(ifc_model) if isinstance(ifc_model, str) else ifc_model
+        self.timings = {}
+        
+        clash_sets = clash_sets or self.DEFAULT_CLASH_SETS
+        
+        element_bboxes = self.prepare_geometry(ifc_file, clash_sets, content_hash)
+        run_settings = {
+            'tolerance_hard': self.tolerance_hard, 'tolerance_soft': self.tolerance_soft,
+            'soft_clearance': soft_clearance, 'clash_sets': clash_sets
+        }
+        clashes = []
+        changed, incremental = None, None
+        if baseline:
+            started = time.perf_counter()
+            changed, carried, incremental = self._diff_baseline(ifc_file, baseline, run_settings)
+            clashes.extend(carried)
+            self._add_timing('baseline_diff', started)
+        
+        groups = [
+            (cs, self.group_records(ifc_file, cs['group_a'], element_bboxes),
+             self.group_records(ifc_file, cs['group_b'], element_bboxes))
+            for cs in clash_sets
+        ]
+        found, stats = self.run_clash_sets(groups, soft_clearance, changed=changed)
+        clashes.extend(found)
+        
+        started = time.perf_counter()
+        clash_groups = group_clashes(clashes, self.group_radius)
+        self._add_timing('grouping', started)
+        summary = self.build_summary(clashes, stats, len(self.failed_elements))
+        summary['groups'] = len(clash_groups)
+        
+        self.results = {
+            'clashes': clashes,
+            'groups': clash_groups,
+            'summary': summary,
+            'failed_elements': self.failed_elements,
+            'settings': run_settings, 'incremental': incremental,
+            'timings': {phase: round(ms, 3) for phase, ms in self.timings.items()}
+        }
+        
+        return self.results
     
-    def detect_clashes(self, ifc_string: str, clash_sets: List[Dict[str, str]] = None, soft_clearance: bool = True) -> Dict:
-        ifc_file = ifcopenshell.open(BytesIO(ifc_string.encode('utf-8')))
+    def prepare_geometry(self, ifc_file, clash_sets: List[Dict[str, str]], content_hash: str = None) -> Dict[str, Tuple]:
+        """Fill the geometry cache for every class in clash_sets and return GlobalId -> bbox."""
+        if ifc_file is not self._geometry_file:
+            self.geometry = {}
+            self.failed_elements = []
+            self._geometry_file = ifc_file
+            if self.geometry_store and content_hash:
+                stored = self.geometry_store.load(content_hash)
+                if stored:
+                    self.geometry, self.failed_elements = stored
         
-        if not clash_sets:
-            clash_sets = [
-                {'group_a': 'IfcWall', 'group_b': 'IfcDuctSegment'},
-                {'group_a': 'IfcBeam', 'group_b': 'IfcPipeSegment'}
-            ]
+        ifc_classes = {cs[key] for cs in clash_sets for key in ('group_a', 'group_b')}
+        cached_count = len(self.geometry)
+        self._report('tessellation', 0.0)
+        started = time.perf_counter()
+        element_bboxes = self._tessellate(ifc_file, ifc_classes)
+        if self.geometry_store and content_hash and len(self.geometry) > cached_count:
+            self.geometry_store.save(content_hash, self.geometry, self.failed_elements)
+        self._add_timing('tessellation', started)
+        self._report('tessellation', 1.0)
+        return element_bboxes
+    
+    def load_geometry(self, content_hash: str) -> bool:
+        """Serve the cache from the stored sidecar only, e.g. on a worker without the IFC."""
+        stored = self.geometry_store.load(content_hash) if self.geometry_store else None
+        if stored is None:
+            return False
+        self.geometry, self.failed_elements = stored
+        self._geometry_file = None
+        return True
+    
+    @staticmethod
+    def group_records(ifc_file, ifc_class: str, element_bboxes: Dict) -> List[Tuple[str, str]]:
+        """(GlobalId, name) of every ifc_class element that has geometry."""
+        return [
+            (elem.GlobalId, elem.Name or 'Unnamed')
+            for elem in ifc_file.by_type(ifc_class) if elem.GlobalId in element_bboxes
+        ]
+    
+    def run_clash_sets(self, groups, soft_clearance: bool = True, changed=None,
+                       owns=None) -> Tuple[List[Dict], Dict]:
+        """
+        Broad and narrow phase over (clash_set, group_a, group_b) triples whose
+        records are (GlobalId, name) pairs with geometry already in the cache.
         
+        Works without the parsed IFC, so spatial cells can run on any worker
+        that can reach the geometry sidecar. Returns (clashes, pair stats).
+        owns, when given, is called with the bboxes of each candidate pair;
+        pairs it rejects belong to another spatial cell and are only counted
+        as pairs_skipped, so overlapping cells test every pair once.
+        """
         clashes = []
-        element_bboxes = self._get_all_bboxes(ifc_file)
+        soft_pairs_total = 0  # Pairs the soft check would face without any prefilter
+        soft_pairs_checked = 0  # Pairs that actually reached the narrow phase
+        pairs_skipped = 0  # Candidate pairs owned by another cell
+        # One broad phase per clash set covers both checks, so inflate by the larger tolerance
+        broad_tol = max(self.tolerance_hard, self.tolerance_soft) if soft_clearance else self.tolerance_hard
         
-        for cs in clash_sets:
-            group_a = ifc_file.by_type(cs['group_a'])
-            group_b = ifc_file.by_type(cs['group_b'])
+        for k, (cs, group_a, group_b) in enumerate(groups):
+            self._report('broad_phase', k / len(groups))
+            started = time.perf_counter()
+            bboxes_a = [self.geometry[gid]['bbox'] for gid, _ in group_a]
+            bboxes_b = [self.geometry[gid]['bbox'] for gid, _ in group_b]
+            candidates = self._candidate_pairs(
+                bboxes_a, bboxes_b, broad_tol,
+                changed_a=None if changed is None else [gid in changed for gid, _ in group_a],
+                changed_b=None if changed is None else [gid in changed for gid, _ in group_b],
+            )
+            seen = set()
+            self._add_timing('broad_phase', started)
+            self._report('narrow_phase', k / len(groups))
+            started = time.perf_counter()
+            if soft_clearance:
+                n_a, n_b = len(group_a), len(group_b)
+                soft_pairs_total += n_a * (n_a - 1) // 2 if cs['group_a'] == cs['group_b'] else n_a * n_b
             
-            for elem_a in group_a:
-                bbox_a = element_bboxes.get(elem_a.GlobalId)
-                for elem_b in group_b:
-                    bbox_b = element_bboxes.get(elem_b.GlobalId)
-                    if not bbox_a or not bbox_b:
+            for i, j in candidates:
+                (id_a, name_a), (id_b, name_b) = group_a[i], group_b[j]
+                bbox_a, bbox_b = bboxes_a[i], bboxes_b[j]
+                if cs['group_a'] == cs['group_b']:
+                    # Same-class clash sets see every pair twice and every element against itself
+                    if id_b < id_a:  # Report one orientation regardless of sweep order
+                        (id_a, name_a, bbox_a), (id_b, name_b, bbox_b) = (id_b, name_b, bbox_b), (id_a, name_a, bbox_a)
+                    if id_a == id_b or (id_a, id_b) in seen:
                         continue
-                    
-                    if self._aabb_overlap(bbox_a, bbox_b, self.tolerance_hard):
+                    seen.add((id_a, id_b))
+                if owns is not None and not owns(bbox_a, bbox_b):
+                    pairs_skipped += 1
+                    continue
+                
+                if self._aabb_overlap(bbox_a, bbox_b, self.tolerance_hard):
+                    clashes.append({
+                        'id_a': id_a, 'name_a': name_a, 'class_a': cs['group_a'],
+                        'id_b': id_b, 'name_b': name_b, 'class_b': cs['group_b'],
+                        'type': 'hard', 'severity': 'high', 'location': clash_location(bbox_a, bbox_b),
+                        'description': f'Overlap between {cs["group_a"]} and {cs["group_b"]}'
+                    })
+                
+                # Soft candidate stage: boxes further apart than tolerance_soft can never clash
+                if soft_clearance and self._aabb_overlap(bbox_a, bbox_b, self.tolerance_soft):
+                    soft_pairs_checked += 1
+                    dist = self._min_distance_between_meshes(id_a, id_b)
+                    if dist < self.tolerance_soft:
                         clashes.append({
-                            'id_a': elem_a.GlobalId, 'name_a': elem_a.Name or 'Unnamed',
-                            'id_b': elem_b.GlobalId, 'name_b': elem_b.Name or 'Unnamed',
-                            'type': 'hard', 'severity': 'high',
-                            'description': f'Overlap between {cs["group_a"]} and {cs["group_b"]}'
+                            'id_a': id_a, 'name_a': name_a, 'class_a': cs['group_a'],
+                            'id_b': id_b, 'name_b': name_b, 'class_b': cs['group_b'],
+                            'type': 'soft', 'distance': dist, 'location': clash_location(bbox_a, bbox_b),
+                            'severity': 'medium' if dist > self.tolerance_soft / 2 else 'high',
+                            'description': f'Clearance violation: {dist:.3f}m'
                         })
-                    
-                    if soft_clearance:
-                        dist = self._min_distance_between_meshes(elem_a, elem_b)
-                        if dist < self.tolerance_soft:
-                            clashes.append({
-                                'id_a': elem_a.GlobalId, 'name_a': elem_a.Name or 'Unnamed',
-                                'id_b': elem_b.GlobalId, 'name_b': elem_b.Name or 'Unnamed',
-                                'type': 'soft', 'distance': dist,
-                                'severity': 'medium' if dist > self.tolerance_soft / 2 else 'high',
-                                'description': f'Clearance violation: {dist:.3f}m'
-                            })
-        
-        summary = {
+            self._add_timing('narrow_phase', started)
+        
+        self._report('narrow_phase', 1.0)
+        return clashes, {'soft_pairs_total': soft_pairs_total, 'soft_pairs_checked': soft_pairs_checked,
+                         'pairs_skipped': pairs_skipped}
+    
+    def pair_distances(self, ifc_file, clash_sets: List[Dict[str, str]] = None, max_tolerance: float = 0.2,
+                       content_hash: str = None) -> Dict[str, np.ndarray]:
+        """
+        Box gap and exact mesh distance of every candidate pair within max_tolerance.
+        
+        A clash run at any tolerances up to max_tolerance is then a count over
+        this table: a pair is a hard clash at t when box_gap <= t and a soft
+        clash when distance < t (np.inf from max_tolerance on). set_index is
+        the pair's position in clash_sets.
+        
+        With a geometry store and content_hash the table is stored next to the
+        geometry sidecar and reused while it reaches max_tolerance, so sweeping
+        tolerances never repeats the narrow phase.
+        """
+        clash_sets = clash_sets or self.DEFAULT_CLASH_SETS
+        table = self.stored_pair_distances(content_hash, clash_sets, max_tolerance)
+        if table is not None:
+            return table
+        
+        self.timings = {}
+        element_bboxes = self.prepare_geometry(ifc_file, clash_sets, content_hash)
+        set_index, box_gaps, distances = [], [], []
+        for k, cs in enumerate(clash_sets):
+            self._report('narrow_phase', k / len(clash_sets))
+            started = time.perf_counter()
+            group_a = self.group_records(ifc_file, cs['group_a'], element_bboxes)
+            group_b = self.group_records(ifc_file, cs['group_b'], element_bboxes)
+            candidates = self._sweep_and_prune(
+                [element_bboxes[gid] for gid, _ in group_a], [element_bboxes[gid] for gid, _ in group_b], max_tolerance
+            )
+            self._add_timing('broad_phase', started)
+            started = time.perf_counter()
+            seen = set()
+            for i, j in candidates:
+                id_a, id_b = group_a[i][0], group_b[j][0]
+                if cs['group_a'] == cs['group_b']:
+                    # Same pair bookkeeping as run_clash_sets
+                    id_a, id_b = min(id_a, id_b), max(id_a, id_b)
+                    if id_a == id_b or (id_a, id_b) in seen:
+                        continue
+                    seen.add((id_a, id_b))
+                dist = mesh_distance(self.geometry[id_a], self.geometry[id_b], cutoff=max_tolerance)
+                set_index.append(k)
+                box_gaps.append(self._box_gap(element_bboxes[id_a], element_bboxes[id_b]))
+                distances.append(dist if dist < max_tolerance else np.inf)
+            self._add_timing('narrow_phase', started)
+        self._report('narrow_phase', 1.0)
+        
+        table = {
+            'set_index': np.asarray(set_index, dtype=np.int32),
+            'box_gap': np.asarray(box_gaps, dtype=np.float64),
+            'distance': np.asarray(distances, dtype=np.float64),
+            'max_tolerance': max_tolerance
+        }
+        if self.geometry_store and content_hash:
+            self.geometry_store.save_distances(content_hash, clash_sets, table)
+        return table
+    
+    def stored_pair_distances(self, content_hash: str, clash_sets: List[Dict[str, str]] = None,
+                              max_tolerance: float = 0.2) -> Dict[str, np.ndarray]:
+        """The stored pair_distances table if it reaches max_tolerance, else None; needs no IFC."""
+        if not (self.geometry_store and content_hash):
+            return None
+        table = self.geometry_store.load_distances(content_hash, clash_sets or self.DEFAULT_CLASH_SETS)
+        if table is None or table['max_tolerance'] < max_tolerance:
+            return None
+        return table
+    
+    def _report(self, phase: str, fraction: float):
+        if self.progress:
+            self.progress(phase, fraction)
+    
+    def _add_timing(self, phase: str, started: float):
+        """Accumulate wall time since started (a perf_counter value) into phase."""
+        self.timings[phase] = self.timings.get(phase, 0.0) + (time.perf_counter() - started) * 1000
+    
+    @staticmethod
+    def compact_results(results: Dict) -> Dict:
+        """
+        Results without the full clash list, as stored on a check; groups and
+        the summary stay, members live in ClashRecord rows.
+        """
+        return {key: value for key, value in results.items() if key != 'clashes'}
+    
+    @staticmethod
+    def build_summary(clashes: List[Dict], stats: Dict, failed_count: int) -> Dict:
+        soft_pairs_total, soft_pairs_checked = stats['soft_pairs_total'], stats['soft_pairs_checked']
+        return {
             'total_clashes': len(clashes),
             'hard_clashes': len([c for c in clashes if c['type'] == 'hard']),
-            'soft_clashes': len([c for c in clashes if c['type'] == 'soft'])
+            'soft_clashes': len([c for c in clashes if c['type'] == 'soft']),
+            'failed_elements': failed_count,
+            'soft_pairs_total': soft_pairs_total,
+            'soft_pairs_checked': soft_pairs_checked,
+            'soft_pruning_ratio': round(1 - soft_pairs_checked / soft_pairs_total, 4) if soft_pairs_total else 0.0
         }
-        self.results = {'clashes': clashes, 'summary': summary}
+    
+    def _diff_baseline(self, ifc_file, baseline: Dict, run_settings: Dict):
+        """
+        Compare the current model with a previous revision by GlobalId and geometry hash.
         
-        return self.results
+        Returns (changed GlobalIds, carried-over clashes, change record), or
+        (None, [], None) when the baseline cannot be reused and a full run is needed.
+        """
+        prev_results = baseline.get('clash_results') or {}
+        if prev_results.get('settings') != run_settings:
+            logger.info("Baseline clash settings differ; running full clash detection")
+            return None, [], None
+        prev_hashes = self.geometry_store.load_hashes(baseline['content_hash']) if self.geometry_store else None
+        if prev_hashes is None:
+            logger.info("Baseline geometry sidecar unavailable; running full clash detection")
+            return None, [], None
+        
+        current = {gid: geometry_hash(mesh) for gid, mesh in self.geometry.items() if mesh is not None}
+        added = {gid for gid in current if gid not in prev_hashes}
+        modified = {gid for gid in current if gid in prev_hashes and prev_hashes[gid] != current[gid]}
+        removed = set(prev_hashes) - set(current)
+        changed = added | modified
+        
+        carried = []
+        for clash in prev_results.get('clashes', []):
+            ids = (clash['id_a'], clash['id_b'])
+            if any(gid not in current or gid in changed for gid in ids):
+                continue
+            # Geometry is identical, but names may have been edited
+            carried.append(dict(
+                clash,
+                name_a=ifc_file.by_guid(ids[0]).Name or 'Unnamed',
+                name_b=ifc_file.by_guid(ids[1]).Name or 'Unnamed',
+            ))
+        
+        incremental = {
+            'base_content_hash': baseline['content_hash'],
+            'added': sorted(added), 'modified': sorted(modified), 'removed': sorted(removed),
+            'unchanged': len(current) - len(changed), 'carried_over': len(carried)
+        }
+        return changed, carried, incremental
+    
+    def _candidate_pairs(self, bboxes_a, bboxes_b, tol, changed_a=None, changed_b=None) -> List[Tuple[int, int]]:
+        """Broad phase over all pairs, or only pairs where at least one side changed."""
+        if changed_a is None:
+            return self._sweep_and_prune(bboxes_a, bboxes_b, tol)
+        idx_a = [i for i, flag in enumerate(changed_a) if flag]
+        idx_b = [j for j, flag in enumerate(changed_b) if flag]
+        pairs = [(idx_a[i], j) for i, j in self._sweep_and_prune([bboxes_a[i] for i in idx_a], bboxes_b, tol)]
+        # Pairs with both sides changed came out of the first sweep already
+        keep_a = [i for i, flag in enumerate(changed_a) if not flag]
+        pairs += [
+            (keep_a[i], idx_b[j])
+            for i, j in self._sweep_and_prune([bboxes_a[i] for i in keep_a], [bboxes_b[j] for j in idx_b], tol)
+        ]
+        return pairs
+    
+    def _tessellate(self, ifc_file, ifc_classes) -> Dict[str, Tuple]:
+        """
+        Tessellate every element of ifc_classes not yet in the cache using the
+        multi-threaded geometry iterator, and return GlobalId -> bbox.
+        
+        Elements the iterator does not yield are recorded in failed_elements
+        rather than silently dropped from clash detection.
+        """
+        elements = [
+            elem for ifc_class in sorted(ifc_classes) for elem in ifc_file.by_type(ifc_class)
+            if elem.Representation and elem.GlobalId not in self.geometry
+        ]
+        if elements:
+            iterator = ifcopenshell.geom.iterator(self.settings, ifc_file, self.workers, include=elements)
+            if iterator.initialize():
+                while True:
+                    shape = iterator.get()
+                    self.geometry[shape.guid] = self._mesh_from_shape(shape)
+                    if not iterator.next():
+                        break
+            
+            for elem in elements:
+                if self.geometry.get(elem.GlobalId) is None:
+                    self.geometry[elem.GlobalId] = None
+                    self._record_failure(elem, 'No tessellated geometry produced')
+        
+        return {
+            elem.GlobalId: self.geometry[elem.GlobalId]['bbox']
+            for ifc_class in ifc_classes for elem in ifc_file.by_type(ifc_class)
+            if self.geometry.get(elem.GlobalId) is not None
+        }
+    
+    def _record_failure(self, elem, reason: str):
+        logger.warning(f"Tessellation failed for {elem.is_a()} {elem.GlobalId}: {reason}")
+        self.failed_elements.append({
+            'id': elem.GlobalId, 'name': elem.Name or 'Unnamed',
+            'ifc_class': elem.is_a(), 'reason': reason
+        })
+    
+    @staticmethod
+    def _mesh_from_shape(shape) -> Dict:
+        verts = np.asarray(shape.geometry.verts, dtype=np.float64).reshape(-1, 3)
+        faces = np.asarray(shape.geometry.faces, dtype=np.int32).reshape(-1, 3)
+        if not len(verts):
+            return None
+        bbox = tuple(np.concatenate([verts.min(axis=0), verts.max(axis=0)]).tolist())
+        return {'verts': verts, 'faces': faces, 'bbox': bbox}
     
-    def _get_all_bboxes(self, ifc_file):
-        bboxes = {}
-        for elem in ifc_file:
-            if hasattr(elem, 'Representation') and elem.Representation:
-                try:
-                    shape = ifcopenshell.geom.create_shape(self.settings, elem)
-                    bbox = shape.geometry.bbox
-                    bboxes[elem.GlobalId] = bbox
-                except:
-                    pass
-        return bboxes
+    @staticmethod
+    def _sweep_and_prune(bboxes_a: List[Tuple], bboxes_b: List[Tuple], tol: float) -> List[Tuple[int, int]]:
+        """
+        Broad phase: return (i, j) index pairs whose boxes overlap within tol.
+        
+        Boxes of both groups are swept along the axis with the largest spread,
+        ordered by their lower bound. Each box is only tested against boxes of
+        the other group that are still open on that axis, so a clash set costs
+        O((n + m) log(n + m) + k) instead of n * m overlap tests.
+        """
+        if not bboxes_a or not bboxes_b:
+            return []
+        a = np.asarray(bboxes_a, dtype=float).reshape(-1, 6)
+        b = np.asarray(bboxes_b, dtype=float).reshape(-1, 6)
+        # Inflating one side by tol is equivalent to _aabb_overlap(..., tol)
+        lows = (a[:, :3] - tol, b[:, :3])
+        highs = (a[:, 3:] + tol, b[:, 3:])
+        
+        centres = np.vstack([lows[0] + highs[0], lows[1] + highs[1]])
+        axis = int(np.argmax(centres.max(axis=0) - centres.min(axis=0)))
+        starts = np.concatenate([lows[0][:, axis], lows[1][:, axis]])
+        order = np.argsort(starts, kind='stable').tolist()
+        
+        lows = (lows[0].tolist(), lows[1].tolist())
+        highs = (highs[0].tolist(), highs[1].tolist())
+        n_a = len(a)
+        active = ([], [])
+        pairs = []
+        for k in order:
+            side, idx = (0, k) if k < n_a else (1, k - n_a)
+            other = 1 - side
+            lo, hi = lows[side][idx], highs[side][idx]
+            still_open = []
+            for o in active[other]:
+                o_lo, o_hi = lows[other][o], highs[other][o]
+                if o_hi[axis] < lo[axis]:
+                    continue  # Closed before this box opened; never overlaps again
+                still_open.append(o)
+                if (lo[0] <= o_hi[0] and o_lo[0] <= hi[0] and
+                        lo[1] <= o_hi[1] and o_lo[1] <= hi[1] and
+                        lo[2] <= o_hi[2] and o_lo[2] <= hi[2]):
+                    pairs.append((idx, o) if side == 0 else (o, idx))
+            active[other][:] = still_open
+            active[side].append(idx)
+        return pairs
+    
+    @staticmethod
+    def _box_gap(bbox1: Tuple, bbox2: Tuple) -> float:
+        """Smallest tol for which _aabb_overlap(bbox1, bbox2, tol) holds."""
+        return max(0.0, *(max(bbox1[k] - bbox2[k + 3], bbox2[k] - bbox1[k + 3]) for k in range(3)))
     
     @staticmethod
     def _aabb_overlap(bbox1: Tuple, bbox2: Tuple, tol: float) -> bool:
@@ -86,9 +468,15 @@ class AdvancedClashDetector:
             bbox1[2] > bbox2[5] + tol or bbox2[2] > bbox1[5] + tol
         )
     
-    def _min_distance_between_meshes(self, elem_a, elem_b) -> float:
-        shape_a = ifcopenshell.geom.create_shape(self.settings, elem_a)
-        shape_b = ifcopenshell.geom.create_shape(self.settings, elem_b)
-        centroid_a = np.mean(np.array(shape_a.geometry.verts).reshape(-1, 3), axis=0)
-        centroid_b = np.mean(np.array(shape_b.geometry.verts).reshape(-1, 3), axis=0)
-        return np.linalg.norm(centroid_a - centroid_b)
\ No newline at end of file
+    def _min_distance_between_meshes(self, id_a: str, id_b: str) -> float:
+        """
+        Triangle-to-triangle minimum distance, exact below tolerance_soft.
+        
+        Evaluation runs to the true minimum: soft clashes store this distance
+        and the clashes endpoint sorts by it.
+        """
+        geom_a = self.geometry.get(id_a)
+        geom_b = self.geometry.get(id_b)
+        if geom_a is None or geom_b is None:
+            return np.inf
+        return mesh_distance(geom_a, geom_b, cutoff=self.tolerance_soft)
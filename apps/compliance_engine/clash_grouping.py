@@ -0,0 +1,139 @@
+# compliance_engine/clash_grouping.py
+"""
+Clustering of clashes into clash groups.
+
+One misrouted run typically yields a long chain of near-identical clashes:
+the same element pair family (clash type and the classes of both sides)
+repeated along the run. Two clashes of a family join the same group when
+they share an element or their locations are within the grouping radius;
+groups are the connected components of that relation (single linkage).
+
+Each group keeps its count, extent and one representative clash, which is
+what results store and transfer; the members are stored as ClashRecord rows
+tagged with their group and expanded on demand.
+"""
+
+import math
+from itertools import product
+from typing import Dict, List, Sequence
+
+SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2, "critical": 3}
+
+
+def clash_location(bbox_a: Sequence[float], bbox_b: Sequence[float]) -> List[float]:
+    """Centre of the overlap of two bboxes, or of the gap between them."""
+    return [
+        round((max(bbox_a[k], bbox_b[k]) + min(bbox_a[k + 3], bbox_b[k + 3])) / 2, 3)
+        for k in range(3)
+    ]
+
+
+def group_clashes(clashes: List[Dict], radius: float) -> List[Dict]:
+    """
+    Set clash["group"] on every clash and return the groups, numbered in
+    order of their first member.
+
+    Clashes without a location (e.g. carried over from results that predate
+    locations) are only grouped through shared elements.
+    """
+    parent = list(range(len(clashes)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    families = {}
+    for i, clash in enumerate(clashes):
+        key = (clash["type"], clash.get("class_a", ""), clash.get("class_b", ""))
+        families.setdefault(key, []).append(i)
+
+    for members in families.values():
+        by_element = {}
+        for i in members:
+            for gid in (clashes[i]["id_a"], clashes[i]["id_b"]):
+                if gid in by_element:
+                    union(i, by_element[gid])
+                else:
+                    by_element[gid] = i
+        if radius <= 0:
+            continue
+        # Hash locations into radius-sized cells; neighbours are in the 27 around
+        cells = {}
+        for i in members:
+            location = clashes[i].get("location")
+            if location is None:
+                continue
+            cell = tuple(math.floor(c / radius) for c in location)
+            for neighbour in product(*((c - 1, c, c + 1) for c in cell)):
+                for j in cells.get(neighbour, ()):
+                    if find(i) != find(j) and (
+                        math.dist(location, clashes[j]["location"]) <= radius
+                    ):
+                        union(i, j)
+            cells.setdefault(cell, []).append(i)
+
+    group_ids, groups, elements = {}, [], []
+    for i, clash in enumerate(clashes):
+        root = find(i)
+        if root not in group_ids:
+            group_ids[root] = len(groups)
+            groups.append(_new_group(len(groups), clash))
+            elements.append(set())
+        clash["group"] = group_ids[root]
+        _add_member(groups[clash["group"]], clash)
+        elements[clash["group"]].update((clash["id_a"], clash["id_b"]))
+    for group, group_elements in zip(groups, elements):
+        group["elements"] = len(group_elements)
+        if group["bbox"] is not None:
+            group["center"] = [
+                round((group["bbox"][k] + group["bbox"][k + 3]) / 2, 3)
+                for k in range(3)
+            ]
+    return groups
+
+
+def _new_group(group_id: int, clash: Dict) -> Dict:
+    return {
+        "id": group_id,
+        "type": clash["type"],
+        "class_a": clash.get("class_a", ""),
+        "class_b": clash.get("class_b", ""),
+        "count": 0,
+        "elements": 0,
+        "severity": clash.get("severity", ""),
+        "min_distance": None,
+        "bbox": None,
+        "center": None,
+        "representative": clash,
+    }
+
+
+def _add_member(group: Dict, clash: Dict):
+    group["count"] += 1
+    if SEVERITY_RANK.get(clash.get("severity"), -1) > SEVERITY_RANK.get(
+        group["severity"], -1
+    ):
+        group["severity"] = clash["severity"]
+    distance = clash.get("distance")
+    if distance is not None and (
+        group["min_distance"] is None or distance < group["min_distance"]
+    ):
+        # The closest approach represents a clearance group
+        group["min_distance"] = distance
+        group["representative"] = clash
+    location = clash.get("location")
+    if location is not None:
+        bbox = group["bbox"]
+        group["bbox"] = (
+            location + location
+            if bbox is None
+            else [min(bbox[k], location[k]) for k in range(3)]
+            + [max(bbox[k + 3], location[k]) for k in range(3)]
+        )
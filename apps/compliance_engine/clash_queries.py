@@ -0,0 +1,127 @@
+# compliance_engine/clash_queries.py
+"""
+Filtering, keyset pagination and NDJSON export over ClashRecord rows.
+
+Keyset pagination resumes after the last row of the previous page through
+an opaque cursor holding that row's (distance, id), so every page costs one
+index range scan however deep the client pages, and clashes written while
+paging do not shift later pages.
+
+Hard clashes have no measured distance; when ordering by distance they come
+after every soft clash, in id order.
+"""
+
+import base64
+import json
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.db.models import F, Q
+
+ORDERINGS = ("id", "distance", "-distance")
+EXPORT_FIELDS = [
+    "id",
+    "id_a",
+    "name_a",
+    "class_a",
+    "id_b",
+    "name_b",
+    "class_b",
+    "clash_type",
+    "severity",
+    "distance",
+    "description",
+    "location",
+    "group",
+]
+
+
+class InvalidCursor(ValueError):
+    """A cursor that was not produced by encode_cursor for this ordering."""
+
+
+def filter_clashes(queryset, params):
+    """
+    Apply the type/severity/element_class/group query parameters; raises
+    ValueError for a malformed group.
+    """
+    if params.get("group") not in (None, ""):
+        try:
+            queryset = queryset.filter(group=int(params["group"]))
+        except ValueError:
+            raise ValueError("group must be an integer")
+    if params.get("type"):
+        queryset = queryset.filter(clash_type=params["type"])
+    if params.get("severity"):
+        queryset = queryset.filter(severity=params["severity"])
+    if params.get("element_class"):
+        element_class = params["element_class"]
+        queryset = queryset.filter(
+            Q(class_a__iexact=element_class) | Q(class_b__iexact=element_class)
+        )
+    return queryset
+
+
+def encode_cursor(ordering: str, row: Dict) -> str:
+    position = [ordering, row["distance"], row["id"]]
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(ordering: str, cursor: str) -> Tuple[Optional[float], int]:
+    try:
+        cursor_ordering, distance, last_id = json.loads(
+            base64.urlsafe_b64decode(cursor.encode())
+        )
+    except (ValueError, TypeError):
+        raise InvalidCursor("Malformed cursor")
+    if cursor_ordering != ordering:
+        raise InvalidCursor("Cursor was issued for another ordering")
+    return distance, int(last_id)
+
+
+def _order(queryset, ordering: str):
+    if ordering == "id":
+        return queryset.order_by("id")
+    distance = F("distance")
+    key = (
+        distance.desc(nulls_last=True)
+        if ordering == "-distance"
+        else distance.asc(nulls_last=True)
+    )
+    return queryset.order_by(key, "id")
+
+
+def _after(queryset, ordering: str, distance, last_id: int):
+    """Rows that come after (distance, last_id) in ordering."""
+    if ordering == "id" or distance is None:
+        if ordering != "id":
+            queryset = queryset.filter(distance__isnull=True)
+        return queryset.filter(id__gt=last_id)
+    beyond = "distance__lt" if ordering == "-distance" else "distance__gt"
+    return queryset.filter(
+        Q(**{beyond: distance})
+        | Q(distance=distance, id__gt=last_id)
+        | Q(distance__isnull=True)
+    )
+
+
+def keyset_page(
+    queryset, ordering: str, cursor: Optional[str], size: int
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    One page of clash rows as dicts, plus the cursor of the next page (None
+    on the last page). Raises InvalidCursor for a foreign or damaged cursor.
+    """
+    if cursor:
+        queryset = _after(queryset, ordering, *decode_cursor(ordering, cursor))
+    rows = list(_order(queryset, ordering).values(*EXPORT_FIELDS)[: size + 1])
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    return rows, encode_cursor(ordering, rows[-1]) if rows else None
+
+
+def export_ndjson(queryset, ordering: str = "id") -> Iterator[str]:
+    """One JSON line per clash, streamed from a server-side cursor."""
+    rows = _order(queryset, ordering).values(*EXPORT_FIELDS)
+    for row in rows.iterator(chunk_size=2000):
+        yield json.dumps(row) + "\n"
@@ -0,0 +1,264 @@
+# compliance_engine/geometry_store.py
+"""
+On-disk geometry sidecar keyed by IFC content hash.
+
+Each sidecar is a directory of plain .npy arrays (npz members cannot be
+memory-mapped) plus a JSON index:
+
+- verts.npy    (V, 3) float64, vertices of all elements concatenated
+- faces.npy    (F, 3) int32, face indices local to their own element
+- bboxes.npy   (N, 6) float64, world-space bbox per element
+- offsets.npy  (N, 4) int64, vert_start, vert_end, face_start, face_end
+- index.json   GlobalIds in row order, their geometry hashes and elements
+               that failed to tessellate
+
+Tolerance sweeps add one distances-<key>.npz per clash-set list, holding
+the candidate-pair distance table computed by
+AdvancedClashDetector.pair_distances.
+
+Arrays are opened with mmap_mode='r', so the per-element meshes handed to
+AdvancedClashDetector (or any other consumer) are read-only views into
+the page cache rather than copies.
+
+Reading a sidecar marks it used. When the store has a size budget, every
+write drops the least recently used sidecars, distance tables included,
+until the store fits again; interrupted writes left behind as .tmp-*
+entries are removed once they are a day old.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STORE_VERSION = 1  # Bump when tessellation settings or layout change
+STALE_TMP_SECONDS = 24 * 3600  # Age after which a .tmp-* entry is an abandoned write
+
+
+def geometry_hash(mesh: Dict) -> str:
+    """Stable digest of an element mesh, insensitive to sub-micrometre float noise."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(np.round(mesh["verts"], 6)).tobytes())
+    digest.update(np.ascontiguousarray(mesh["faces"], dtype=np.int32).tobytes())
+    return digest.hexdigest()
+
+
+class GeometryStore:
+    def __init__(self, root, max_bytes: int = None):
+        self.root = Path(root)
+        self.max_bytes = (
+            max_bytes  # Size budget enforced by prune(); None keeps everything
+        )
+
+    def path_for(self, content_hash: str) -> Path:
+        return self.root / f"{content_hash}.v{STORE_VERSION}"
+
+    def exists(self, content_hash: str) -> bool:
+        return (self.path_for(content_hash) / "index.json").exists()
+
+    def load(self, content_hash: str) -> Optional[Tuple[Dict, List[Dict]]]:
+        """Return (geometry, failed_elements) for content_hash, or None if no sidecar exists."""
+        path = self.path_for(content_hash)
+        if not self.exists(content_hash):
+            return None
+        try:
+            with open(path / "index.json") as f:
+                index = json.load(f)
+            arrays = {
+                name: self._load_array(path / f"{name}.npy")
+                for name in ("verts", "faces", "bboxes", "offsets")
+            }
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable geometry sidecar {path}: {e}")
+            return None
+        self._touch(path)
+
+        geometry = {}
+        for global_id, bbox, (v0, v1, f0, f1) in zip(
+            index["ids"], arrays["bboxes"].tolist(), arrays["offsets"].tolist()
+        ):
+            geometry[global_id] = {
+                "verts": arrays["verts"][v0:v1],
+                "faces": arrays["faces"][f0:f1],
+                "bbox": tuple(bbox),
+            }
+        for failed in index["failed"]:
+            geometry[failed["id"]] = None
+        return geometry, index["failed"]
+
+    def load_hashes(self, content_hash: str) -> Optional[Dict[str, str]]:
+        """Return GlobalId -> geometry hash for content_hash without mapping any arrays."""
+        if not self.exists(content_hash):
+            return None
+        try:
+            with open(self.path_for(content_hash) / "index.json") as f:
+                index = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(
+                f"Ignoring unreadable geometry sidecar for {content_hash}: {e}"
+            )
+            return None
+        self._touch(self.path_for(content_hash))
+        return dict(zip(index["ids"], index["hashes"]))
+
+    def save(self, content_hash: str, geometry: Dict, failed_elements: List[Dict]):
+        """Write the sidecar for content_hash, replacing any previous one."""
+        meshes = [(gid, mesh) for gid, mesh in geometry.items() if mesh is not None]
+        vert_counts = np.array([len(m["verts"]) for _, m in meshes], dtype=np.int64)
+        face_counts = np.array([len(m["faces"]) for _, m in meshes], dtype=np.int64)
+        vert_ends, face_ends = np.cumsum(vert_counts), np.cumsum(face_counts)
+        offsets = np.stack(
+            [vert_ends - vert_counts, vert_ends, face_ends - face_counts, face_ends],
+            axis=1,
+        ).reshape(-1, 4)
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(dir=self.root, prefix=".tmp-"))
+        try:
+            np.save(
+                tmp / "verts.npy",
+                self._concat([m["verts"] for _, m in meshes], np.float64),
+            )
+            np.save(
+                tmp / "faces.npy",
+                self._concat([m["faces"] for _, m in meshes], np.int32),
+            )
+            np.save(
+                tmp / "bboxes.npy",
+                np.array([m["bbox"] for _, m in meshes], dtype=np.float64).reshape(
+                    -1, 6
+                ),
+            )
+            np.save(tmp / "offsets.npy", offsets)
+            with open(tmp / "index.json", "w") as f:
+                json.dump(
+                    {
+                        "ids": [gid for gid, _ in meshes],
+                        "hashes": [geometry_hash(m) for _, m in meshes],
+                        "failed": failed_elements,
+                    },
+                    f,
+                )
+
+            final = self.path_for(content_hash)
+            if final.exists():
+                shutil.rmtree(final)
+            os.replace(tmp, final)
+        except OSError as e:
+            logger.warning(f"Could not write geometry sidecar for {content_hash}: {e}")
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.prune(keep=content_hash)
+
+    def load_distances(
+        self, content_hash: str, clash_sets: List[Dict]
+    ) -> Optional[Dict[str, np.ndarray]]:
+        """Return the pair distance table stored for clash_sets, or None."""
+        path = self._distances_path(content_hash, clash_sets)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path) as stored:
+                table = {name: stored[name] for name in stored.files}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable distance table {path}: {e}")
+            return None
+        self._touch(path.parent)
+        table["max_tolerance"] = float(table["max_tolerance"])
+        return table
+
+    def save_distances(
+        self, content_hash: str, clash_sets: List[Dict], table: Dict[str, np.ndarray]
+    ):
+        """Write the pair distance table for clash_sets, replacing any previous one."""
+        path = self._distances_path(content_hash, clash_sets)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".npz")
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **table)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Could not write distance table for {content_hash}: {e}")
+        self.prune(keep=content_hash)
+
+    def prune(self, keep: str = None):
+        """
+        Delete least recently used sidecars until the store fits in max_bytes,
+        never the one for keep, and abandoned .tmp-* entries.
+        """
+        if self.max_bytes is None or not self.root.is_dir():
+            return
+        now = time.time()
+        entries = []
+        for entry in self.root.iterdir():
+            try:
+                used = entry.stat().st_mtime
+                if entry.name.startswith(".tmp-"):
+                    if now - used > STALE_TMP_SECONDS:
+                        self._remove(entry)
+                    continue
+                entries.append((used, self._size(entry), entry))
+            except OSError:
+                continue  # Removed concurrently
+        total = sum(size for _, size, _ in entries)
+        kept = self.path_for(keep) if keep else None
+        evicted = 0
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            if entry == kept:
+                continue
+            self._remove(entry)
+            total -= size
+            evicted += 1
+        if evicted:
+            logger.info(f"Evicted {evicted} geometry sidecars from {self.root}")
+
+    def _distances_path(self, content_hash: str, clash_sets: List[Dict]) -> Path:
+        key = hashlib.blake2b(
+            json.dumps(clash_sets, sort_keys=True).encode(), digest_size=8
+        ).hexdigest()
+        return self.path_for(content_hash) / f"distances-{key}.npz"
+
+    @staticmethod
+    def _touch(path: Path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        if path.is_file():
+            return path.stat().st_size
+        return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+    @staticmethod
+    def _remove(path: Path):
+        if path.is_dir():
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            path.unlink(missing_ok=True)
+
+    @staticmethod
+    def _concat(arrays, dtype) -> np.ndarray:
+        if not arrays:
+            return np.empty((0, 3), dtype=dtype)
+        return np.concatenate(arrays).astype(dtype, copy=False)
+
+    @staticmethod
+    def _load_array(path: Path) -> np.ndarray:
+        try:
+            return np.load(path, mmap_mode="r")
+        except ValueError:
+            # Empty arrays cannot be memory-mapped
+            return np.load(path)
@@ -0,0 +1,197 @@
+# compliance_engine/mesh_distance.py
+"""
+Vectorized narrow phase for soft-clearance checks.
+
+Meshes are the cached {'verts', 'faces', 'bbox'} dicts produced by
+AdvancedClashDetector. The minimum distance between two triangle sets is
+attained either between a vertex and a triangle, between two edges, or is
+zero because an edge of one mesh pierces a triangle of the other, so those
+three primitive tests cover the exact answer.
+"""
+
+import numpy as np
+
+EPS = 1e-12
+BLOCK_SIZE = 250_000  # Primitive pairs evaluated per NumPy block
+
+
+def aabb_gap(bbox_a, bbox_b) -> float:
+    """Euclidean gap between two (min_x, min_y, min_z, max_x, max_y, max_z) boxes, 0 if they overlap."""
+    a = np.asarray(bbox_a, dtype=float)
+    b = np.asarray(bbox_b, dtype=float)
+    gap = np.maximum(0.0, np.maximum(b[:3] - a[3:], a[:3] - b[3:]))
+    return float(np.linalg.norm(gap))
+
+
+def mesh_distance(mesh_a, mesh_b, cutoff: float, stop_below: float = 0.0) -> float:
+    """
+    Minimum distance between two triangle meshes.
+
+    The result is exact whenever it is below cutoff; otherwise some value
+    >= cutoff (np.inf when no primitive comes within reach) is returned.
+    Primitives outside the other mesh's bbox inflated by cutoff are pruned
+    first, and evaluation stops as soon as a distance <= stop_below is found.
+    """
+    gap = aabb_gap(mesh_a["bbox"], mesh_b["bbox"])
+    if gap >= cutoff:
+        return np.inf
+
+    tris_a = _triangles_near(mesh_a, mesh_b["bbox"], cutoff)
+    tris_b = _triangles_near(mesh_b, mesh_a["bbox"], cutoff)
+    if not len(tris_a) or not len(tris_b):
+        return np.inf
+
+    # Only overlapping boxes can interpenetrate; settle those first so they report 0
+    if gap == 0.0 and _meshes_intersect(tris_a, tris_b):
+        return 0.0
+
+    best = np.inf
+    # Vertex-triangle in both directions, then edge-edge
+    for rows, cols, fn in (
+        (_unique_points(tris_a), tris_b, _point_triangle_distances),
+        (_unique_points(tris_b), tris_a, _point_triangle_distances),
+        (_edges(tris_a), _edges(tris_b), _segment_segment_distances),
+    ):
+        for block in _blocks(rows, len(cols)):
+            best = min(best, float(fn(block, cols).min()))
+            if best <= stop_below:
+                return best
+    return best
+
+
+def _meshes_intersect(tris_a: np.ndarray, tris_b: np.ndarray) -> bool:
+    """Touching or interpenetrating meshes need not share a closest vertex or edge pair."""
+    for edges, tris in ((_edges(tris_a), tris_b), (_edges(tris_b), tris_a)):
+        for block in _blocks(edges, len(tris)):
+            if _segments_hit_triangles(block, tris).any():
+                return True
+    return False
+
+
+def _triangles_near(mesh, bbox, cutoff: float) -> np.ndarray:
+    """(T, 3, 3) triangles of mesh whose own bbox lies within cutoff of bbox."""
+    tris = mesh["verts"][mesh["faces"]]
+    lo = np.asarray(bbox[:3], dtype=float) - cutoff
+    hi = np.asarray(bbox[3:], dtype=float) + cutoff
+    keep = np.all(tris.min(axis=1) <= hi, axis=1) & np.all(
+        tris.max(axis=1) >= lo, axis=1
+    )
+    return tris[keep]
+
+
+def _unique_points(tris: np.ndarray) -> np.ndarray:
+    return np.unique(tris.reshape(-1, 3), axis=0)
+
+
+def _edges(tris: np.ndarray) -> np.ndarray:
+    """(E, 2, 3) unique undirected edges of a triangle set."""
+    edges = np.concatenate([tris[:, [0, 1]], tris[:, [1, 2]], tris[:, [2, 0]]])
+    # Order endpoints so shared edges of neighbouring triangles collapse to one row
+    flip = _lex_less(edges[:, 1], edges[:, 0])
+    edges = np.where(flip[:, None, None], edges[:, ::-1], edges)
+    return np.unique(edges.reshape(-1, 6), axis=0).reshape(-1, 2, 3)
+
+
+def _lex_less(p: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """Row-wise lexicographic p < q for (N, 3) arrays."""
+    return (p[:, 0] < q[:, 0]) | (
+        (p[:, 0] == q[:, 0])
+        & ((p[:, 1] < q[:, 1]) | ((p[:, 1] == q[:, 1]) & (p[:, 2] < q[:, 2])))
+    )
+
+
+def _blocks(rows: np.ndarray, n_cols: int):
+    step = max(1, BLOCK_SIZE // max(n_cols, 1))
+    for start in range(0, len(rows), step):
+        yield rows[start : start + step]
+
+
+def _dot(u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    return np.einsum("...k,...k->...", u, v)
+
+
+def _point_segment_distances(p, a, b) -> np.ndarray:
+    ab = b - a
+    denom = _dot(ab, ab)
+    t = np.clip(_dot(p - a, ab) / np.where(denom > EPS, denom, 1.0), 0.0, 1.0)
+    return np.linalg.norm(p - (a + t[..., None] * ab), axis=-1)
+
+
+def _point_triangle_distances(points: np.ndarray, tris: np.ndarray) -> np.ndarray:
+    """(P, T) distances from points to triangles."""
+    p = points[:, None, :]
+    a, b, c = (tris[None, :, i, :] for i in range(3))
+    ab, ac, ap = b - a, c - a, p - a
+
+    # Projection onto the plane falls inside the triangle: distance is to the plane
+    normal = np.cross(ab, ac)
+    area2 = _dot(normal, normal)
+    safe_area2 = np.where(area2 > EPS, area2, 1.0)
+    v = _dot(np.cross(ap, ac), normal) / safe_area2
+    w = _dot(np.cross(ab, ap), normal) / safe_area2
+    inside = (area2 > EPS) & (v >= 0) & (w >= 0) & (v + w <= 1)
+    plane = np.abs(_dot(ap, normal)) / np.sqrt(safe_area2)
+
+    edge = np.minimum(
+        _point_segment_distances(p, a, b),
+        np.minimum(
+            _point_segment_distances(p, b, c), _point_segment_distances(p, c, a)
+        ),
+    )
+    return np.where(inside, plane, edge)
+
+
+def _segment_segment_distances(segs_a: np.ndarray, segs_b: np.ndarray) -> np.ndarray:
+    """(A, B) closest distances between segments (Ericson, Real-Time Collision Detection 5.1.9)."""
+    p1, q1 = segs_a[:, None, 0, :], segs_a[:, None, 1, :]
+    p2, q2 = segs_b[None, :, 0, :], segs_b[None, :, 1, :]
+    d1, d2, r = q1 - p1, q2 - p2, p1 - p2
+    a = _dot(d1, d1)
+    e = _dot(d2, d2)
+    f = _dot(d2, r)
+    c = _dot(d1, r)
+    b = _dot(d1, d2)
+    safe_a = np.where(a > EPS, a, 1.0)
+    safe_e = np.where(e > EPS, e, 1.0)
+
+    denom = a * e - b * b
+    general = denom > EPS
+    s = np.where(
+        general, np.clip((b * f - c * e) / np.where(general, denom, 1.0), 0.0, 1.0), 0.0
+    )
+    t = (b * s + f) / safe_e
+    s = np.where(
+        t < 0,
+        np.clip(-c / safe_a, 0.0, 1.0),
+        np.where(t > 1, np.clip((b - c) / safe_a, 0.0, 1.0), s),
+    )
+    t = np.clip(t, 0.0, 1.0)
+    # Degenerate segments collapse to points
+    s, t = np.where(e > EPS, s, np.clip(-c / safe_a, 0.0, 1.0)), np.where(
+        e > EPS, t, 0.0
+    )
+    s, t = np.where(a > EPS, s, 0.0), np.where(
+        a > EPS, t, np.clip(f / safe_e, 0.0, 1.0)
+    )
+
+    closest_a = p1 + s[..., None] * d1
+    closest_b = p2 + t[..., None] * d2
+    return np.linalg.norm(closest_a - closest_b, axis=-1)
+
+
+def _segments_hit_triangles(segs: np.ndarray, tris: np.ndarray) -> np.ndarray:
+    """(S, T) Moller-Trumbore test of segments against triangles."""
+    p, q = segs[:, None, 0, :], segs[:, None, 1, :]
+    v0, v1, v2 = (tris[None, :, i, :] for i in range(3))
+    direction = q - p
+    e1, e2 = v1 - v0, v2 - v0
+    pvec = np.cross(direction, e2)
+    det = _dot(e1, pvec)
+    valid = np.abs(det) > EPS
+    inv = 1.0 / np.where(valid, det, 1.0)
+    tvec = p - v0
+    u = _dot(tvec, pvec) * inv
+    qvec = np.cross(tvec, e1)
+    v = _dot(direction, qvec) * inv
+    t = _dot(e2, qvec) * inv
+    return valid & (u >= 0) & (v >= 0) & (u + v <= 1) & (t >= 0) & (t <= 1)
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("compliance_engine", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="compliancecheck",
+            name="base_check",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Previous revision's check whose clashes were carried over",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="incremental_checks",
+                to="compliance_engine.compliancecheck",
+            ),
+        ),
+        migrations.AddField(
+            model_name="compliancecheck",
+            name="ifc_content_hash",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+    ]
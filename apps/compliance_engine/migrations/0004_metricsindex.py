@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-17 19:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("compliance_engine", "0003_compliancecheck_incremental"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MetricsIndex",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("content_hash", models.CharField(max_length=64, unique=True)),
+                ("data", models.JSONField(default=dict, help_text="ModelMetrics.data")),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name_plural": "Metrics indexes",
+            },
+        ),
+    ]
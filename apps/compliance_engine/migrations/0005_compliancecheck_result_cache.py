@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("compliance_engine", "0004_metricsindex"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="compliancecheck",
+            name="cache_key",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                default="",
+                help_text="Result cache key while this check serves as a cached result",
+                max_length=64,
+            ),
+        ),
+        migrations.AddField(
+            model_name="compliancecheck",
+            name="cached_at",
+            field=models.DateTimeField(
+                blank=True, help_text="Last time the cached result was used", null=True
+            ),
+        ),
+    ]
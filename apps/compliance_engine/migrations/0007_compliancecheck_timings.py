@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("compliance_engine", "0006_compliancebatch"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="compliancecheck",
+            name="timings",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                help_text="Evaluation wall times in ms: rules, metrics and clash phases",
+            ),
+        ),
+    ]
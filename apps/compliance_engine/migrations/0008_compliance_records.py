@@ -0,0 +1,220 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_records(apps, schema_editor):
+    """Summary counts and result/clash rows for checks saved before this migration."""
+    ComplianceCheck = apps.get_model("compliance_engine", "ComplianceCheck")
+    ComplianceResult = apps.get_model("compliance_engine", "ComplianceResult")
+    ClashRecord = apps.get_model("compliance_engine", "ClashRecord")
+
+    for check in ComplianceCheck.objects.iterator(chunk_size=200):
+        results = check.results or []
+        clash_results = check.clash_results or {}
+        failed = [r for r in results if r.get("passed") is False]
+        check.rule_count = len(results)
+        check.error_count = sum(1 for r in results if "error" in r)
+        check.failed_count = len(failed)
+        check.passed_count = sum(1 for r in results if r.get("passed") is True)
+        check.critical_failed_count = sum(
+            1 for r in failed if r.get("severity") == "critical"
+        )
+        summary = clash_results.get("summary", {})
+        check.hard_clash_count = summary.get("hard_clashes", 0)
+        check.soft_clash_count = summary.get("soft_clashes", 0)
+        check.save(
+            update_fields=[
+                "rule_count",
+                "passed_count",
+                "failed_count",
+                "error_count",
+                "critical_failed_count",
+                "hard_clash_count",
+                "soft_clash_count",
+            ]
+        )
+        ComplianceResult.objects.bulk_create(
+            [
+                ComplianceResult(
+                    compliance_check_id=check.id,
+                    rule=str(r.get("rule", "Unknown"))[:255],
+                    category=str(r.get("category", ""))[:50],
+                    severity=str(r.get("severity", ""))[:20],
+                    passed=r.get("passed"),
+                    condition=str(r.get("condition", "")),
+                    skipped=r.get("skipped", ""),
+                    error=r.get("error", ""),
+                )
+                for r in results
+            ],
+            batch_size=1000,
+        )
+        ClashRecord.objects.bulk_create(
+            [
+                ClashRecord(
+                    compliance_check_id=check.id,
+                    id_a=c["id_a"],
+                    name_a=(c.get("name_a") or "")[:255],
+                    id_b=c["id_b"],
+                    name_b=(c.get("name_b") or "")[:255],
+                    clash_type=c["type"],
+                    severity=c.get("severity", ""),
+                    distance=c.get("distance"),
+                    description=(c.get("description") or "")[:255],
+                )
+                for c in clash_results.get("clashes", [])
+            ],
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("compliance_engine", "0007_compliancecheck_timings"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="compliancecheck",
+            name="critical_failed_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="compliancecheck",
+            name="error_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="compliancecheck",
+            name="failed_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="compliancecheck",
+            name="hard_clash_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="compliancecheck",
+            name="passed_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="compliancecheck",
+            name="rule_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="compliancecheck",
+            name="soft_clash_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name="ClashRecord",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("id_a", models.CharField(max_length=64)),
+                ("name_a", models.CharField(blank=True, default="", max_length=255)),
+                ("id_b", models.CharField(max_length=64)),
+                ("name_b", models.CharField(blank=True, default="", max_length=255)),
+                (
+                    "clash_type",
+                    models.CharField(
+                        choices=[("hard", "Hard"), ("soft", "Soft")], max_length=10
+                    ),
+                ),
+                ("severity", models.CharField(max_length=20)),
+                ("distance", models.FloatField(blank=True, null=True)),
+                (
+                    "description",
+                    models.CharField(blank=True, default="", max_length=255),
+                ),
+                (
+                    "compliance_check",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="clash_records",
+                        to="compliance_engine.compliancecheck",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        fields=["compliance_check", "clash_type", "severity"],
+                        name="compliance__complia_d6289e_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ComplianceResult",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("rule", models.CharField(max_length=255)),
+                (
+                    "rule_pack",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="Set in combined checks",
+                        max_length=255,
+                    ),
+                ),
+                ("category", models.CharField(blank=True, default="", max_length=50)),
+                ("severity", models.CharField(blank=True, default="", max_length=20)),
+                ("passed", models.BooleanField(null=True)),
+                ("condition", models.TextField(blank=True, default="")),
+                (
+                    "metric_value",
+                    models.JSONField(
+                        blank=True,
+                        help_text="Metric path -> value the condition saw",
+                        null=True,
+                    ),
+                ),
+                ("skipped", models.TextField(blank=True, default="")),
+                ("error", models.TextField(blank=True, default="")),
+                ("total_ms", models.FloatField(blank=True, null=True)),
+                ("metrics_ms", models.FloatField(blank=True, null=True)),
+                (
+                    "compliance_check",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rule_results",
+                        to="compliance_engine.compliancecheck",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        fields=["compliance_check", "passed", "severity"],
+                        name="compliance__complia_15ca4f_idx",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(backfill_records, migrations.RunPython.noop),
+    ]
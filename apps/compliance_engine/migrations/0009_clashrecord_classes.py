@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("compliance_engine", "0008_compliance_records"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="clashrecord",
+            name="class_a",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AddField(
+            model_name="clashrecord",
+            name="class_b",
+            field=models.CharField(blank=True, default="", max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name="clashrecord",
+            index=models.Index(
+                fields=["compliance_check", "distance", "id"],
+                name="compliance__complia_253725_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("compliance_engine", "0009_clashrecord_classes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="clashrecord",
+            name="group",
+            field=models.PositiveIntegerField(
+                blank=True, help_text="Index into the check's clash groups", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="clashrecord",
+            name="location",
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="clashrecord",
+            index=models.Index(
+                fields=["compliance_check", "group"],
+                name="compliance__complia_8a1c03_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,346 @@
+# compliance_engine/model_metrics.py
+"""
+Model metrics index used to resolve rule condition paths.
+
+The index is split into sections, each built by a single pass over the
+part of the model it needs, and only when a rule first asks for one:
+
+- counts      products per IFC class, including subclasses
+- properties  property/quantity name -> [GlobalId, class, pset, value] rows,
+              covering occurrence and type property sets
+- psets       property set name -> GlobalIds
+- storeys     [name, elevation] sorted by elevation, in metres
+- profiles    [profile class, {numeric attribute: value}], in metres
+
+Sections are plain JSON so the index can be stored once per file content
+in a MetricsIndex row and reused for any later check of that content.
+
+Metric paths understood by resolve():
+
+    wall_count                  number of IfcWall (any <snake_case class>_count)
+    has_fire_rating             some property name contains "firerating"
+    storey_count, storey_elevation, storey_height (also floor_height,
+    floor_to_floor_height), avg_height
+    all_walls.thickness         every IfcWall's Thickness property
+    load_bearing_walls.fire_rating
+                                FireRating of walls whose LoadBearing is true
+    profiles.xdim               XDim of every profile that has one
+    thickness                   bare property name, across the rule's
+                                `elements` classes when given
+    <any list metric>.min/.max/.avg/.sum/.count
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional
+
+import ifcopenshell
+import ifcopenshell.util.unit
+
+from .rule_expressions import UnknownMetricError
+
+logger = logging.getLogger(__name__)
+
+METRICS_VERSION = 1  # Bump when a section's layout changes
+SECTIONS = ("counts", "properties", "psets", "storeys", "profiles")
+
+_AGGREGATES = {
+    "min": min,
+    "max": max,
+    "sum": sum,
+    "avg": lambda values: sum(values) / len(values),
+    "count": len,
+}
+_STOREY_METRICS = {
+    "storey_count",
+    "storey_elevation",
+    "storey_height",
+    "floor_height",
+    "floor_to_floor_height",
+    "avg_height",
+}
+_LENGTH_TYPES = {
+    "IfcLengthMeasure",
+    "IfcPositiveLengthMeasure",
+    "IfcNonNegativeLengthMeasure",
+}
+
+
+def _normalize(name: str) -> str:
+    """Property lookup key: 'Fire_Rating', 'fire_rating' and 'FireRating' all match."""
+    return str(name).replace("_", "").replace(" ", "").lower()
+
+
+def _class_for(name: str, plural: bool = False) -> str:
+    """'wall' -> 'IFCWALL', or with plural 'duct_segments' -> 'IFCDUCTSEGMENT'."""
+    if plural and name.endswith("s"):
+        name = name[:-1]
+    return "IFC" + name.replace("_", "").upper()
+
+
+class ModelMetrics:
+    def __init__(self, ifc_file, data: Optional[Dict] = None):
+        """
+        data is a previously persisted index (see .data); sections it already
+        holds are not rebuilt. Indexes from another METRICS_VERSION are ignored.
+        """
+        self.ifc_file = ifc_file
+        self.sections = {}
+        if data and data.get("version") == METRICS_VERSION:
+            self.sections = dict(data.get("sections", {}))
+        self._resolved = {}
+        self._unit_scale = None
+
+    @property
+    def data(self) -> Dict:
+        """JSON-serializable form of every section built or loaded so far."""
+        return {"version": METRICS_VERSION, "sections": self.sections}
+
+    # ==================== Resolution ====================
+
+    def resolve(self, path: str, scope: Iterable[str] = None):
+        """
+        Value of a metric path, or UnknownMetricError if the model has none.
+
+        scope lists IFC classes (any case) that bare property names apply to,
+        typically a rule's `elements`.
+        """
+        key = (path, tuple(scope) if scope else None)
+        if key not in self._resolved:
+            try:
+                self._resolved[key] = self._resolve(path, scope)
+            except UnknownMetricError as e:
+                self._resolved[key] = e
+        value = self._resolved[key]
+        if isinstance(value, UnknownMetricError):
+            raise value
+        return value
+
+    def _resolve(self, path: str, scope):
+        head, _, aggregate = path.rpartition(".")
+        if head and aggregate in _AGGREGATES:
+            values = self.resolve(head, scope)
+            values = values if isinstance(values, list) else [values]
+            numbers = [v for v in values if isinstance(v, (int, float))]
+            if not numbers:
+                raise UnknownMetricError(path)
+            return _AGGREGATES[aggregate](numbers)
+
+        if "." not in path:
+            if path in _STOREY_METRICS:
+                return self._storey_metric(path)
+            if path.endswith("_count"):
+                ifc_class = _class_for(path[: -len("_count")])
+                counts = self.section("counts")
+                if ifc_class in counts:
+                    return counts[ifc_class]
+                if self._is_entity(ifc_class):
+                    return 0
+                raise UnknownMetricError(path)
+            if path.startswith("has_"):
+                wanted = _normalize(path[len("has_") :])
+                return any(wanted in name for name in self.section("properties"))
+            return self._property_values(path, classes=self._scope_classes(scope))
+
+        selector, _, prop = path.partition(".")
+        if selector in ("profile", "profiles"):
+            return self._require(
+                path,
+                [
+                    dims[attr]
+                    for _, dims in self.section("profiles")
+                    for attr in dims
+                    if _normalize(attr) == _normalize(prop)
+                ],
+            )
+        return self._selector_values(path, selector, prop)
+
+    def _selector_values(self, path, selector, prop):
+        selector = selector[len("all_") :] if selector.startswith("all_") else selector
+        ifc_class = _class_for(selector, plural=True)
+        if self._is_entity(ifc_class):
+            return self._property_values(prop, classes={ifc_class}, path=path)
+
+        # Qualified selector such as load_bearing_walls or external_walls:
+        # the qualifier is a boolean property the elements must have set
+        parts = selector.split("_")
+        for k in range(1, len(parts)):
+            qualifier, noun = "_".join(parts[:k]), "_".join(parts[k:])
+            ifc_class = _class_for(noun, plural=True)
+            if self._is_entity(ifc_class):
+                flagged = {
+                    gid
+                    for gid, _, _, value in self.section("properties").get(
+                        _normalize(qualifier), []
+                    )
+                    if value is True
+                }
+                return self._property_values(
+                    prop, classes={ifc_class}, elements=flagged, path=path
+                )
+        raise UnknownMetricError(path)
+
+    def _property_values(self, prop, classes=None, elements=None, path=None):
+        rows = self.section("properties").get(_normalize(prop), [])
+        if classes is not None:
+            # by_type includes subclasses, e.g. IfcWallStandardCase for walls
+            members = {
+                e.GlobalId
+                for ifc_class in classes
+                if self._is_entity(ifc_class)
+                for e in self.ifc_file.by_type(ifc_class)
+            }
+            elements = members if elements is None else elements & members
+        values = [
+            value for gid, _, _, value in rows if elements is None or gid in elements
+        ]
+        return self._require(path or prop, values)
+
+    @staticmethod
+    def _require(path, values: List):
+        if not values:
+            raise UnknownMetricError(path)
+        return values[0] if len(values) == 1 else values
+
+    def _storey_metric(self, path):
+        storeys = self.section("storeys")
+        if path == "storey_count":
+            return len(storeys)
+        elevations = [elevation for _, elevation in storeys]
+        if path == "storey_elevation":
+            return self._require(path, elevations)
+        heights = [b - a for a, b in zip(elevations, elevations[1:])]
+        if path == "avg_height":
+            self._require(path, heights)
+            return sum(heights) / len(heights)
+        return self._require(path, heights)
+
+    @staticmethod
+    def _scope_classes(scope):
+        return {str(c).upper() for c in scope} if scope else None
+
+    def _is_entity(self, ifc_class: str) -> bool:
+        try:
+            self.ifc_file.by_type(ifc_class)
+            return True
+        except RuntimeError:
+            return False
+
+    # ==================== Sections ====================
+
+    def section(self, name: str):
+        if name not in self.sections:
+            self.sections[name] = getattr(self, f"_build_{name}")()
+        return self.sections[name]
+
+    @property
+    def unit_scale(self) -> float:
+        if self._unit_scale is None:
+            try:
+                self._unit_scale = ifcopenshell.util.unit.calculate_unit_scale(
+                    self.ifc_file
+                )
+            except Exception:
+                self._unit_scale = 1.0  # No unit assignment: assume metres
+        return self._unit_scale
+
+    def _build_counts(self) -> Dict[str, int]:
+        schema = ifcopenshell.ifcopenshell_wrapper.schema_by_name(
+            self.ifc_file.schema_identifier
+        )
+        counts, chains = {}, {}
+        for product in self.ifc_file.by_type("IfcProduct"):
+            ifc_class = product.is_a()
+            if ifc_class not in chains:
+                # The class and all its supertypes, so IfcWallStandardCase counts as a wall
+                chains[ifc_class], declaration = [], schema.declaration_by_name(
+                    ifc_class
+                )
+                while declaration is not None:
+                    chains[ifc_class].append(declaration.name().upper())
+                    declaration = declaration.supertype()
+            for name in chains[ifc_class]:
+                counts[name] = counts.get(name, 0) + 1
+        return counts
+
+    def _build_properties(self) -> Dict[str, List]:
+        index, psets = {}, {}
+
+        def add(elements, definition):
+            if definition.is_a("IfcPropertySet"):
+                props = definition.HasProperties or []
+            elif definition.is_a("IfcElementQuantity"):
+                props = definition.Quantities or []
+            else:
+                return
+            gids = [e.GlobalId for e in elements]
+            psets.setdefault(definition.Name or "", []).extend(gids)
+            for prop in props:
+                value = self._property_value(prop)
+                if value is None:
+                    continue
+                rows = index.setdefault(_normalize(prop.Name), [])
+                rows.extend(
+                    [e.GlobalId, e.is_a(), definition.Name, value] for e in elements
+                )
+
+        for rel in self.ifc_file.by_type("IfcRelDefinesByProperties"):
+            add(rel.RelatedObjects, rel.RelatingPropertyDefinition)
+        # Type property sets apply to every occurrence of the type
+        for rel in self.ifc_file.by_type("IfcRelDefinesByType"):
+            for definition in rel.RelatingType.HasPropertySets or []:
+                add(rel.RelatedObjects, definition)
+
+        self.sections["psets"] = psets
+        return index
+
+    def _build_psets(self) -> Dict[str, List[str]]:
+        self.section("properties")  # Built in the same pass
+        return self.sections["psets"]
+
+    def _property_value(self, prop):
+        if prop.is_a("IfcPropertySingleValue"):
+            nominal = prop.NominalValue
+            if nominal is None:
+                return None
+            value = nominal.wrappedValue
+            if nominal.is_a() in _LENGTH_TYPES:
+                value *= self.unit_scale
+            return value
+        if prop.is_a("IfcPhysicalSimpleQuantity"):
+            value = prop[3]  # LengthValue, AreaValue, VolumeValue, CountValue...
+            if prop.is_a("IfcQuantityLength"):
+                value *= self.unit_scale
+            elif prop.is_a("IfcQuantityArea"):
+                value *= self.unit_scale**2
+            elif prop.is_a("IfcQuantityVolume"):
+                value *= self.unit_scale**3
+            return value
+        return None
+
+    def _build_storeys(self) -> List:
+        storeys = [
+            [storey.Name or "", storey.Elevation * self.unit_scale]
+            for storey in self.ifc_file.by_type("IfcBuildingStorey")
+            if storey.Elevation is not None
+        ]
+        return sorted(storeys, key=lambda s: s[1])
+
+    def _build_profiles(self) -> List:
+        profiles = []
+        for profile in self.ifc_file.by_type("IfcParameterizedProfileDef"):
+            info = profile.get_info(recursive=False)
+            # Slopes are angles; every other real attribute is a length
+            dims = {
+                attr: value * self.unit_scale
+                for attr, value in info.items()
+                if isinstance(value, float) and not attr.endswith("Slope")
+            }
+            if dims:
+                profiles.append([profile.is_a(), dims])
+        return profiles
+
+    def build(self, sections: Iterable[str] = SECTIONS):
+        """Build the given sections now, e.g. before persisting a full index."""
+        for name in sections:
+            self.section(name)
+        return self
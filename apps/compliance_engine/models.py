@@ -5,6 +5,38 @@ from pathlib import Path
 from django.conf import settings
 
 
+class ComplianceBatch(models.Model):
+    """One rule pack evaluated across many GeneratedIFCs."""
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="compliance_batches",
+    )
+    rule_pack = models.CharField(max_length=255)
+    filters = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    total = models.PositiveIntegerField(default=0)
+    summary = models.JSONField(default=dict, blank=True)
+    task_id = models.CharField(max_length=255, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name_plural = "Compliance batches"
+
+    def __str__(self):
+        return f"Batch {self.id}: {self.rule_pack} on {self.total} models"
+
+
 class ComplianceCheck(models.Model):
     STATUS_CHOICES = [
         ("pending", "Pending"),
@@ -20,15 +52,162 @@ class ComplianceCheck(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
     results = models.JSONField(default=list)
     clash_results = models.JSONField(default=dict, blank=True)  # Advanced clashes
+    ifc_content_hash = models.CharField(max_length=64, blank=True, default="")
+    base_check = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="incremental_checks",
+        help_text="Previous revision's check whose clashes were carried over",
+    )
+    batch = models.ForeignKey(
+        ComplianceBatch,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="checks",
+    )
+    cache_key = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        db_index=True,
+        help_text="Result cache key while this check serves as a cached result",
+    )
+    cached_at = models.DateTimeField(
+        null=True, blank=True, help_text="Last time the cached result was used"
+    )
+    timings = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Evaluation wall times in ms: rules, metrics and clash phases",
+    )
+    # Denormalized from results/clash_results by update_summary()
+    rule_count = models.PositiveIntegerField(default=0)
+    passed_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    critical_failed_count = models.PositiveIntegerField(default=0)
+    hard_clash_count = models.PositiveIntegerField(default=0)
+    soft_clash_count = models.PositiveIntegerField(default=0)
     checked_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Full clash list of an evaluation, written to ClashRecord rows by
+    # result_records.write_records; clash_results keeps the summary and groups
+    clashes = None
+
+    SUMMARY_FIELDS = [
+        "rule_count",
+        "passed_count",
+        "failed_count",
+        "error_count",
+        "critical_failed_count",
+        "hard_clash_count",
+        "soft_clash_count",
+    ]
+
     class Meta:
         ordering = ["-checked_at"]
 
     def __str__(self):
         return f"Compliance for IFC {self.generated_ifc.id} using {self.rule_pack}"
 
+    def update_summary(self):
+        """Recompute the summary counts from results and clash_results (not saved)."""
+        self.rule_count = len(self.results)
+        self.error_count = sum(1 for r in self.results if "error" in r)
+        failed = [r for r in self.results if r.get("passed") is False]
+        self.failed_count = len(failed)
+        self.passed_count = sum(1 for r in self.results if r.get("passed") is True)
+        self.critical_failed_count = sum(
+            1 for r in failed if r.get("severity") == "critical"
+        )
+        summary = (self.clash_results or {}).get("summary", {})
+        self.hard_clash_count = summary.get("hard_clashes", 0)
+        self.soft_clash_count = summary.get("soft_clashes", 0)
+
+
+class ComplianceResult(models.Model):
+    """One rule outcome of a check, normalized from ComplianceCheck.results."""
+
+    compliance_check = models.ForeignKey(
+        ComplianceCheck, on_delete=models.CASCADE, related_name="rule_results"
+    )
+    rule = models.CharField(max_length=255)
+    rule_pack = models.CharField(
+        max_length=255, blank=True, default="", help_text="Set in combined checks"
+    )
+    category = models.CharField(max_length=50, blank=True, default="")
+    severity = models.CharField(max_length=20, blank=True, default="")
+    passed = models.BooleanField(null=True)
+    condition = models.TextField(blank=True, default="")
+    metric_value = models.JSONField(
+        null=True, blank=True, help_text="Metric path -> value the condition saw"
+    )
+    skipped = models.TextField(blank=True, default="")
+    error = models.TextField(blank=True, default="")
+    total_ms = models.FloatField(null=True, blank=True)
+    metrics_ms = models.FloatField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [models.Index(fields=["compliance_check", "passed", "severity"])]
+
+    def __str__(self):
+        return f"{self.rule}: {'passed' if self.passed else 'failed'}"
+
+
+class ClashRecord(models.Model):
+    """One clash of a check, normalized from ComplianceCheck.clash_results."""
+
+    TYPE_CHOICES = [("hard", "Hard"), ("soft", "Soft")]
+
+    compliance_check = models.ForeignKey(
+        ComplianceCheck, on_delete=models.CASCADE, related_name="clash_records"
+    )
+    id_a = models.CharField(max_length=64)
+    name_a = models.CharField(max_length=255, blank=True, default="")
+    class_a = models.CharField(max_length=64, blank=True, default="")
+    id_b = models.CharField(max_length=64)
+    name_b = models.CharField(max_length=255, blank=True, default="")
+    class_b = models.CharField(max_length=64, blank=True, default="")
+    clash_type = models.CharField(max_length=10, choices=TYPE_CHOICES)
+    severity = models.CharField(max_length=20)
+    distance = models.FloatField(null=True, blank=True)
+    description = models.CharField(max_length=255, blank=True, default="")
+    location = models.JSONField(null=True, blank=True)
+    group = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Index into the check's clash groups"
+    )
+
+    class Meta:
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["compliance_check", "group"]),
+            models.Index(fields=["compliance_check", "clash_type", "severity"]),
+            # Keyset pagination by distance
+            models.Index(fields=["compliance_check", "distance", "id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.clash_type} clash {self.id_a} / {self.id_b}"
+
+
+class MetricsIndex(models.Model):
+    """ModelMetrics index of one file content, shared by all its checks."""
+
+    content_hash = models.CharField(max_length=64, unique=True)
+    data = models.JSONField(default=dict, help_text="ModelMetrics.data")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = "Metrics indexes"
+
+    def __str__(self):
+        return f"Metrics index {self.content_hash[:12]}"
+
 
 class RulePack(models.Model):
     name = models.CharField(max_length=255, unique=True)
@@ -0,0 +1,143 @@
+# compliance_engine/result_cache.py
+"""
+Content-addressed cache of compliance results.
+
+A completed ComplianceCheck is tagged with a key derived from everything
+its results depend on: the IFC content hash, the rule pack text, the clash
+tolerances and whether clash detection ran. A later request with the same
+key reuses that check instead of evaluating again.
+
+Cached checks live in the database, so web processes and Celery workers
+share them. The number of tagged checks is bounded by
+BIMFLOW_COMPLIANCE_CACHE_MAX_ENTRIES; the least recently used ones lose
+their tag (the checks themselves are kept as history).
+"""
+
+import hashlib
+import json
+import logging
+from typing import List, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import ComplianceCheck
+from .result_records import stored_clashes, write_records
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_VERSION = 1  # Bump when evaluation changes what a key's results would be
+
+
+def result_cache_key(
+    content_hash: str,
+    rule_pack_yaml: str,
+    tolerance_hard: float,
+    tolerance_soft: float,
+    include_clash: bool,
+) -> str:
+    """SHA-256 over every input the results depend on."""
+    payload = {
+        "version": RESULT_CACHE_VERSION,
+        "ifc": content_hash,
+        "rule_pack": hashlib.sha256(rule_pack_yaml.encode()).hexdigest(),
+        "tolerance_hard": float(tolerance_hard),
+        "tolerance_soft": float(tolerance_soft),
+        "include_clash": bool(include_clash),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def find_cached(cache_key: str) -> Optional[ComplianceCheck]:
+    """The check currently holding cache_key, without touching it."""
+    return ComplianceCheck.objects.filter(cache_key=cache_key).first()
+
+
+def get_cached_check(cache_key: str, generated_ifc) -> Optional[ComplianceCheck]:
+    """
+    Return a completed check for cache_key that belongs to generated_ifc.
+
+    A hit recorded for another GeneratedIFC with identical content is copied
+    into a new check, so callers never see checks of other projects.
+    """
+    hit = find_cached(cache_key)
+    if hit is None:
+        return None
+    now = timezone.now()
+    if hit.generated_ifc_id != generated_ifc.id:
+        source, hit = hit, ComplianceCheck(
+            generated_ifc=generated_ifc,
+            rule_pack=hit.rule_pack,
+            status=hit.status,
+            results=hit.results,
+            clash_results=hit.clash_results,
+            ifc_content_hash=hit.ifc_content_hash,
+            cache_key=cache_key,
+            cached_at=now,
+        )
+        hit.clashes = stored_clashes(source)
+        hit.update_summary()
+        hit.save()
+        write_records([hit])
+        # The copy takes over the key so the next hit is a plain lookup
+        ComplianceCheck.objects.filter(cache_key=cache_key).exclude(id=hit.id).update(
+            cache_key="", cached_at=None
+        )
+    else:
+        ComplianceCheck.objects.filter(id=hit.id).update(cached_at=now)
+    logger.info(f"Compliance cache hit {cache_key[:12]} -> check {hit.id}")
+    return hit
+
+
+def store_result(check: ComplianceCheck, cache_key: str):
+    """Tag a completed check with cache_key, then evict beyond the size bound."""
+    if check.status == "pending" or any("error" in r for r in check.results):
+        return  # Never cache partial or failed evaluations
+    ComplianceCheck.objects.filter(cache_key=cache_key).exclude(id=check.id).update(
+        cache_key="", cached_at=None
+    )
+    check.cache_key = cache_key
+    check.cached_at = timezone.now()
+    check.save(update_fields=["cache_key", "cached_at", "updated_at"])
+    evict(settings.BIMFLOW_COMPLIANCE_CACHE_MAX_ENTRIES)
+
+
+def bulk_store(checks: List[ComplianceCheck]):
+    """
+    Bulk-insert new checks with their result records. Those with a
+    cache_key set take over that key unless they hold errors; afterwards the
+    size bound is enforced.
+    """
+    now = timezone.now()
+    keys = []
+    for check in checks:
+        check.update_summary()
+        cacheable = not any("error" in r for r in check.results)
+        # Identical files in one batch share a key; the first one holds it
+        if check.cache_key and cacheable and check.cache_key not in keys:
+            check.cached_at = now
+            keys.append(check.cache_key)
+        else:
+            check.cache_key, check.cached_at = "", None
+    if keys:
+        ComplianceCheck.objects.filter(cache_key__in=keys).update(
+            cache_key="", cached_at=None
+        )
+    ComplianceCheck.objects.bulk_create(checks, batch_size=500)
+    write_records(checks)
+    if keys:
+        evict(settings.BIMFLOW_COMPLIANCE_CACHE_MAX_ENTRIES)
+
+
+def evict(max_entries: int):
+    """Untag the least recently used cached checks beyond max_entries."""
+    stale = (
+        ComplianceCheck.objects.exclude(cache_key="")
+        .order_by("-cached_at")
+        .values_list("id", flat=True)[max_entries:]
+    )
+    evicted = ComplianceCheck.objects.filter(id__in=list(stale)).update(
+        cache_key="", cached_at=None
+    )
+    if evicted:
+        logger.info(f"Evicted {evicted} cached compliance results")
@@ -0,0 +1,130 @@
+# compliance_engine/result_records.py
+"""
+Normalized rows for compliance results.
+
+ComplianceCheck.results and clash_results stay the engine's record of a
+check (the result cache and incremental clash detection read them), while
+ComplianceResult and ClashRecord rows make them queryable and pageable,
+e.g. every failed critical rule across an organization.
+
+Whoever writes a check's results calls update_summary() before saving and
+write_records() once the check has an id. clash_results only keeps the
+summary and clash groups; the members come from check.clashes, set by the
+writer, and are read back with stored_clashes().
+"""
+
+import logging
+from typing import Dict, Iterable, List
+
+from django.db import transaction
+
+from .models import ClashRecord, ComplianceCheck, ComplianceResult
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+def result_rows(check: ComplianceCheck):
+    for result in check.results:
+        timing = result.get("timing") or {}
+        yield ComplianceResult(
+            compliance_check_id=check.id,
+            rule=str(result.get("rule", "Unknown"))[:255],
+            rule_pack=str(result.get("rule_pack", ""))[:255],
+            category=str(result.get("category", ""))[:50],
+            severity=str(result.get("severity", ""))[:20],
+            passed=result.get("passed"),
+            condition=str(result.get("condition", "")),
+            metric_value=result.get("values"),
+            skipped=result.get("skipped", ""),
+            error=result.get("error", ""),
+            total_ms=timing.get("total_ms"),
+            metrics_ms=timing.get("metrics_ms"),
+        )
+
+
+def clash_rows(check: ComplianceCheck):
+    clashes = check.clashes
+    if clashes is None:
+        clashes = (check.clash_results or {}).get("clashes", [])
+    for clash in clashes:
+        yield ClashRecord(
+            compliance_check_id=check.id,
+            id_a=clash["id_a"],
+            name_a=(clash.get("name_a") or "")[:255],
+            class_a=clash.get("class_a", ""),
+            id_b=clash["id_b"],
+            name_b=(clash.get("name_b") or "")[:255],
+            class_b=clash.get("class_b", ""),
+            clash_type=clash["type"],
+            severity=clash.get("severity", ""),
+            distance=clash.get("distance"),
+            description=(clash.get("description") or "")[:255],
+            location=clash.get("location"),
+            group=clash.get("group"),
+        )
+
+
+def stored_clashes(check: ComplianceCheck) -> List[Dict]:
+    """
+    The full clash list of a saved check in detector format, from its
+    ClashRecord rows, or from clash_results for checks that predate them.
+    """
+    rows = check.clash_records.values(
+        "id_a",
+        "name_a",
+        "class_a",
+        "id_b",
+        "name_b",
+        "class_b",
+        "clash_type",
+        "severity",
+        "distance",
+        "description",
+        "location",
+        "group",
+    )
+    clashes = []
+    for row in rows.iterator(chunk_size=2000):
+        row["type"] = row.pop("clash_type")
+        if row["distance"] is None:
+            del row["distance"]
+        clashes.append(row)
+    return clashes or list((check.clash_results or {}).get("clashes", []))
+
+
+def write_records(checks: Iterable[ComplianceCheck]):
+    """Replace the ComplianceResult and ClashRecord rows of saved checks."""
+    checks = [check for check in checks if check.id is not None]
+    if not checks:
+        return
+    ids = [check.id for check in checks]
+    with transaction.atomic():
+        ComplianceResult.objects.filter(compliance_check_id__in=ids).delete()
+        ClashRecord.objects.filter(compliance_check_id__in=ids).delete()
+        ComplianceResult.objects.bulk_create(
+            (row for check in checks for row in result_rows(check)),
+            batch_size=BATCH_SIZE,
+        )
+        ClashRecord.objects.bulk_create(
+            (row for check in checks for row in clash_rows(check)),
+            batch_size=BATCH_SIZE,
+        )
+    logger.debug(f"Wrote result records for checks {ids}")
+
+
+def save_failure(check: ComplianceCheck, error: str):
+    """Mark a check failed with a single evaluation error and save it."""
+    check.status = "failed"
+    check.results = [{"rule": "evaluation", "passed": False, "error": error}]
+    check.update_summary()
+    check.save(
+        update_fields=[
+            "status",
+            "results",
+            "updated_at",
+            *ComplianceCheck.SUMMARY_FIELDS,
+        ]
+    )
+    write_records([check])
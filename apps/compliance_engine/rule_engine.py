@@ -1,192 +1,343 @@
 import yaml
-import ifcopenshell
-from io import BytesIO
+from django.conf import settings
 from .clash_detector import AdvancedClashDetector  # Our advanced module
+from .geometry_store import GeometryStore
+from .model_metrics import ModelMetrics
+from .rule_expressions import (
+    RuleEvaluationError,
+    UnknownMetricError,
+    compile_rule_pack,
+)
 import logging
-import re
+import time
 
 logger = logging.getLogger(__name__)
 
 
+def _value_summary(value):
+    """A metric value as recorded on a result; lists are reduced to their range."""
+    if not isinstance(value, list):
+        return value
+    numbers = [
+        v for v in value if isinstance(v, (int, float)) and not isinstance(v, bool)
+    ]
+    summary = {"count": len(value)}
+    if numbers:
+        summary.update(min=min(numbers), max=max(numbers))
+    return summary
+
+
 class RuleEngine:
-    def __init__(self, rule_pack_yaml, tolerance_hard=0.01, tolerance_soft=0.05):
+    def __init__(
+        self,
+        rule_pack_yaml,
+        tolerance_hard=0.01,
+        tolerance_soft=0.05,
+        clash_workers=None,
+        progress=None,
+        pack_names=None,
+    ):
+        """
+        rule_pack_yaml is one rule pack's YAML or a list of them; several packs
+        are evaluated off the same model, metrics index and clash run.
+        pack_names labels each pack's results in a combined check.
+
+        progress is an optional callback(phase, fraction) fed by evaluate().
+        """
+        if isinstance(rule_pack_yaml, str):
+            rule_pack_yaml = [rule_pack_yaml]
         try:
-            self.rules = yaml.safe_load(rule_pack_yaml).get("rules", [])
+            # Parsed and compiled once per distinct rule pack text
+            self.packs = [compile_rule_pack(text) for text in rule_pack_yaml]
         except yaml.YAMLError as e:
             logger.error(f"Invalid YAML in rulepack: {e}")
             raise ValueError(f"Invalid rulepack YAML: {e}")
+        self.rules = tuple(rule for pack in self.packs for rule in pack)
+        self.pack_names = list(pack_names or [])
 
         self.results = []
+        self.progress = progress
         self.detector = AdvancedClashDetector(
-            tolerance_hard=tolerance_hard, tolerance_soft=tolerance_soft
+            tolerance_hard=tolerance_hard,
+            tolerance_soft=tolerance_soft,
+            workers=clash_workers,
+            geometry_store=GeometryStore(
+                settings.BIMFLOW_GEOMETRY_CACHE_DIR,
+                max_bytes=settings.BIMFLOW_GEOMETRY_CACHE_MAX_MB * 1024 * 1024,
+            ),
+            progress=progress,
+            group_radius=settings.BIMFLOW_CLASH_GROUP_RADIUS,
         )
 
-    def evaluate(self, ifc_string, model_id, include_clash=True):
-        """Evaluate all rules and optionally run clash detection."""
-        try:
-            ifc_file = ifcopenshell.open(BytesIO(ifc_string.encode()))
-        except Exception as e:
-            logger.error(f"Failed to parse IFC: {e}")
-            raise ValueError(f"Invalid IFC file: {e}")
+    def evaluate(
+        self,
+        ifc_file,
+        model_id,
+        include_clash=True,
+        content_hash=None,
+        baseline_check=None,
+        check=None,
+        save=True,
+        checks=None,
+    ):
+        """
+        Evaluate all rules and optionally run clash detection.
 
-        # Rule checks with actual condition evaluation
-        for rule in self.rules:
-            try:
-                rule_name = rule.get("name", "Unknown")
-                condition = rule.get("condition", "True")
-                category = rule.get("category", "general")
-                severity = rule.get("severity", "info")
+        ifc_file is the parsed ifcopenshell.file, shared with the clash
+        detector so the model is only parsed once.
 
-                # Parse condition: simple expressions like "wall_count > 5" or "avg_height < 30"
-                passed = self._evaluate_condition(condition, ifc_file)
+        baseline_check is the previous revision's ComplianceCheck; when given,
+        clash detection only re-tests pairs involving changed elements.
 
-                self.results.append(
-                    {
-                        "rule": rule_name,
-                        "category": category,
-                        "severity": severity,
-                        "passed": passed,
-                        "condition": condition,
-                        "details": [],
-                    }
+        check is an existing pending ComplianceCheck to fill in with the
+        results of every rule pack; without one a new check is created.
+        Pass checks instead, one per rule pack (None entries create new
+        checks), to get a separate check per pack; each also carries the
+        shared clash results. With save=False the checks are left unsaved in
+        self.checks (self.check is the first), e.g. for bulk insertion. The
+        engine can be reused for several models.
+
+        Each rule result records its wall time and the part of it spent
+        resolving metrics under "timing"; check.timings holds the totals and
+        the clash phase times, all in ms.
+
+        Returns the results of every pack followed by the clash entries.
+        """
+        self.results = []
+        self.check = None
+        self.checks = []
+        self.detector.results = {}
+        from .models import ComplianceCheck, MetricsIndex
+        from .result_records import stored_clashes, write_records
+
+        # Metrics index sections are built on first use, or reused from an
+        # earlier check of the same file content
+        stored = None
+        if content_hash:
+            stored = (
+                MetricsIndex.objects.filter(content_hash=content_hash)
+                .values_list("data", flat=True)
+                .first()
+            )
+        metrics = ModelMetrics(ifc_file, data=stored)
+        known_sections = set(metrics.sections)
+
+        pack_results = []
+        done = 0
+        for pack in self.packs:
+            results = []
+            for compiled in pack:
+                self._report("rules", done / len(self.rules))
+                done += 1
+                results.append(self._evaluate_rule(compiled, metrics))
+            pack_results.append(results)
+        self._report("rules", 1.0)
+        if save and content_hash and set(metrics.sections) - known_sections:
+            try:
+                MetricsIndex.objects.update_or_create(
+                    content_hash=content_hash, defaults={"data": metrics.data}
                 )
-                logger.debug(f"Rule '{rule_name}' -> {passed}")
             except Exception as e:
-                logger.warning(f"Rule evaluation failed for '{rule.get('name')}': {e}")
-                self.results.append(
-                    {
-                        "rule": rule.get("name", "Unknown"),
-                        "passed": False,
-                        "error": str(e),
-                    }
-                )
+                logger.error(f"Failed to store metrics index: {e}")
 
-        # Advanced clash detection if enabled
+        # Advanced clash detection if enabled, shared by every pack
+        clash_entries = []
         if include_clash:
             try:
-                clash_results = self.detector.detect_clashes(ifc_string)
-                # Convert clash results to rule format
-                hard_clash_passed = clash_results["summary"]["hard_clashes"] == 0
-                self.results.append(
-                    {
-                        "rule": "clash_detection_hard",
-                        "category": "clash",
-                        "severity": "critical",
-                        "passed": hard_clash_passed,
-                        "details": clash_results["clashes"][:10],  # Top 10
-                    }
-                )
-
-                soft_clash_passed = clash_results["summary"]["soft_clashes"] == 0
-                self.results.append(
-                    {
-                        "rule": "clash_detection_soft",
-                        "category": "clash",
-                        "severity": "warning",
-                        "passed": soft_clash_passed,
-                        "details": clash_results["clashes"][10:20],  # Next 10
+                baseline = None
+                if baseline_check is not None and baseline_check.ifc_content_hash:
+                    baseline = {
+                        "content_hash": baseline_check.ifc_content_hash,
+                        "clash_results": dict(
+                            baseline_check.clash_results,
+                            clashes=stored_clashes(baseline_check),
+                        ),
                     }
+                clash_results = self.detector.detect_clashes(
+                    ifc_file, content_hash=content_hash, baseline=baseline
                 )
+                clash_entries = self.clash_rule_entries(clash_results)
                 logger.info(f"Clash detection: {clash_results['summary']}")
             except Exception as e:
                 logger.error(f"Clash detection failed: {e}")
-                self.results.append(
+                clash_entries = [
                     {
                         "rule": "clash_detection",
                         "passed": False,
                         "error": f"Clash detection failed: {e}",
                     }
-                )
+                ]
 
-        # Save to DB
-        from .models import ComplianceCheck
+        if len(self.packs) > 1 and checks is None:
+            # Combined check: label each result with the pack it came from
+            for i, results in enumerate(pack_results):
+                name = self.pack_names[i] if i < len(self.pack_names) else str(i)
+                for result in results:
+                    result["rule_pack"] = name
+        self.results = [r for results in pack_results for r in results]
+        self.results.extend(clash_entries)
 
-        try:
-            check = ComplianceCheck.objects.create(
-                model_id=model_id, rule_pack="evaluated", results=self.results
-            )
-            # Determine overall status
-            overall_passed = all(
-                r.get("passed", True) for r in self.results if "error" not in r
-            )
-            check.status = "passed" if overall_passed else "failed"
-            check.clash_results = self.detector.results if include_clash else {}
-            check.save()
-            logger.info(
-                f"ComplianceCheck saved: model={model_id}, status={check.status}"
-            )
-        except Exception as e:
-            logger.error(f"Failed to save ComplianceCheck: {e}")
+        clash_timings = (
+            self.detector.results.get("timings", {}) if include_clash else {}
+        )
+
+        # Save to DB
+        self._report("save", 0.0)
+        if checks is None:
+            targets = [(check, self.results)]
+        else:
+            targets = [
+                (pack_check, results + clash_entries)
+                for pack_check, results in zip(checks, pack_results)
+            ]
+        for i, (target, results) in enumerate(targets):
+            try:
+                if target is None:
+                    target = ComplianceCheck(
+                        generated_ifc_id=model_id,
+                        rule_pack=self._check_label(i, combined=checks is None),
+                    )
+                target.results = results
+                target.ifc_content_hash = content_hash or ""
+                target.status = self.overall_status(results)
+                if include_clash:
+                    # Only groups and the summary are stored on the check; the
+                    # full list is written to ClashRecord rows
+                    target.clash_results = self.detector.compact_results(
+                        self.detector.results
+                    )
+                    target.clashes = self.detector.results.get("clashes", [])
+                else:
+                    target.clash_results = {}
+                target.timings = self._check_timings(results, clash_timings)
+                target.update_summary()
+                if include_clash and self.detector.results.get("incremental"):
+                    target.base_check = baseline_check
+                self.checks.append(target)
+                if save:
+                    target.save()
+                    write_records([target])
+                    logger.info(
+                        f"ComplianceCheck saved: model={model_id}, status={target.status}"
+                    )
+            except Exception as e:
+                logger.error(f"Failed to save ComplianceCheck: {e}")
+        self.check = self.checks[0] if self.checks else None
+        self._report("save", 1.0)
 
         return self.results
 
-    def _evaluate_condition(self, condition, ifc_file):
-        """
-        Evaluate a rule condition string.
-        Examples:
-        - "wall_count > 5" → counts IfcWall elements
-        - "avg_height < 30" → averages story heights
-        - "has_fire_rating" → checks for fire properties
-        """
-        condition = condition.strip()
+    def _check_label(self, index, combined):
+        """rule_pack value for a check the engine creates itself."""
+        if combined:
+            return ", ".join(self.pack_names)[:255] or "evaluated"
+        if index < len(self.pack_names):
+            return self.pack_names[index]
+        return "evaluated"
 
-        # Simple heuristics (not a full expression evaluator)
-        if "wall_count" in condition:
-            wall_count = len(ifc_file.by_type("IfcWall"))
-            return self._compare_value(
-                wall_count, condition.replace("wall_count", str(wall_count))
-            )
+    @staticmethod
+    def _check_timings(results, clash_timings):
+        timed = [r["timing"] for r in results if "timing" in r]
+        rules_ms = sum(t["total_ms"] for t in timed)
+        clash_ms = sum(clash_timings.values())
+        return {
+            "rules_ms": round(rules_ms, 3),
+            "metrics_ms": round(sum(t["metrics_ms"] for t in timed), 3),
+            "clash_ms": clash_timings,
+            "total_ms": round(rules_ms + clash_ms, 3),
+        }
 
-        if "column_count" in condition:
-            col_count = len(ifc_file.by_type("IfcColumn"))
-            return self._compare_value(
-                col_count, condition.replace("column_count", str(col_count))
-            )
+    @classmethod
+    def _evaluate_rule(cls, compiled, metrics):
+        rule = compiled.rule
+        rule_name = rule.get("name", "Unknown")
+        if compiled.error:
+            logger.warning(f"Invalid condition for '{rule_name}': {compiled.error}")
+            return {"rule": rule_name, "passed": False, "error": compiled.error}
 
-        if "beam_count" in condition:
-            beam_count = len(ifc_file.by_type("IfcBeam"))
-            return self._compare_value(
-                beam_count, condition.replace("beam_count", str(beam_count))
-            )
+        resolving = [0.0]  # Time spent in metrics.resolve, including index builds
+        values = {}
+        elements = rule.get("elements")
 
-        if "has_fire_rating" in condition:
-            # Check for fire rating properties
-            for obj in ifc_file:
-                if hasattr(obj, "IsDefinedBy"):
-                    for rel in obj.IsDefinedBy:
-                        if hasattr(rel, "RelatingPropertyDefinition"):
-                            pset = rel.RelatingPropertyDefinition
-                            if hasattr(pset, "HasProperties"):
-                                for prop in pset.HasProperties:
-                                    if "fire" in str(prop.Name).lower():
-                                        return True
-            return False
-
-        # Default: pass (conservative)
-        logger.debug(f"Condition not recognized, defaulting to True: {condition}")
-        return True
+        def resolve(path):
+            started = time.perf_counter()
+            try:
+                value = metrics.resolve(path, elements)
+            finally:
+                resolving[0] += time.perf_counter() - started
+            values[path] = _value_summary(value)
+            return value
+
+        started = time.perf_counter()
+        result = cls._run_rule(compiled, resolve)
+        if values:
+            result["values"] = values
+        result["timing"] = {
+            "total_ms": round((time.perf_counter() - started) * 1000, 3),
+            "metrics_ms": round(resolving[0] * 1000, 3),
+        }
+        return result
 
     @staticmethod
-    def _compare_value(value, expression):
-        """Compare value against expression like '> 5' or '< 30'."""
+    def _run_rule(compiled, resolve):
+        rule = compiled.rule
+        rule_name = rule.get("name", "Unknown")
+        result = {
+            "rule": rule_name,
+            "category": rule.get("category", "general"),
+            "severity": rule.get("severity", "info"),
+            "passed": None,
+            "condition": rule.get("condition", "true"),
+            "details": [],
+        }
         try:
-            # Extract operator and threshold
-            match = re.match(r".*?([<>=]+)\s*(\d+\.?\d*)", expression)
-            if match:
-                op, threshold = match.groups()
-                threshold = float(threshold)
-
-                if op == ">":
-                    return value > threshold
-                elif op == "<":
-                    return value < threshold
-                elif op == ">=":
-                    return value >= threshold
-                elif op == "<=":
-                    return value <= threshold
-                elif op == "==":
-                    return value == threshold
-        except (ValueError, AttributeError, IndexError) as e:
-            logger.warning(f"Could not evaluate comparison: {expression}, error: {e}")
-
-        return True  # Conservative default
+            result["passed"] = compiled.condition.evaluate(resolve)
+        except UnknownMetricError as e:
+            # Conservative default: a rule the model cannot answer does not fail
+            result["passed"] = True
+            result["skipped"] = f"Metric not available: {e.args[0]}"
+        except RuleEvaluationError as e:
+            logger.warning(f"Rule evaluation failed for '{rule_name}': {e}")
+            return {"rule": rule_name, "passed": False, "error": str(e)}
+        logger.debug(f"Rule '{rule_name}' -> {result['passed']}")
+        return result
+
+    def _report(self, phase, fraction):
+        if self.progress:
+            self.progress(phase, fraction)
+
+    @staticmethod
+    def overall_status(results):
+        """passed unless a rule failed; rules that errored do not count."""
+        passed = all(r.get("passed", True) for r in results if "error" not in r)
+        return "passed" if passed else "failed"
+
+    @staticmethod
+    def clash_rule_entries(clash_results, preview=10):
+        """
+        Convert clash results to rule format.
+
+        Each entry previews the first clash groups of its type; members are
+        paged through the check's clashes endpoint with ?group=<id>.
+        """
+        summary = clash_results["summary"]
+        hard = [g for g in clash_results["groups"] if g["type"] == "hard"]
+        soft = [g for g in clash_results["groups"] if g["type"] == "soft"]
+        return [
+            {
+                "rule": "clash_detection_hard",
+                "category": "clash",
+                "severity": "critical",
+                "passed": summary["hard_clashes"] == 0,
+                "clash_count": summary["hard_clashes"],
+                "details": hard[:preview],
+            },
+            {
+                "rule": "clash_detection_soft",
+                "category": "clash",
+                "severity": "warning",
+                "passed": summary["soft_clashes"] == 0,
+                "clash_count": summary["soft_clashes"],
+                "details": soft[:preview],
+            },
+        ]
@@ -0,0 +1,366 @@
+# compliance_engine/rule_expressions.py
+"""
+Rule condition language for rule packs.
+
+Conditions are parsed once into an AST and compiled into nested closures,
+so evaluating a rule is a few function calls plus one lookup per metric:
+
+    all_walls.thickness >= 0.3
+    column_spacing.min >= 4.0 AND column_spacing.max <= 8.0
+    stairwell_pressurized == true AND pressurization_power == 'generator_backed'
+    NOT (has_fire_rating OR fire_rating_exempt == true)
+    storey.elevation >= -3.5 AND max_span <= 1.2e1
+
+Grammar (keywords are case-insensitive):
+
+    expr       := and_expr (OR and_expr)*
+    and_expr   := not_expr (AND not_expr)*
+    not_expr   := NOT not_expr | comparison
+    comparison := operand (("==" | "!=" | ">=" | "<=" | ">" | "<") operand)?
+    operand    := "-" operand | number | string | true | false | path
+                | "(" expr ")"
+    number     := digits ("." digits)? (("e" | "E") ("+" | "-")? digits)?
+    path       := name ("." name)*
+
+Metric paths are resolved through a callable supplied at evaluation time.
+A list value (e.g. every wall's thickness) satisfies a comparison only if
+all of its items do.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, FrozenSet, List, Tuple
+
+import yaml
+
+_TOKEN = re.compile(
+    r"""\s*(?:
+        (?P<number>(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)
+      | (?P<string>"[^"]*"|'[^']*')
+      | (?P<op>==|!=|>=|<=|>|<|\(|\)|-)
+      | (?P<name>[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*)
+    )""",
+    re.VERBOSE,
+)
+_KEYWORDS = {"and", "or", "not", "true", "false"}
+_COMPARISONS = {
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    ">=": lambda a, b: a >= b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    "<": lambda a, b: a < b,
+}
+
+
+class RuleSyntaxError(ValueError):
+    """A condition string does not match the rule condition grammar."""
+
+
+class RuleEvaluationError(TypeError):
+    """A comparison was applied to values of incompatible types."""
+
+
+class UnknownMetricError(LookupError):
+    """A condition references a metric the model cannot provide."""
+
+
+# ==================== AST ====================
+
+
+@dataclass(frozen=True)
+class Literal:
+    value: object
+
+
+@dataclass(frozen=True)
+class Metric:
+    path: str
+
+
+@dataclass(frozen=True)
+class Neg:
+    operand: object
+
+
+@dataclass(frozen=True)
+class Compare:
+    op: str
+    left: object
+    right: object
+
+
+@dataclass(frozen=True)
+class BoolOp:
+    op: str  # "and" / "or"
+    operands: Tuple
+
+
+@dataclass(frozen=True)
+class Not:
+    operand: object
+
+
+# ==================== Parsing ====================
+
+
+def _tokenize(text: str) -> List[Tuple[str, object]]:
+    tokens, pos = [], 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if not match or match.end() == pos:
+            raise RuleSyntaxError(f"Unexpected character at {pos} in {text!r}")
+        pos = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "number":
+            is_float = any(c in value for c in ".eE")
+            tokens.append(("literal", float(value) if is_float else int(value)))
+        elif kind == "string":
+            tokens.append(("literal", value[1:-1]))
+        elif kind == "name" and value.lower() in _KEYWORDS:
+            keyword = value.lower()
+            if keyword in ("true", "false"):
+                tokens.append(("literal", keyword == "true"))
+            else:
+                tokens.append(("keyword", keyword))
+        else:
+            tokens.append((kind, value))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    def parse(self):
+        if not self.tokens:
+            raise RuleSyntaxError("Empty condition")
+        node = self._expr()
+        if self.pos != len(self.tokens):
+            raise RuleSyntaxError(
+                f"Unexpected {self.tokens[self.pos][1]!r} in {self.text!r}"
+            )
+        return node
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _accept(self, kind, value=None) -> bool:
+        token_kind, token_value = self._peek()
+        if token_kind == kind and (value is None or token_value == value):
+            self.pos += 1
+            return True
+        return False
+
+    def _expr(self):
+        operands = [self._and_expr()]
+        while self._accept("keyword", "or"):
+            operands.append(self._and_expr())
+        return operands[0] if len(operands) == 1 else BoolOp("or", tuple(operands))
+
+    def _and_expr(self):
+        operands = [self._not_expr()]
+        while self._accept("keyword", "and"):
+            operands.append(self._not_expr())
+        return operands[0] if len(operands) == 1 else BoolOp("and", tuple(operands))
+
+    def _not_expr(self):
+        if self._accept("keyword", "not"):
+            return Not(self._not_expr())
+        return self._comparison()
+
+    def _comparison(self):
+        left = self._operand()
+        kind, value = self._peek()
+        if kind == "op" and value in _COMPARISONS:
+            self.pos += 1
+            return Compare(value, left, self._operand())
+        return left
+
+    def _operand(self):
+        if self._accept("op", "-"):
+            operand = self._operand()
+            if isinstance(operand, Literal) and _is_number(operand.value):
+                return Literal(-operand.value)
+            return Neg(operand)
+        kind, value = self._peek()
+        if kind == "literal":
+            self.pos += 1
+            return Literal(value)
+        if kind == "name":
+            self.pos += 1
+            return Metric(value)
+        if self._accept("op", "("):
+            node = self._expr()
+            if not self._accept("op", ")"):
+                raise RuleSyntaxError(f"Missing ')' in {self.text!r}")
+            return node
+        found = "end of condition" if kind is None else repr(value)
+        raise RuleSyntaxError(f"Expected a value, found {found} in {self.text!r}")
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def parse_condition(text: str):
+    """Parse a condition string into its AST."""
+    return _Parser(str(text)).parse()
+
+
+# ==================== Compilation ====================
+
+
+def _coerce_pair(a, b):
+    """Bring two scalar operands to a common comparable type."""
+    if isinstance(a, bool) or isinstance(b, bool):
+        if isinstance(a, bool) and isinstance(b, bool):
+            return a, b
+        raise RuleEvaluationError(f"Cannot compare {a!r} with {b!r}")
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return a, b
+    if isinstance(a, str) and isinstance(b, str):
+        return a.casefold(), b.casefold()
+    # IFC property values often arrive as text, e.g. FireRating "60"
+    try:
+        return float(a), float(b)
+    except (TypeError, ValueError):
+        raise RuleEvaluationError(f"Cannot compare {a!r} with {b!r}")
+
+
+def _compile(node) -> Callable:
+    if isinstance(node, Literal):
+        value = node.value
+        return lambda resolve: value
+
+    if isinstance(node, Metric):
+        path = node.path
+        return lambda resolve: resolve(path)
+
+    if isinstance(node, Not):
+        operand = _compile(node.operand)
+        return lambda resolve: not _truth(operand(resolve))
+
+    if isinstance(node, Neg):
+        operand = _compile(node.operand)
+        return lambda resolve: _negate(operand(resolve))
+
+    if isinstance(node, BoolOp):
+        operands = tuple(_compile(operand) for operand in node.operands)
+        if node.op == "and":
+            return lambda resolve: all(_truth(f(resolve)) for f in operands)
+        return lambda resolve: any(_truth(f(resolve)) for f in operands)
+
+    if isinstance(node, Compare):
+        left, right = _compile(node.left), _compile(node.right)
+        compare = _COMPARISONS[node.op]
+        ordering = node.op not in ("==", "!=")
+
+        def evaluate(resolve):
+            a, b = left(resolve), right(resolve)
+            lhs = a if isinstance(a, (list, tuple)) else (a,)
+            rhs = b if isinstance(b, (list, tuple)) else (b,)
+            for x in lhs:
+                for y in rhs:
+                    cx, cy = _coerce_pair(x, y)
+                    if ordering and isinstance(cx, bool):
+                        raise RuleEvaluationError(f"Cannot order booleans in {node.op}")
+                    if not compare(cx, cy):
+                        return False
+            return True
+
+        return evaluate
+
+    raise RuleSyntaxError(f"Unknown node {node!r}")
+
+
+def _negate(value):
+    if isinstance(value, (list, tuple)):
+        return [_negate(item) for item in value]
+    if _is_number(value):
+        return -value
+    if isinstance(value, str):
+        # Numeric text, as with comparisons
+        try:
+            return -float(value)
+        except ValueError:
+            pass
+    raise RuleEvaluationError(f"Cannot negate {value!r}")
+
+
+def _truth(value) -> bool:
+    if isinstance(value, (list, tuple)):
+        return all(_truth(item) for item in value)
+    return bool(value)
+
+
+def _metric_paths(node) -> FrozenSet[str]:
+    if isinstance(node, Metric):
+        return frozenset([node.path])
+    if isinstance(node, (Not, Neg)):
+        return _metric_paths(node.operand)
+    if isinstance(node, Compare):
+        return _metric_paths(node.left) | _metric_paths(node.right)
+    if isinstance(node, BoolOp):
+        return frozenset().union(*(_metric_paths(n) for n in node.operands))
+    return frozenset()
+
+
+class CompiledCondition:
+    """A parsed condition ready to evaluate against a metric resolver."""
+
+    __slots__ = ("source", "ast", "metrics", "_evaluate")
+
+    def __init__(self, source: str):
+        self.source = source
+        self.ast = parse_condition(source)
+        self.metrics = _metric_paths(self.ast)
+        self._evaluate = _compile(self.ast)
+
+    def evaluate(self, resolve: Callable[[str], object]) -> bool:
+        """
+        Evaluate with resolve(path) supplying metric values.
+
+        resolve raises UnknownMetricError for metrics the model cannot provide.
+        """
+        return _truth(self._evaluate(resolve))
+
+    def __repr__(self):
+        return f"CompiledCondition({self.source!r})"
+
+
+@lru_cache(maxsize=1024)
+def compile_condition(text: str) -> CompiledCondition:
+    """Compile a condition string, reusing earlier compilations of the same text."""
+    return CompiledCondition(text)
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    rule: dict
+    condition: CompiledCondition = None
+    error: str = None  # Set when the condition does not parse
+
+
+@lru_cache(maxsize=64)
+def compile_rule_pack(rule_pack_yaml: str) -> Tuple[CompiledRule, ...]:
+    """
+    Parse and compile every rule of a rule pack once per distinct YAML text.
+
+    Raises yaml.YAMLError for invalid YAML; rules whose condition does not
+    parse are kept with their error so the engine can report them.
+    """
+    rules = (yaml.safe_load(rule_pack_yaml) or {}).get("rules", []) or []
+    compiled = []
+    for rule in rules:
+        try:
+            condition = compile_condition(str(rule.get("condition", "true")))
+            compiled.append(CompiledRule(rule, condition))
+        except RuleSyntaxError as e:
+            compiled.append(CompiledRule(rule, error=str(e)))
+    return tuple(compiled)
@@ -1,5 +1,10 @@
 from rest_framework import serializers
-from .models import ComplianceCheck, RulePack
+from .models import (
+    ComplianceBatch,
+    ComplianceCheck,
+    ComplianceResult,
+    RulePack,
+)
 from apps.parametric_generator.serializers import GeneratedIFCSerializer
 
 
@@ -24,8 +29,63 @@ class ComplianceCheckSerializer(serializers.ModelSerializer):
             "generated_ifc",
             "rule_pack",
             "status",
-            "results",
-            "clash_results",
+            "rule_count",
+            "passed_count",
+            "failed_count",
+            "error_count",
+            "critical_failed_count",
+            "hard_clash_count",
+            "soft_clash_count",
+            "ifc_content_hash",
+            "base_check",
+            "batch",
+            "timings",
             "checked_at",
             "updated_at",
         ]
+
+
+class ComplianceResultSerializer(serializers.ModelSerializer):
+    """Serializer for ComplianceResult model."""
+
+    class Meta:
+        model = ComplianceResult
+        fields = [
+            "id",
+            "compliance_check",
+            "rule",
+            "rule_pack",
+            "category",
+            "severity",
+            "passed",
+            "condition",
+            "metric_value",
+            "skipped",
+            "error",
+            "total_ms",
+            "metrics_ms",
+        ]
+
+
+class ComplianceBatchSerializer(serializers.ModelSerializer):
+    """Serializer for ComplianceBatch model."""
+
+    completed = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ComplianceBatch
+        fields = [
+            "id",
+            "rule_pack",
+            "filters",
+            "status",
+            "total",
+            "completed",
+            "summary",
+            "task_id",
+            "created_at",
+            "completed_at",
+        ]
+
+    def get_completed(self, obj):
+        return obj.checks.count()
@@ -0,0 +1,121 @@
+# compliance_engine/spatial_partition.py
+"""
+Spatial grid partitioning of clash sets for distributed clash detection.
+
+The model's bounding volume is cut into a grid sized so that each cell
+holds roughly chunk_size elements. An element joins every cell its bbox
+touches after inflating by the overlap margin (the broad-phase tolerance),
+so any pair that can clash shares at least one cell. Pairs that straddle
+cell boundaries are candidates in several cells, but only the cell returned
+by owning_cell tests them, so cell results add up without deduplication.
+"""
+
+import math
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+MIN_EXTENT = 1e-3  # Flat models still get a finite cell thickness
+
+
+def partition_clash_sets(
+    geometry: Dict, groups, chunk_size: int, fan_out: int, margin: float
+) -> List[Dict]:
+    """
+    Split (clash_set, group_a, group_b) triples into grid cells and pack the
+    cells into at most fan_out task payloads of similar element counts.
+
+    Each payload is {"grid": grid, "cells": [{"index": [i, j, k], "groups":
+    [[cs, a, b], ...]}]} with group records kept as (GlobalId, name) pairs
+    and grid the layout owning_cell needs.
+    """
+    ids = sorted({gid for _, a, b in groups for gid, _ in a + b})
+    if not ids:
+        return []
+    bboxes = np.array([geometry[gid]["bbox"] for gid in ids], dtype=float)
+    origin = bboxes[:, :3].min(axis=0) - margin
+    extent = np.maximum(bboxes[:, 3:].max(axis=0) + margin - origin, MIN_EXTENT)
+    dims = _grid_dims(extent, math.ceil(len(ids) / max(chunk_size, 1)))
+    cell_size = extent / dims
+    grid = {
+        "origin": origin.tolist(),
+        "cell_size": cell_size.tolist(),
+        "dims": dims.tolist(),
+        "margin": margin,
+    }
+
+    lo = np.clip(
+        ((bboxes[:, :3] - margin - origin) // cell_size).astype(int), 0, dims - 1
+    )
+    hi = np.clip(
+        ((bboxes[:, 3:] + margin - origin) // cell_size).astype(int), 0, dims - 1
+    )
+    members = {}
+    for gid, (x0, y0, z0), (x1, y1, z1) in zip(ids, lo.tolist(), hi.tolist()):
+        for cell in _cell_range(x0, y0, z0, x1, y1, z1):
+            members.setdefault(cell, set()).add(gid)
+
+    names = [(cs, dict(group_a), dict(group_b)) for cs, group_a, group_b in groups]
+    cells = []
+    for index, cell_ids in sorted(members.items()):
+        cell_groups = []
+        for cs, names_a, names_b in names:
+            a = [(gid, names_a[gid]) for gid in sorted(cell_ids) if gid in names_a]
+            b = [(gid, names_b[gid]) for gid in sorted(cell_ids) if gid in names_b]
+            if a and b and (cs["group_a"] != cs["group_b"] or len(a) > 1):
+                cell_groups.append([cs, a, b])
+        if cell_groups:
+            cells.append(
+                {"index": list(index), "groups": cell_groups, "size": len(cell_ids)}
+            )
+
+    return [{"grid": grid, **payload} for payload in _pack(cells, fan_out)]
+
+
+def owning_cell(grid: Dict, bbox_a, bbox_b) -> Tuple[int, int, int]:
+    """
+    Index of the cell that tests a candidate pair: the one holding the min
+    corner of the overlap of both bboxes inflated by the margin.
+
+    That corner is the inflated min corner of one of the two elements, so
+    it falls in the same cell partition_clash_sets started that element
+    from, and inside the other element's range; both elements are members.
+    """
+    corner = np.maximum(bbox_a[:3], bbox_b[:3]) - grid["margin"]
+    index = (corner - np.asarray(grid["origin"])) // np.asarray(grid["cell_size"])
+    return tuple(np.clip(index.astype(int), 0, np.asarray(grid["dims"]) - 1).tolist())
+
+
+def _grid_dims(extent: np.ndarray, n_cells: int) -> np.ndarray:
+    """Largest cubic-ish grid over extent with at most n_cells cells."""
+    if n_cells <= 1:
+        return np.ones(3, dtype=int)
+    # Cell count only shrinks as the edge grows, so bisect on the edge length
+    low, high = 0.0, float(extent.max())
+    for _ in range(60):
+        edge = (low + high) / 2
+        if edge > 0 and np.prod(np.ceil(extent / edge)) <= n_cells:
+            high = edge
+        else:
+            low = edge
+    return np.maximum(np.ceil(extent / high), 1).astype(int)
+
+
+def _cell_range(x0, y0, z0, x1, y1, z1):
+    for x in range(x0, x1 + 1):
+        for y in range(y0, y1 + 1):
+            for z in range(z0, z1 + 1):
+                yield (x, y, z)
+
+
+def _pack(cells: List[Dict], fan_out: int) -> List[Dict]:
+    """Greedy largest-first packing of cells into at most fan_out payloads."""
+    payloads: List[Tuple[int, List[Dict]]] = [
+        (0, []) for _ in range(min(max(fan_out, 1), len(cells)))
+    ]
+    for cell in sorted(cells, key=lambda c: -c["size"]):
+        slot = min(range(len(payloads)), key=lambda k: payloads[k][0])
+        load, batch = payloads[slot]
+        batch.append({"index": cell["index"], "groups": cell["groups"]})
+        payloads[slot] = (load + cell["size"], batch)
+    return [{"cells": batch} for _, batch in payloads]
@@ -0,0 +1,603 @@
+from asgiref.sync import async_to_sync
+from celery import shared_task, chord, group
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.utils import timezone
+import logging
+
+from .clash_detector import AdvancedClashDetector
+from .clash_grouping import group_clashes
+from .geometry_store import GeometryStore
+from .models import ComplianceBatch, ComplianceCheck, RulePack
+from .result_cache import bulk_store, find_cached, result_cache_key, store_result
+from .result_records import save_failure, stored_clashes, write_records
+from .rule_expressions import compile_rule_pack
+from apps.parametric_generator.models import GeneratedIFC
+from .rule_engine import RuleEngine
+from .spatial_partition import owning_cell, partition_clash_sets
+
+logger = logging.getLogger(__name__)
+
+# Overall progress range (percent) covered by each evaluation phase
+PHASE_PROGRESS = {
+    "parse": (0, 10),
+    "rules": (10, 25),
+    "tessellation": (25, 60),
+    "broad_phase": (60, 70),
+    "narrow_phase": (70, 95),
+    "save": (95, 100),
+}
+
+
+def _detector(tolerance_hard, tolerance_soft):
+    return AdvancedClashDetector(
+        tolerance_hard=tolerance_hard,
+        tolerance_soft=tolerance_soft,
+        workers=settings.BIMFLOW_CLASH_WORKERS,
+        geometry_store=GeometryStore(
+            settings.BIMFLOW_GEOMETRY_CACHE_DIR,
+            max_bytes=settings.BIMFLOW_GEOMETRY_CACHE_MAX_MB * 1024 * 1024,
+        ),
+        group_radius=settings.BIMFLOW_CLASH_GROUP_RADIUS,
+    )
+
+
+def run_compliance_check(
+    checks,
+    rule_packs,
+    include_clash=True,
+    tolerance_hard=0.01,
+    tolerance_soft=0.05,
+    incremental=True,
+    progress=None,
+    cache_keys=None,
+):
+    """
+    Evaluate rule_packs (and optionally clash detection) into pending checks.
+
+    checks holds one check per rule pack, or a single check that receives
+    the combined results of every pack. The model is parsed, indexed and
+    clash tested once however many packs there are.
+
+    Shared by evaluate_compliance_task and the blocking evaluate_ifc path.
+    cache_keys, aligned with checks, stores the completed checks in the
+    result cache.
+    """
+    generated_ifc = checks[0].generated_ifc
+    if progress:
+        progress("parse", 0.0)
+    ifc_file = generated_ifc.open_ifc()
+    content_hash = generated_ifc.get_content_hash()
+    if progress:
+        progress("parse", 1.0)
+
+    engine = RuleEngine(
+        [rule_pack.yaml_content for rule_pack in rule_packs],
+        tolerance_hard=tolerance_hard,
+        tolerance_soft=tolerance_soft,
+        clash_workers=settings.BIMFLOW_CLASH_WORKERS,
+        progress=progress,
+        pack_names=[rule_pack.name for rule_pack in rule_packs],
+    )
+    # Previous revision's check, so unchanged elements are not re-tested
+    baseline_check = None
+    if include_clash and incremental:
+        baseline_check = (
+            ComplianceCheck.objects.filter(generated_ifc=generated_ifc)
+            .exclude(id__in=[check.id for check in checks])
+            .exclude(ifc_content_hash="")
+            .exclude(clash_results={})
+            .first()
+        )
+    combined = len(checks) == 1
+    engine.evaluate(
+        ifc_file,
+        generated_ifc.id,
+        include_clash,
+        content_hash=content_hash,
+        baseline_check=baseline_check,
+        check=checks[0] if combined else None,
+        checks=None if combined else checks,
+    )
+    for check, cache_key in zip(checks, cache_keys or []):
+        if cache_key:
+            store_result(check, cache_key)
+    return checks
+
+
+def tolerance_sweep_table(
+    generated_ifc, clash_sets=None, max_tolerance=None, compute=True
+):
+    """
+    Candidate-pair distance table of generated_ifc up to max_tolerance
+    (BIMFLOW_CLASH_SWEEP_MAX_TOLERANCE by default). The IFC is only parsed
+    when no stored table reaches max_tolerance; with compute=False None is
+    returned instead.
+    """
+    max_tolerance = max_tolerance or settings.BIMFLOW_CLASH_SWEEP_MAX_TOLERANCE
+    content_hash = generated_ifc.get_content_hash()
+    detector = _detector(max_tolerance, max_tolerance)
+    table = detector.stored_pair_distances(content_hash, clash_sets, max_tolerance)
+    if table is None and compute:
+        table = detector.pair_distances(
+            generated_ifc.open_ifc(), clash_sets, max_tolerance, content_hash
+        )
+        logger.info(
+            f"Computed {len(table['distance'])} pair distances up to "
+            f"{max_tolerance} m for IFC {generated_ifc.id} in {detector.timings}"
+        )
+    return table
+
+
+@shared_task
+def tolerance_sweep_task(ifc_id, clash_sets=None, max_tolerance=None):
+    """Compute and store the distance table tolerance_sweep counts from."""
+    generated_ifc = GeneratedIFC.objects.get(id=ifc_id)
+    table = tolerance_sweep_table(generated_ifc, clash_sets, max_tolerance)
+    return {
+        "ifc_id": ifc_id,
+        "max_tolerance": table["max_tolerance"],
+        "pairs": len(table["distance"]),
+    }
+
+
+@shared_task(bind=True)
+def evaluate_compliance_task(
+    self,
+    check_ids,
+    rule_pack_ids,
+    include_clash=True,
+    tolerance_hard=0.01,
+    tolerance_soft=0.05,
+    incremental=True,
+    cache_keys=None,
+):
+    """
+    Run a compliance check in the background, streaming phase progress to task_<id>.
+
+    check_ids has one pending check per rule pack in rule_pack_ids, or a
+    single check for their combined results.
+    """
+    channel_layer = get_channel_layer()
+    group_name = f"task_{self.request.id}"
+    last_sent = [-1, None]  # percent, phase
+
+    def send(status, progress, phase):
+        async_to_sync(channel_layer.group_send)(
+            group_name,
+            {
+                "type": "task_update",
+                "status": status,
+                "progress": progress,
+                "phase": phase,
+            },
+        )
+
+    def progress(phase, fraction):
+        start, end = PHASE_PROGRESS[phase]
+        percent = int(start + (end - start) * fraction)
+        # Per-rule callbacks are frequent and clash sets interleave the broad
+        # and narrow phases, so only send when overall progress moves forward
+        if percent > last_sent[0] or (
+            percent == last_sent[0] and phase != last_sent[1]
+        ):
+            last_sent[:] = [percent, phase]
+            send("running", percent, phase)
+
+    by_id = ComplianceCheck.objects.select_related("generated_ifc").in_bulk(check_ids)
+    checks = [by_id[check_id] for check_id in check_ids]
+    try:
+        rule_packs = RulePack.objects.in_bulk(rule_pack_ids)
+        run_compliance_check(
+            checks,
+            [rule_packs[rule_pack_id] for rule_pack_id in rule_pack_ids],
+            include_clash,
+            tolerance_hard,
+            tolerance_soft,
+            incremental,
+            progress=progress,
+            cache_keys=cache_keys,
+        )
+    except Exception as e:
+        logger.error(f"Compliance checks {check_ids} failed: {e}", exc_info=True)
+        for check in checks:
+            save_failure(check, str(e))
+        send("failed", 100, None)
+        raise
+
+    overall = "passed" if all(c.status == "passed" for c in checks) else "failed"
+    send(overall, 100, "save")
+    return {"status": overall, "check_ids": check_ids}
+
+
+@shared_task(bind=True)
+def batch_evaluate_task(
+    self,
+    batch_id,
+    ifc_ids,
+    rule_pack_id,
+    include_clash=False,
+    tolerance_hard=0.01,
+    tolerance_soft=0.05,
+    concurrency=None,
+):
+    """
+    Evaluate one rule pack across many models as a chord of at most
+    `concurrency` chunk tasks, each working through its share of models
+    sequentially, then aggregate with finish_batch_task.
+    """
+    batch = ComplianceBatch.objects.get(id=batch_id)
+    try:
+        rule_pack = RulePack.objects.get(id=rule_pack_id)
+        # Fail fast on a broken pack instead of once per model
+        compile_rule_pack(rule_pack.yaml_content)
+    except Exception as e:
+        logger.error(f"Compliance batch {batch_id} failed: {e}")
+        batch.status = "failed"
+        batch.summary = {"error": str(e)}
+        batch.save(update_fields=["status", "summary"])
+        raise
+
+    concurrency = max(
+        1, min(concurrency or settings.BIMFLOW_BATCH_CONCURRENCY, len(ifc_ids))
+    )
+    chunks = [ifc_ids[k::concurrency] for k in range(concurrency)]
+    batch.status = "running"
+    batch.save(update_fields=["status"])
+
+    finish = finish_batch_task.s(batch_id)
+    # A raising chunk or merge would otherwise leave the batch running
+    finish.link_error(fail_batch_task.s(batch_id))
+    if not ifc_ids:
+        finish.delay([])
+    else:
+        chord(
+            group(
+                evaluate_batch_chunk_task.s(
+                    batch_id,
+                    chunk,
+                    rule_pack_id,
+                    include_clash,
+                    tolerance_hard,
+                    tolerance_soft,
+                )
+                for chunk in chunks
+            )
+        )(finish)
+    logger.info(
+        f"Compliance batch {batch_id}: {len(ifc_ids)} models in {len(chunks)} chunks"
+    )
+    return {"status": "running", "batch_id": batch_id, "chunks": len(chunks)}
+
+
+@shared_task
+def evaluate_batch_chunk_task(
+    batch_id, ifc_ids, rule_pack_id, include_clash, tolerance_hard, tolerance_soft
+):
+    """Evaluate a share of a batch with one engine and bulk-insert the checks."""
+    rule_pack = RulePack.objects.get(id=rule_pack_id)
+    engine = RuleEngine(
+        rule_pack.yaml_content,
+        tolerance_hard=tolerance_hard,
+        tolerance_soft=tolerance_soft,
+        clash_workers=settings.BIMFLOW_CLASH_WORKERS,
+    )
+    checks, summary = [], _empty_batch_summary()
+    for generated_ifc in GeneratedIFC.objects.filter(id__in=ifc_ids):
+        try:
+            content_hash = generated_ifc.get_content_hash()
+            cache_key = result_cache_key(
+                content_hash,
+                rule_pack.yaml_content,
+                tolerance_hard,
+                tolerance_soft,
+                include_clash,
+            )
+            hit = find_cached(cache_key)
+            if hit is not None:
+                check = ComplianceCheck(
+                    generated_ifc=generated_ifc,
+                    status=hit.status,
+                    results=hit.results,
+                    clash_results=hit.clash_results,
+                    ifc_content_hash=content_hash,
+                )
+                check.clashes = stored_clashes(hit)
+                summary["cached"] += 1
+            else:
+                engine.evaluate(
+                    generated_ifc.open_ifc(),
+                    generated_ifc.id,
+                    include_clash,
+                    content_hash=content_hash,
+                    save=False,
+                )
+                check = engine.check
+                check.cache_key = cache_key
+        except Exception as e:
+            logger.warning(f"Batch {batch_id}: model {generated_ifc.id} failed: {e}")
+            check = ComplianceCheck(
+                generated_ifc=generated_ifc,
+                status="failed",
+                results=[{"rule": "evaluation", "passed": False, "error": str(e)}],
+            )
+        check.rule_pack = rule_pack.name
+        check.batch_id = batch_id
+        checks.append(check)
+        _add_to_batch_summary(summary, check)
+
+    bulk_store(checks)
+    return summary
+
+
+@shared_task
+def finish_batch_task(chunk_summaries, batch_id):
+    """Chord callback: merge chunk summaries into the batch."""
+    summary = _empty_batch_summary()
+    for chunk in chunk_summaries:
+        for key in ("evaluated", "passed", "failed", "errors", "cached"):
+            summary[key] += chunk[key]
+        for rule, count in chunk["rule_failures"].items():
+            summary["rule_failures"][rule] = (
+                summary["rule_failures"].get(rule, 0) + count
+            )
+    summary["rule_failures"] = dict(
+        sorted(summary["rule_failures"].items(), key=lambda item: -item[1])
+    )
+    summary["pass_rate"] = (
+        round(summary["passed"] / summary["evaluated"], 4)
+        if summary["evaluated"]
+        else 0.0
+    )
+
+    batch = ComplianceBatch.objects.get(id=batch_id)
+    batch.summary = summary
+    batch.status = "completed"
+    batch.completed_at = timezone.now()
+    batch.save(update_fields=["summary", "status", "completed_at"])
+    logger.info(f"Compliance batch {batch_id} completed: {summary}")
+    return {"batch_id": batch_id, "summary": summary}
+
+
+@shared_task
+def fail_batch_task(request, exc, traceback, batch_id):
+    """Chord errback: mark the batch failed when a chunk or the merge raised."""
+    logger.error(f"Compliance batch {batch_id} failed: {exc}")
+    ComplianceBatch.objects.filter(id=batch_id).update(
+        status="failed", summary={"error": str(exc)}
+    )
+
+
+def _empty_batch_summary():
+    return {
+        "evaluated": 0,
+        "passed": 0,
+        "failed": 0,
+        "errors": 0,
+        "cached": 0,
+        "rule_failures": {},
+    }
+
+
+def _add_to_batch_summary(summary, check):
+    summary["evaluated"] += 1
+    summary["passed" if check.status == "passed" else "failed"] += 1
+    for result in check.results:
+        if "error" in result:
+            summary["errors"] += 1
+        if not result.get("passed", True):
+            rule = result.get("rule", "Unknown")
+            summary["rule_failures"][rule] = summary["rule_failures"].get(rule, 0) + 1
+
+
+@shared_task(bind=True)
+def distributed_clash_task(
+    self,
+    check_id,
+    clash_sets=None,
+    tolerance_hard=0.01,
+    tolerance_soft=0.05,
+    soft_clearance=True,
+    chunk_size=None,
+    fan_out=None,
+):
+    """
+    Tessellate once, split the model into a spatial grid and fan the cells
+    out as a chord of clash_cell_task, merged by merge_clash_cells_task.
+
+    Cell workers read geometry from the sidecar, so BIMFLOW_GEOMETRY_CACHE_DIR
+    must be shared between the workers of one job.
+    """
+    check = ComplianceCheck.objects.select_related("generated_ifc").get(id=check_id)
+    try:
+        generated_ifc = check.generated_ifc
+        content_hash = generated_ifc.get_content_hash()
+        ifc_file = generated_ifc.open_ifc()
+
+        clash_sets = clash_sets or AdvancedClashDetector.DEFAULT_CLASH_SETS
+        detector = _detector(tolerance_hard, tolerance_soft)
+        element_bboxes = detector.prepare_geometry(ifc_file, clash_sets, content_hash)
+        groups = [
+            (
+                cs,
+                detector.group_records(ifc_file, cs["group_a"], element_bboxes),
+                detector.group_records(ifc_file, cs["group_b"], element_bboxes),
+            )
+            for cs in clash_sets
+        ]
+        soft_pairs_total = (
+            sum(
+                (
+                    len(a) * (len(a) - 1) // 2
+                    if cs["group_a"] == cs["group_b"]
+                    else len(a) * len(b)
+                )
+                for cs, a, b in groups
+            )
+            if soft_clearance
+            else 0
+        )
+
+        # Cells overlap by the broad-phase tolerance so no clashing pair is split
+        margin = (
+            max(tolerance_hard, tolerance_soft) if soft_clearance else tolerance_hard
+        )
+        payloads = partition_clash_sets(
+            detector.geometry,
+            groups,
+            chunk_size or settings.BIMFLOW_CLASH_CHUNK_SIZE,
+            fan_out or settings.BIMFLOW_CLASH_FAN_OUT,
+            margin,
+        )
+    except Exception as e:
+        logger.error(f"Distributed clash job failed for check {check_id}: {e}")
+        check.status = "failed"
+        check.clash_results = {"error": str(e)}
+        check.save(update_fields=["status", "clash_results", "updated_at"])
+        raise
+
+    run_settings = {
+        "tolerance_hard": tolerance_hard,
+        "tolerance_soft": tolerance_soft,
+        "soft_clearance": soft_clearance,
+        "clash_sets": clash_sets,
+    }
+    merge = merge_clash_cells_task.s(
+        check_id,
+        run_settings,
+        soft_pairs_total,
+        detector.failed_elements,
+        sum(len(p["cells"]) for p in payloads),
+        timings=detector.timings,
+    )
+    # A raising cell (e.g. its sidecar was evicted) or merge would otherwise
+    # leave the check pending
+    merge.link_error(fail_clash_check_task.s(check_id))
+    if payloads:
+        chord(
+            group(
+                clash_cell_task.s(
+                    content_hash,
+                    payload,
+                    tolerance_hard,
+                    tolerance_soft,
+                    soft_clearance,
+                )
+                for payload in payloads
+            )
+        )(merge)
+    else:
+        merge.delay([])
+
+    logger.info(
+        f"Distributed clash job for check {check_id}: {len(payloads)} tasks queued"
+    )
+    return {"status": "queued", "check_id": check_id, "tasks": len(payloads)}
+
+
+@shared_task
+def clash_cell_task(
+    content_hash, payload, tolerance_hard, tolerance_soft, soft_clearance
+):
+    """Run the clash sets of a batch of grid cells against the stored geometry."""
+    detector = _detector(tolerance_hard, tolerance_soft)
+    if not detector.load_geometry(content_hash):
+        raise RuntimeError(f"Geometry sidecar {content_hash} not found on this worker")
+
+    grid = payload["grid"]
+    clashes, soft_pairs_checked, pairs_skipped = [], 0, 0
+    for cell in payload["cells"]:
+        index = tuple(cell["index"])
+        groups = [
+            (cs, [tuple(r) for r in a], [tuple(r) for r in b])
+            for cs, a, b in cell["groups"]
+        ]
+        # Pairs near cell borders are candidates in several cells; each is
+        # tested only in the cell that owns it
+        found, stats = detector.run_clash_sets(
+            groups,
+            soft_clearance,
+            owns=lambda bbox_a, bbox_b: owning_cell(grid, bbox_a, bbox_b) == index,
+        )
+        clashes.extend(found)
+        soft_pairs_checked += stats["soft_pairs_checked"]
+        pairs_skipped += stats["pairs_skipped"]
+    return {
+        "clashes": clashes,
+        "soft_pairs_checked": soft_pairs_checked,
+        "pairs_skipped": pairs_skipped,
+        "timings": detector.timings,
+    }
+
+
+@shared_task
+def merge_clash_cells_task(
+    cell_results,
+    check_id,
+    run_settings,
+    soft_pairs_total,
+    failed_elements,
+    cell_count,
+    timings=None,
+):
+    """
+    Chord callback: combine the cell results and save the check.
+
+    Every pair is tested in exactly one cell, so clashes and counts add up
+    without deduplication. timings holds the coordinator's phase times; cell
+    phase times are added up, so they measure worker time rather than
+    elapsed time.
+    """
+    clashes, soft_pairs_checked, pairs_skipped = [], 0, 0
+    timings = dict(timings or {})
+    for result in cell_results:
+        clashes.extend(result["clashes"])
+        soft_pairs_checked += result["soft_pairs_checked"]
+        pairs_skipped += result["pairs_skipped"]
+        for phase, ms in result.get("timings", {}).items():
+            timings[phase] = timings.get(phase, 0.0) + ms
+
+    summary = AdvancedClashDetector.build_summary(
+        clashes,
+        {
+            "soft_pairs_total": soft_pairs_total,
+            "soft_pairs_checked": soft_pairs_checked,
+        },
+        len(failed_elements),
+    )
+    groups = group_clashes(clashes, settings.BIMFLOW_CLASH_GROUP_RADIUS)
+    summary["groups"] = len(groups)
+    summary["cells"] = cell_count
+    # Candidates a cell left to the cell owning them
+    summary["shared_pairs_skipped"] = pairs_skipped
+    clash_results = {
+        "clashes": clashes,
+        "groups": groups,
+        "summary": summary,
+        "failed_elements": failed_elements,
+        "settings": run_settings,
+        "incremental": None,
+        "timings": {phase: round(ms, 3) for phase, ms in timings.items()},
+    }
+
+    check = ComplianceCheck.objects.get(id=check_id)
+    check.results = check.results + RuleEngine.clash_rule_entries(clash_results)
+    check.clash_results = AdvancedClashDetector.compact_results(clash_results)
+    check.clashes = clashes
+    check.timings = dict(check.timings, clash_ms=clash_results["timings"])
+    check.status = RuleEngine.overall_status(check.results)
+    check.update_summary()
+    check.save()
+    write_records([check])
+    logger.info(f"Distributed clash detection for check {check_id}: {summary}")
+    return {"check_id": check_id, "summary": summary}
+
+
+@shared_task
+def fail_clash_check_task(request, exc, traceback, check_id):
+    """Chord errback: mark the check failed when a cell or the merge raised."""
+    logger.error(f"Distributed clash job failed for check {check_id}: {exc}")
+    save_failure(
+        ComplianceCheck.objects.get(id=check_id),
+        f"Distributed clash detection failed: {exc}",
+    )
@@ -0,0 +1,144 @@
+"""Models and meshes built by the compliance engine tests."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+import ifcopenshell
+import ifcopenshell.api
+import numpy as np
+from celery import current_app
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test import override_settings
+
+from apps.parametric_generator.models import GeneratedIFC, Project
+from apps.users.models import Organization, OrganizationMember
+
+
+def use_temp_storage(testcase):
+    """
+    Point MEDIA_ROOT and the geometry cache at temporary directories until
+    testcase finishes, so running the tests leaves nothing in the tree.
+    """
+    paths = []
+    for _ in range(2):
+        path = tempfile.mkdtemp()
+        testcase.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        paths.append(path)
+    storage = override_settings(
+        MEDIA_ROOT=paths[0], BIMFLOW_GEOMETRY_CACHE_DIR=Path(paths[1])
+    )
+    storage.enable()
+    testcase.addCleanup(storage.disable)
+    return paths
+
+
+def run_tasks_eagerly(testcase):
+    """
+    Run Celery tasks in-process, without a broker or result store, until
+    testcase finishes.
+    """
+    for option, value in (
+        ("CELERY_TASK_ALWAYS_EAGER", True),
+        ("CELERY_TASK_EAGER_PROPAGATES", True),
+        ("CELERY_BROKER_URL", "memory://"),
+        ("CELERY_RESULT_BACKEND", "cache+memory://"),
+    ):
+        testcase.addCleanup(
+            setattr, current_app.conf, option, current_app.conf.get(option)
+        )
+        current_app.conf[option] = value
+
+
+def make_box_model(n_walls=30, n_ducts=30, seed=0):
+    """IFC4 model of randomly placed walls and ducts in a 20 m cube."""
+    rng = np.random.default_rng(seed)
+    ifc = ifcopenshell.file(schema="IFC4")
+    ifcopenshell.api.run("root.create_entity", ifc, ifc_class="IfcProject", name="P")
+    ifcopenshell.api.run("unit.assign_unit", ifc)
+    model = ifcopenshell.api.run("context.add_context", ifc, context_type="Model")
+    body = ifcopenshell.api.run(
+        "context.add_context",
+        ifc,
+        context_type="Model",
+        context_identifier="Body",
+        target_view="MODEL_VIEW",
+        parent=model,
+    )
+    for ifc_class, count, length, thickness, height in (
+        ("IfcWall", n_walls, 4, 0.2, 3),
+        ("IfcDuctSegment", n_ducts, 2, 0.3, 0.3),
+    ):
+        for i in range(count):
+            element = ifcopenshell.api.run(
+                "root.create_entity", ifc, ifc_class=ifc_class, name=f"{ifc_class}{i}"
+            )
+            move(ifc, element, rng.uniform(0, 20, 3))
+            representation = ifcopenshell.api.run(
+                "geometry.add_wall_representation",
+                ifc,
+                context=body,
+                length=length,
+                height=height,
+                thickness=thickness,
+            )
+            ifcopenshell.api.run(
+                "geometry.assign_representation",
+                ifc,
+                product=element,
+                representation=representation,
+            )
+    return ifc
+
+
+def move(ifc, element, position):
+    matrix = np.eye(4)
+    matrix[:3, 3] = position
+    ifcopenshell.api.run(
+        "geometry.edit_object_placement", ifc, product=element, matrix=matrix
+    )
+
+
+def create_generated_ifc(ifc=None):
+    """A GeneratedIFC in a fresh organization, storing ifc when given."""
+    user = get_user_model().objects.create(username="u", email="u@x.com")
+    organization = Organization.objects.create(name="o", slug="o", owner=user)
+    OrganizationMember.objects.create(
+        user=user, organization=organization, is_active=True
+    )
+    project = Project.objects.create(
+        organization=organization,
+        user=user,
+        name="p",
+        project_number="P1",
+        project_type="IFC_BUILDING",
+    )
+    generated_ifc = GeneratedIFC.objects.create(
+        project=project, asset_type="building", status="completed"
+    )
+    if ifc is not None:
+        generated_ifc.ifc_file.save("model.ifc", ContentFile(ifc.to_string()))
+    return generated_ifc
+
+
+def clash_keys(results):
+    """Order-independent identity of every reported clash."""
+    return sorted(
+        (c["id_a"], c["id_b"], c["type"], round(c.get("distance", 0.0), 6))
+        for c in results["clashes"]
+    )
+
+
+def triangle_mesh(verts):
+    """Mesh of consecutive vertex triples."""
+    verts = np.asarray(verts, dtype=float)
+    return {
+        "verts": verts,
+        "faces": np.arange(len(verts), dtype=np.int32).reshape(-1, 3),
+        "bbox": tuple(verts.min(axis=0)) + tuple(verts.max(axis=0)),
+    }
+
+
+def random_mesh(rng, offset, n_faces=4):
+    return triangle_mesh(rng.uniform(0, 1, (n_faces * 3, 3)) + offset)
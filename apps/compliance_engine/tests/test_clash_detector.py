@@ -0,0 +1,127 @@
+import shutil
+import tempfile
+
+import ifcopenshell
+import ifcopenshell.util.placement
+import ifcopenshell.util.unit
+import numpy as np
+from django.test import SimpleTestCase
+
+from ..clash_detector import AdvancedClashDetector
+from ..geometry_store import GeometryStore
+from ..tolerance_sweep import sweep_counts
+from .fixtures import clash_keys, make_box_model, move, triangle_mesh
+
+
+class SweepAndPruneTests(SimpleTestCase):
+    def random_boxes(self, rng, n, size):
+        # Integer corners, so touching boxes and shared bounds come up often
+        lo = rng.integers(0, 20, (n, 3)).astype(float)
+        return [
+            tuple(lo[i]) + tuple(lo[i] + rng.integers(0, size, 3)) for i in range(n)
+        ]
+
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(1)
+        for case, (n_a, n_b, size, tol) in enumerate(
+            [(0, 5, 3, 0.0), (1, 1, 3, 0.0), (40, 60, 4, 0.0), (60, 40, 2, 0.5)]
+            + [(50, 50, 6, 1.0)] * 5
+        ):
+            bboxes_a = self.random_boxes(rng, n_a, size)
+            bboxes_b = self.random_boxes(rng, n_b, size)
+            pairs = AdvancedClashDetector._sweep_and_prune(bboxes_a, bboxes_b, tol)
+            expected = [
+                (i, j)
+                for i, a in enumerate(bboxes_a)
+                for j, b in enumerate(bboxes_b)
+                if AdvancedClashDetector._aabb_overlap(a, b, tol)
+            ]
+            with self.subTest(case=case):
+                self.assertEqual(len(pairs), len(set(pairs)))
+                self.assertEqual(sorted(pairs), expected)
+
+
+class SoftClashDistanceTests(SimpleTestCase):
+    def test_stored_distance_is_the_minimum(self):
+        detector = AdvancedClashDetector(tolerance_soft=3.0, workers=1)
+        # Vertices 1.118 m apart, crossing edges 0.5 m apart
+        detector.geometry = {
+            "a": triangle_mesh([[-1, 0, 0], [1, 0, 0], [0, 0, -1]]),
+            "b": triangle_mesh([[0, -1, 0.5], [0, 1, 0.5], [0, 0, 1.5]]),
+        }
+        self.assertAlmostEqual(detector._min_distance_between_meshes("a", "b"), 0.5)
+
+
+class ToleranceSweepTests(SimpleTestCase):
+    def test_sweep_matches_fresh_runs(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        ifc = make_box_model(n_walls=50, n_ducts=50, seed=2)
+        clash_sets = [
+            {"group_a": "IfcWall", "group_b": "IfcDuctSegment"},
+            {"group_a": "IfcDuctSegment", "group_b": "IfcDuctSegment"},
+        ]
+        tolerances = [(0.0, 0.05), (0.01, 0.3), (0.2, 0.2), (0.1, 0.0), (0.3, 0.01)]
+        AdvancedClashDetector(
+            workers=1, geometry_store=GeometryStore(cache_dir)
+        ).pair_distances(ifc, clash_sets, max_tolerance=0.3, content_hash="h")
+        # Counted from the stored table alone
+        table = AdvancedClashDetector(
+            geometry_store=GeometryStore(cache_dir)
+        ).stored_pair_distances("h", clash_sets, max_tolerance=0.3)
+
+        for swept, (tolerance_hard, tolerance_soft) in zip(
+            sweep_counts(table, tolerances), tolerances
+        ):
+            fresh = AdvancedClashDetector(
+                tolerance_hard=tolerance_hard, tolerance_soft=tolerance_soft, workers=1
+            ).detect_clashes(ifc, clash_sets=clash_sets)["summary"]
+            with self.subTest(tolerances=(tolerance_hard, tolerance_soft)):
+                for key in ("hard_clashes", "soft_clashes", "total_clashes"):
+                    self.assertEqual(swept[key], fresh[key], key)
+        self.assertGreater(swept["total_clashes"], 0)
+
+
+class IncrementalClashTests(SimpleTestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        self.store = GeometryStore(self.cache_dir)
+
+    def detect(self, ifc, content_hash=None, baseline=None):
+        detector = AdvancedClashDetector(
+            tolerance_soft=0.3, workers=1, geometry_store=self.store
+        )
+        return detector.detect_clashes(
+            ifc, content_hash=content_hash, baseline=baseline
+        )
+
+    def test_incremental_run_matches_fresh_run(self):
+        ifc = make_box_model(seed=1)
+        before = self.detect(ifc, content_hash="before")
+        clash = next(c for c in before["clashes"] if c["type"] == "hard")
+
+        unit_scale = ifcopenshell.util.unit.calculate_unit_scale(ifc)
+        # Move both sides of a clash together, so the pair still clashes
+        # and is found from both changed elements
+        for gid in (clash["id_a"], clash["id_b"]):
+            element = ifc.by_guid(gid)
+            placement = ifcopenshell.util.placement.get_local_placement(
+                element.ObjectPlacement
+            )
+            move(ifc, element, placement[:3, 3] * unit_scale + 0.05)
+        for duct in ifc.by_type("IfcDuctSegment")[:5]:
+            move(ifc, duct, (30.0, 30.0, 30.0))
+
+        after = self.detect(
+            ifc,
+            content_hash="after",
+            baseline={"content_hash": "before", "clash_results": before},
+        )
+        fresh = AdvancedClashDetector(tolerance_soft=0.3, workers=1).detect_clashes(
+            ifcopenshell.file.from_string(ifc.to_string())
+        )
+
+        self.assertIsNotNone(after["incremental"])
+        self.assertEqual(clash_keys(after), clash_keys(fresh))
+        self.assertEqual(after["summary"]["total_clashes"], len(fresh["clashes"]))
@@ -0,0 +1,72 @@
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from ..clash_queries import ORDERINGS, keyset_page
+from ..models import ClashRecord, ComplianceCheck
+from ..views import ComplianceCheckViewSet
+from .fixtures import create_generated_ifc
+
+
+class KeysetPagingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generated_ifc = create_generated_ifc()
+        cls.user = generated_ifc.project.user
+        cls.check = ComplianceCheck.objects.create(
+            generated_ifc=generated_ifc, rule_pack="t", status="completed"
+        )
+        # Repeated distances and hard clashes without one exercise the tie
+        # breaking and the nulls-last boundary
+        ClashRecord.objects.bulk_create(
+            ClashRecord(
+                compliance_check=cls.check,
+                id_a=f"a{i}",
+                id_b=f"b{i}",
+                clash_type="hard" if i % 4 == 0 else "soft",
+                severity="high",
+                distance=None if i % 4 == 0 else (i % 5) / 100,
+            )
+            for i in range(23)
+        )
+
+    def expected_order(self, ordering):
+        rows = list(self.check.clash_records.values_list("distance", "id"))
+        if ordering == "id":
+            return sorted(row_id for _, row_id in rows)
+        sign = -1 if ordering == "-distance" else 1
+        # Hard clashes (no distance) last, in id order
+        return [
+            row_id
+            for _, row_id in sorted(
+                rows,
+                key=lambda row: (row[0] is None, sign * (row[0] or 0), row[1]),
+            )
+        ]
+
+    def test_pages_cover_every_clash_once_in_order(self):
+        queryset = self.check.clash_records.all()
+        for ordering in ORDERINGS:
+            for size in (1, 3, 7, 23, 50):
+                with self.subTest(ordering=ordering, size=size):
+                    ids, cursor = [], None
+                    while True:
+                        rows, cursor = keyset_page(queryset, ordering, cursor, size)
+                        ids.extend(row["id"] for row in rows)
+                        if cursor is None:
+                            break
+                    self.assertEqual(ids, self.expected_order(ordering))
+                    self.assertEqual(len(set(ids)), queryset.count())
+
+    def test_empty_page_has_no_cursor(self):
+        self.assertEqual(
+            keyset_page(self.check.clash_records.all(), "id", None, 0), ([], None)
+        )
+
+    def test_page_size_is_clamped(self):
+        view = ComplianceCheckViewSet.as_view({"get": "clashes"})
+        for page_size, expected in (("0", 1), ("-5", 1), ("5000", 23)):
+            request = APIRequestFactory().get("/", {"page_size": page_size})
+            force_authenticate(request, self.user)
+            response = view(request, pk=self.check.pk)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.data["results"]), expected)
@@ -0,0 +1,39 @@
+import os
+import shutil
+import tempfile
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from ..geometry_store import GeometryStore
+from .fixtures import triangle_mesh
+
+
+class GeometryStorePruneTests(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root)
+        self.mesh = triangle_mesh(np.random.default_rng(0).uniform(0, 1, (300, 3)))
+
+    def save(self, store, content_hash, used):
+        store.save(content_hash, {"A": self.mesh}, [])
+        os.utime(store.path_for(content_hash), (used, used))
+
+    def test_least_recently_used_sidecars_are_evicted(self):
+        unbounded = GeometryStore(self.root)
+        for used, content_hash in enumerate("abc"):
+            self.save(unbounded, content_hash, 1000 + used)
+        size = sum(
+            f.stat().st_size for f in unbounded.path_for("a").iterdir() if f.is_file()
+        )
+        self.assertTrue(unbounded.exists("a"))  # No budget, nothing evicted
+
+        unbounded.load("a")  # Reading marks "a" as recently used
+        store = GeometryStore(self.root, max_bytes=int(size * 2.5))
+        stale = os.path.join(self.root, ".tmp-abandoned")
+        os.mkdir(stale)
+        os.utime(stale, (1000, 1000))
+        store.save("d", {"A": self.mesh}, [])
+
+        self.assertEqual([h for h in "abcd" if store.exists(h)], ["a", "d"])
+        self.assertFalse(os.path.exists(stale))
@@ -0,0 +1,100 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from ..mesh_distance import mesh_distance
+from .fixtures import random_mesh, triangle_mesh
+
+
+def point_triangle_distance(p, a, b, c):
+    """Closest point on a triangle by Voronoi regions, one point at a time."""
+    ab, ac, ap = b - a, c - a, p - a
+    d1, d2 = ab @ ap, ac @ ap
+    if d1 <= 0 and d2 <= 0:
+        return np.linalg.norm(p - a)
+    bp = p - b
+    d3, d4 = ab @ bp, ac @ bp
+    if d3 >= 0 and d4 <= d3:
+        return np.linalg.norm(p - b)
+    cp = p - c
+    d5, d6 = ab @ cp, ac @ cp
+    if d6 >= 0 and d5 <= d6:
+        return np.linalg.norm(p - c)
+    vc, vb, va = d1 * d4 - d3 * d2, d5 * d2 - d1 * d6, d3 * d6 - d5 * d4
+    if vc <= 0 and d1 >= 0 and d3 <= 0:
+        return np.linalg.norm(p - (a + d1 / (d1 - d3) * ab))
+    if vb <= 0 and d2 >= 0 and d6 <= 0:
+        return np.linalg.norm(p - (a + d2 / (d2 - d6) * ac))
+    if va <= 0 and d4 - d3 >= 0 and d5 - d6 >= 0:
+        t = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+        return np.linalg.norm(p - (b + t * (c - b)))
+    denom = va + vb + vc
+    return np.linalg.norm(p - (a + vb / denom * ab + vc / denom * ac))
+
+
+def segment_distance(p1, q1, p2, q2, samples=60):
+    """Segment to segment distance by ternary search over the first segment."""
+
+    def to_segment(point):
+        d = q2 - p2
+        t = min(1.0, max(0.0, (point - p2) @ d / (d @ d)))
+        return np.linalg.norm(point - (p2 + t * d))
+
+    lo, hi = 0.0, 1.0
+    for _ in range(samples):
+        m1, m2 = lo + (hi - lo) / 3, hi - (hi - lo) / 3
+        if to_segment(p1 + m1 * (q1 - p1)) <= to_segment(p1 + m2 * (q1 - p1)):
+            hi = m2
+        else:
+            lo = m1
+    return to_segment(p1 + (lo + hi) / 2 * (q1 - p1))
+
+
+def reference_mesh_distance(mesh_a, mesh_b):
+    """Minimum over every triangle pair of vertex-triangle and edge-edge distances."""
+    best = np.inf
+    for tri_a in mesh_a["verts"][mesh_a["faces"]]:
+        for tri_b in mesh_b["verts"][mesh_b["faces"]]:
+            for p, tri in [(p, tri_b) for p in tri_a] + [(p, tri_a) for p in tri_b]:
+                best = min(best, point_triangle_distance(p, *tri))
+            for i in range(3):
+                for j in range(3):
+                    best = min(
+                        best,
+                        segment_distance(
+                            tri_a[i], tri_a[(i + 1) % 3], tri_b[j], tri_b[(j + 1) % 3]
+                        ),
+                    )
+    return best
+
+
+class MeshDistanceTests(SimpleTestCase):
+    def test_matches_scalar_reference(self):
+        rng = np.random.default_rng(4)
+        for case in range(20):
+            # Apart along one axis and overlapping along the others, so edge-edge
+            # pairs are often the closest features
+            offset = rng.uniform(-0.5, 0.5, 3)
+            offset[case % 3] = rng.uniform(1.05, 1.3) * rng.choice([-1, 1])
+            mesh_a = random_mesh(rng, (0, 0, 0))
+            mesh_b = random_mesh(rng, offset)
+            with self.subTest(case=case):
+                self.assertAlmostEqual(
+                    mesh_distance(mesh_a, mesh_b, cutoff=np.inf),
+                    reference_mesh_distance(mesh_a, mesh_b),
+                    places=6,
+                )
+
+    def test_crossing_edges(self):
+        mesh_a = triangle_mesh([[-1, 0, 0], [1, 0, 0], [0, 0, -1]])
+        mesh_b = triangle_mesh([[0, -1, 0.5], [0, 1, 0.5], [0, 0, 1.5]])
+        self.assertAlmostEqual(mesh_distance(mesh_a, mesh_b, cutoff=1.0), 0.5)
+
+    def test_piercing_meshes_are_at_zero_distance(self):
+        mesh_a = triangle_mesh([[0, 0, 0], [2, 0, 0], [0, 2, 0]])
+        mesh_b = triangle_mesh([[0.5, 0.5, -1], [0.5, 0.5, 1], [0.6, 0.5, 1]])
+        self.assertEqual(mesh_distance(mesh_a, mesh_b, cutoff=1.0), 0.0)
+
+    def test_beyond_cutoff(self):
+        rng = np.random.default_rng(5)
+        mesh_a, mesh_b = random_mesh(rng, (0, 0, 0)), random_mesh(rng, (5, 0, 0))
+        self.assertGreaterEqual(mesh_distance(mesh_a, mesh_b, cutoff=2.0), 2.0)
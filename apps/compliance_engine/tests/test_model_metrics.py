@@ -0,0 +1,34 @@
+from unittest import mock
+
+from django.test import TestCase
+
+from ..model_metrics import ModelMetrics
+from ..models import ComplianceCheck, MetricsIndex
+from ..rule_engine import RuleEngine
+from .fixtures import create_generated_ifc, make_box_model, use_temp_storage
+
+
+class MetricsIndexTests(TestCase):
+    def setUp(self):
+        use_temp_storage(self)
+
+    def test_checks_of_the_same_content_share_one_index(self):
+        generated_ifc = create_generated_ifc()
+        ifc = make_box_model(3, 2)
+        engine = RuleEngine("rules:\n - name: walls\n   condition: wall_count == 3\n")
+        with mock.patch.object(
+            ModelMetrics,
+            "_build_counts",
+            autospec=True,
+            side_effect=ModelMetrics._build_counts,
+        ) as build_counts:
+            for _ in range(2):
+                engine.evaluate(
+                    ifc, generated_ifc.id, include_clash=False, content_hash="a" * 64
+                )
+                self.assertTrue(engine.results[0]["passed"])
+        self.assertEqual(build_counts.call_count, 1)
+        self.assertEqual(ComplianceCheck.objects.count(), 2)
+        index = MetricsIndex.objects.get()
+        self.assertEqual(index.content_hash, "a" * 64)
+        self.assertEqual(index.data["sections"]["counts"]["IFCWALL"], 3)
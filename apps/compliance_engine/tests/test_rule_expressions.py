@@ -0,0 +1,73 @@
+from django.test import SimpleTestCase
+
+from ..rule_expressions import (
+    RuleEvaluationError,
+    RuleSyntaxError,
+    compile_condition,
+    compile_rule_pack,
+)
+
+
+class RuleExpressionTests(SimpleTestCase):
+    metrics = {
+        "wall_count": 12,
+        "all_walls.thickness": [0.3, 0.35, 0.4],
+        "storey.elevation": -3.5,
+        "fire_rating": "60",
+        "material": "Concrete",
+        "has_sprinklers": True,
+    }
+
+    def evaluate(self, text):
+        return compile_condition(text).evaluate(self.metrics.__getitem__)
+
+    def test_conditions(self):
+        for text, expected in (
+            ("wall_count > 10", True),
+            ("wall_count >= 12 AND wall_count < 12", False),
+            ("wall_count < 5 OR has_sprinklers == true", True),
+            ("NOT has_sprinklers OR wall_count == 12", True),
+            ("NOT (has_sprinklers OR wall_count == 12)", False),
+            # OR binds looser than AND
+            ("has_sprinklers OR wall_count < 5 AND wall_count > 20", True),
+            # A list satisfies a comparison only if every item does
+            ("all_walls.thickness >= 0.3", True),
+            ("all_walls.thickness > 0.3", False),
+            ("material == 'concrete'", True),
+            ("fire_rating >= 60", True),
+            ("storey.elevation >= -3.5", True),
+            ("storey.elevation > -3.5", False),
+            ("-storey.elevation == 3.5", True),
+            ("- -1 == 1", True),
+            ("wall_count == 1.2e1", True),
+            ("wall_count < 1E+2 AND wall_count > 5e-1", True),
+            ("-all_walls.thickness <= -0.3", True),
+        ):
+            with self.subTest(text):
+                self.assertIs(self.evaluate(text), expected)
+
+    def test_metrics_are_collected(self):
+        condition = compile_condition("-storey.elevation < 4 AND NOT has_sprinklers")
+        self.assertEqual(condition.metrics, {"storey.elevation", "has_sprinklers"})
+
+    def test_syntax_errors(self):
+        for text in ("", "wall_count >", "(wall_count > 1", "wall_count - 1", "1e"):
+            with self.subTest(text):
+                with self.assertRaises(RuleSyntaxError):
+                    compile_condition(text)
+
+    def test_type_errors(self):
+        for text in ("has_sprinklers > 1", "-material == 1", "-has_sprinklers < 0"):
+            with self.subTest(text):
+                with self.assertRaises(RuleEvaluationError):
+                    self.evaluate(text)
+
+    def test_rule_pack_keeps_rules_that_do_not_parse(self):
+        rules = compile_rule_pack(
+            "rules:\n"
+            " - name: ok\n   condition: storey.elevation >= -5\n"
+            " - name: broken\n   condition: wall_count >>\n"
+        )
+        self.assertIsNone(rules[0].error)
+        self.assertIsNone(rules[1].condition)
+        self.assertIn("wall_count", rules[1].error)
@@ -0,0 +1,119 @@
+from unittest import mock
+
+from celery import current_app
+from django.test import TestCase, override_settings
+
+from .. import tasks
+from ..clash_detector import AdvancedClashDetector
+from ..models import ComplianceBatch, ComplianceCheck, RulePack
+from ..tasks import distributed_clash_task, merge_clash_cells_task
+from .fixtures import (
+    clash_keys,
+    create_generated_ifc,
+    make_box_model,
+    run_tasks_eagerly,
+    use_temp_storage,
+)
+
+
+class DistributedClashTests(TestCase):
+    def setUp(self):
+        use_temp_storage(self)
+        run_tasks_eagerly(self)
+
+    def test_distributed_run_matches_single_process_run(self):
+        ifc = make_box_model(n_walls=60, n_ducts=60, seed=3)
+        clash_sets = [
+            {"group_a": "IfcWall", "group_b": "IfcDuctSegment"},
+            {"group_a": "IfcWall", "group_b": "IfcWall"},
+        ]
+        single = AdvancedClashDetector(tolerance_soft=0.3, workers=1).detect_clashes(
+            ifc, clash_sets=clash_sets
+        )
+        with override_settings(BIMFLOW_CLASH_WORKERS=1):
+            check = ComplianceCheck.objects.create(
+                generated_ifc=create_generated_ifc(ifc), rule_pack="clash"
+            )
+            # Small cells and overlapping margins, so pairs meet in several cells
+            distributed_clash_task.apply(
+                args=(check.id, clash_sets, 0.01, 0.3, True, 10, 4)
+            )
+
+        check.refresh_from_db()
+        summary = check.clash_results["summary"]
+        self.assertGreater(summary["cells"], 1)
+        self.assertGreater(summary["shared_pairs_skipped"], 0)
+        records = check.clash_records.values("id_a", "id_b", "clash_type", "distance")
+        self.assertEqual(
+            sorted(
+                (r["id_a"], r["id_b"], r["clash_type"], round(r["distance"] or 0.0, 6))
+                for r in records
+            ),
+            clash_keys(single),
+        )
+        for key in ("hard_clashes", "soft_clashes", "soft_pairs_checked"):
+            self.assertEqual(summary[key], single["summary"][key], key)
+        expected = "passed" if not single["clashes"] else "failed"
+        self.assertEqual(check.status, expected)
+
+    def test_rules_that_errored_do_not_fail_the_check(self):
+        check = ComplianceCheck.objects.create(
+            generated_ifc=create_generated_ifc(),
+            rule_pack="clash",
+            results=[{"rule": "broken", "passed": False, "error": "Unknown metric"}],
+        )
+        merge_clash_cells_task.run([], check.id, {}, 0, [], 0)
+        check.refresh_from_db()
+        self.assertEqual(check.status, "passed")
+
+
+class ChordFailureTests(TestCase):
+    def setUp(self):
+        use_temp_storage(self)
+        run_tasks_eagerly(self)
+        self.generated_ifc = create_generated_ifc(make_box_model(5, 5))
+
+    def fail_chord(self, run):
+        """
+        Run a task with its chord intercepted, then fail the chord the way
+        the result backend does when a header task raises.
+        """
+        with override_settings(BIMFLOW_CLASH_WORKERS=1), mock.patch.object(
+            tasks, "chord"
+        ) as chord:
+            run()
+        callback = chord.return_value.call_args.args[0]
+        callback.freeze()  # As the chord does, giving the callback a task id
+        try:
+            raise RuntimeError("Geometry sidecar not found on this worker")
+        except RuntimeError as e:
+            current_app.backend.chord_error_from_stack(callback, e)
+
+    def test_failed_cell_marks_the_check_failed(self):
+        check = ComplianceCheck.objects.create(
+            generated_ifc=self.generated_ifc, rule_pack="distributed_clash"
+        )
+        clash_sets = [{"group_a": "IfcWall", "group_b": "IfcDuctSegment"}]
+        self.fail_chord(
+            lambda: distributed_clash_task.apply(args=(check.id, clash_sets))
+        )
+        check.refresh_from_db()
+        self.assertEqual(check.status, "failed")
+        self.assertIn("sidecar", check.results[0]["error"])
+
+    def test_failed_chunk_marks_the_batch_failed(self):
+        rule_pack = RulePack.objects.create(
+            name="walls",
+            yaml_content="rules:\n - name: walls\n   condition: wall_count > 1\n",
+        )
+        batch = ComplianceBatch.objects.create(
+            user=self.generated_ifc.project.user, rule_pack="walls", total=1
+        )
+        self.fail_chord(
+            lambda: tasks.batch_evaluate_task.apply(
+                args=(batch.id, [self.generated_ifc.id], rule_pack.id)
+            )
+        )
+        batch.refresh_from_db()
+        self.assertEqual(batch.status, "failed")
+        self.assertIn("sidecar", batch.summary["error"])
@@ -0,0 +1,137 @@
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from .. import tasks
+from ..models import ComplianceBatch, ComplianceCheck, RulePack
+from ..views import ComplianceCheckViewSet
+from .fixtures import (
+    create_generated_ifc,
+    make_box_model,
+    run_tasks_eagerly,
+    use_temp_storage,
+)
+
+
+class EvaluationRequestTests(TestCase):
+    def setUp(self):
+        use_temp_storage(self)
+        self.generated_ifc = create_generated_ifc(make_box_model(2, 2))
+        self.user = self.generated_ifc.project.user
+        RulePack.objects.create(
+            name="walls",
+            yaml_content="rules:\n - name: walls\n   condition: wall_count > 1\n",
+        )
+
+    def post(self, action, data):
+        request = APIRequestFactory().post("/", data, format="json")
+        force_authenticate(request, self.user)
+        return ComplianceCheckViewSet.as_view({"post": action})(request)
+
+    def test_unqueued_work_is_marked_failed(self):
+        error = ConnectionRefusedError("broker down")
+        for action, task, data, pending in (
+            (
+                "evaluate_ifc",
+                tasks.evaluate_compliance_task,
+                {"rule_pack": "walls", "use_cache": False},
+                ComplianceCheck.objects,
+            ),
+            (
+                "distributed_clash",
+                tasks.distributed_clash_task,
+                {},
+                ComplianceCheck.objects,
+            ),
+            (
+                "batch_evaluate",
+                tasks.batch_evaluate_task,
+                {"rule_pack": "walls"},
+                ComplianceBatch.objects,
+            ),
+        ):
+            with self.subTest(action=action):
+                with mock.patch.object(task, "delay", side_effect=error):
+                    response = self.post(
+                        action, dict(data, ifc_id=self.generated_ifc.id)
+                    )
+                self.assertEqual(response.status_code, 503)
+                self.assertFalse(pending.filter(status="pending").exists())
+                self.assertTrue(pending.filter(status="failed").exists())
+
+    def test_invalid_tolerances_are_rejected(self):
+        for action, data in (
+            ("evaluate_ifc", {"rule_pack": "walls"}),
+            ("distributed_clash", {}),
+            ("batch_evaluate", {"rule_pack": "walls"}),
+        ):
+            for tolerances in (
+                {"tolerance_hard": "wide"},
+                {"tolerance_soft": None},
+                {"tolerance_hard": -0.01},
+                {"tolerance_soft": "inf"},
+            ):
+                with self.subTest(action=action, tolerances=tolerances):
+                    response = self.post(
+                        action, dict(data, ifc_id=self.generated_ifc.id, **tolerances)
+                    )
+                    self.assertEqual(response.status_code, 400)
+        self.assertFalse(ComplianceCheck.objects.exists())
+        self.assertFalse(ComplianceBatch.objects.exists())
+
+
+class RuleProfileTests(TestCase):
+    def test_out_of_range_parameters_are_rejected(self):
+        user = create_generated_ifc().project.user
+        view = ComplianceCheckViewSet.as_view({"get": "rule_profile"})
+        for params, expected in (
+            ({}, 200),
+            ({"checks": "500", "limit": "100"}, 200),
+            ({"checks": "0"}, 400),
+            ({"checks": "-5"}, 400),
+            ({"checks": "501"}, 400),
+            ({"limit": "-1"}, 400),
+            ({"limit": "101"}, 400),
+            ({"limit": "ten"}, 400),
+        ):
+            request = APIRequestFactory().get("/", dict(params, rule_pack="walls"))
+            force_authenticate(request, user)
+            with self.subTest(params=params):
+                self.assertEqual(view(request).status_code, expected)
+
+
+@override_settings(BIMFLOW_CLASH_WORKERS=1, BIMFLOW_CLASH_SWEEP_TOLERANCE_LIMIT=0.5)
+class ToleranceSweepViewTests(TestCase):
+    def setUp(self):
+        use_temp_storage(self)
+        run_tasks_eagerly(self)
+        self.generated_ifc = create_generated_ifc(make_box_model(20, 20, seed=1))
+
+    def post(self, data):
+        request = APIRequestFactory().post(
+            "/", dict(data, ifc_id=self.generated_ifc.id), format="json"
+        )
+        force_authenticate(request, self.generated_ifc.project.user)
+        return ComplianceCheckViewSet.as_view({"post": "tolerance_sweep"})(request)
+
+    def test_tolerances_above_the_limit_are_rejected(self):
+        for data in (
+            {"max_tolerance": 0.6},
+            {"tolerances": [0.1, [0.01, 0.7]]},
+        ):
+            with self.subTest(data=data):
+                self.assertEqual(self.post(data).status_code, 400)
+
+    def test_distances_are_computed_in_a_task(self):
+        data = {"tolerances": [0.05, 0.2]}
+        with mock.patch.object(
+            tasks.tolerance_sweep_task, "delay", wraps=tasks.tolerance_sweep_task.delay
+        ) as delay:
+            queued = self.post(data)
+            self.assertEqual(queued.status_code, 202)
+            self.assertTrue(queued.data["task_id"])
+            counted = self.post(data)
+        self.assertEqual(delay.call_count, 1)
+        self.assertEqual(counted.status_code, 200)
+        self.assertEqual(len(counted.data["results"]), 2)
@@ -0,0 +1,80 @@
+# compliance_engine/tolerance_sweep.py
+"""
+Clash counts across tolerances from one candidate-pair distance table.
+
+AdvancedClashDetector.pair_distances measures every candidate pair once up
+to a maximum tolerance. Because a pair is a hard clash at t exactly when its
+box gap is <= t, and a soft clash exactly when its mesh distance is < t, the
+counts of a full clash run at any (tolerance_hard, tolerance_soft) up to that
+maximum are two binary searches over the sorted columns.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+MAX_BINS = 1000
+
+
+def parse_tolerances(values) -> List[Tuple[float, float]]:
+    """
+    (tolerance_hard, tolerance_soft) pairs from a list whose entries are a
+    number, used for both checks, or a [hard, soft] pair. Raises ValueError.
+    """
+    if not isinstance(values, list) or not values:
+        raise ValueError("tolerances must be a non-empty list")
+    pairs = []
+    for value in values:
+        if isinstance(value, (list, tuple)) and len(value) == 2:
+            hard, soft = value
+        else:
+            hard = soft = value
+        try:
+            pair = (float(hard), float(soft))
+        except (TypeError, ValueError):
+            raise ValueError(
+                "each tolerance must be a number or a [hard, soft] pair of numbers"
+            )
+        if min(pair) < 0:
+            raise ValueError("tolerances must not be negative")
+        pairs.append(pair)
+    return pairs
+
+
+def sweep_counts(
+    table: Dict[str, np.ndarray], tolerances: Sequence[Tuple[float, float]]
+) -> List[Dict]:
+    """Clash counts a clash run would report at each (hard, soft) tolerance."""
+    box_gaps = np.sort(table["box_gap"])
+    distances = np.sort(table["distance"])
+    counts = []
+    for tolerance_hard, tolerance_soft in tolerances:
+        hard = int(np.searchsorted(box_gaps, tolerance_hard, side="right"))
+        soft = int(np.searchsorted(distances, tolerance_soft, side="left"))
+        counts.append(
+            {
+                "tolerance_hard": tolerance_hard,
+                "tolerance_soft": tolerance_soft,
+                "hard_clashes": hard,
+                "soft_clashes": soft,
+                "total_clashes": hard + soft,
+            }
+        )
+    return counts
+
+
+def distance_histogram(
+    table: Dict[str, np.ndarray], bins: int, upper: float = None
+) -> Dict:
+    """
+    Box gaps and mesh distances binned over [0, upper], by default the
+    table's max_tolerance; the running sum of a column up to a bin edge is
+    the hard or soft count there.
+    """
+    edges = np.linspace(0.0, upper or table["max_tolerance"], bins + 1)
+    distances = table["distance"][np.isfinite(table["distance"])]
+    return {
+        "edges": [round(edge, 6) for edge in edges.tolist()],
+        "hard": np.histogram(table["box_gap"], edges)[0].tolist(),
+        "soft": np.histogram(distances, edges)[0].tolist(),
+    }
@@ -2,12 +2,42 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from .models import ComplianceCheck, RulePack
-from .serializers import ComplianceCheckSerializer
-from .rule_engine import RuleEngine
+from django.conf import settings
+from django.db.models import Avg, Count, Max, Sum
+from django.http import StreamingHttpResponse
+from rest_framework.utils.urls import replace_query_param
+from .clash_queries import (
+    ORDERINGS,
+    export_ndjson,
+    filter_clashes,
+    keyset_page,
+)
+from .models import ComplianceBatch, ComplianceCheck, ComplianceResult, RulePack
+from .serializers import (
+    ComplianceBatchSerializer,
+    ComplianceCheckSerializer,
+    ComplianceResultSerializer,
+)
+from .result_cache import get_cached_check, result_cache_key
+from .result_records import save_failure
+from .tasks import (
+    batch_evaluate_task,
+    distributed_clash_task,
+    evaluate_compliance_task,
+    run_compliance_check,
+    tolerance_sweep_table,
+    tolerance_sweep_task,
+)
+from .tolerance_sweep import (
+    MAX_BINS,
+    distance_histogram,
+    parse_tolerances,
+    sweep_counts,
+)
 from apps.parametric_generator.models import GeneratedIFC
 from apps.users.models import OrganizationMember
 import logging
+import math
 
 logger = logging.getLogger(__name__)
 
@@ -21,26 +51,158 @@ class ComplianceCheckViewSet(viewsets.ModelViewSet):
         """Return only compliance checks for projects in user's organizations"""
         if getattr(self, "swagger_fake_view", False):
             return self.queryset.none()
-        user_organizations = OrganizationMember.objects.filter(
+        # Rule outcomes and clashes are paged through the results/clashes
+        # actions rather than loaded with every check
+        return self.queryset.filter(
+            generated_ifc__project__organization__in=self._user_organizations()
+        ).defer("results", "clash_results")
+
+    def _user_organizations(self):
+        return OrganizationMember.objects.filter(
             user=self.request.user, is_active=True
         ).values_list("organization", flat=True)
-        return self.queryset.filter(
-            generated_ifc__project__organization__in=user_organizations
+
+    @staticmethod
+    def _filter_results(queryset, params):
+        """Apply the passed/severity/category/rule_pack query filters."""
+        passed = params.get("passed")
+        if passed is not None:
+            queryset = queryset.filter(passed=passed.lower() in ("true", "1"))
+        for field in ("severity", "category", "rule_pack"):
+            if params.get(field):
+                queryset = queryset.filter(**{field: params[field]})
+        return queryset
+
+    @action(detail=True, methods=["get"])
+    def results(self, request, pk=None):
+        """Page through a check's rule outcomes, filtered by passed/severity/category."""
+        check = self.get_object()
+        queryset = self._filter_results(check.rule_results.all(), request.query_params)
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(
+            ComplianceResultSerializer(page, many=True).data
         )
 
-    @action(detail=False, methods=["post"])
-    def evaluate_ifc(self, request):
-        ifc_id = request.data.get("ifc_id")
-        rule_pack_name = request.data.get("rule_pack", None)
-        include_clash = request.data.get("include_clash", True)
-        tolerance_hard = request.data.get("tolerance_hard", 0.01)  # meters
-        tolerance_soft = request.data.get("tolerance_soft", 0.05)  # meters
+    @action(detail=True, methods=["get"])
+    def clashes(self, request, pk=None):
+        """
+        Keyset-paged clashes of a check.
 
-        if not ifc_id:
+        Query parameters: type (hard/soft), severity, element_class (either
+        side of the clash, e.g. IfcWall), group (members of one clash group),
+        ordering (id, distance or -distance), page_size (1 to 1000) and
+        cursor, taken from the previous page's next link.
+        """
+        check = self.get_object()
+        ordering = request.query_params.get("ordering", "id")
+        if ordering not in ORDERINGS:
             return Response(
-                {"error": "ifc_id required"}, status=status.HTTP_400_BAD_REQUEST
+                {"error": f"ordering must be one of {', '.join(ORDERINGS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            page_size = max(
+                1,
+                min(
+                    int(
+                        request.query_params.get("page_size", self.paginator.page_size)
+                    ),
+                    1000,
+                ),
+            )
+        except ValueError:
+            return Response(
+                {"error": "page_size must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            queryset = filter_clashes(check.clash_records.all(), request.query_params)
+            rows, next_cursor = keyset_page(
+                queryset, ordering, request.query_params.get("cursor"), page_size
             )
+        except ValueError as e:  # Malformed filter or InvalidCursor
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        next_url = None
+        if next_cursor:
+            next_url = replace_query_param(
+                request.build_absolute_uri(), "cursor", next_cursor
+            )
+        return Response({"next": next_url, "results": rows})
+
+    @action(detail=True, methods=["get"], url_path="clashes/export")
+    def export_clashes(self, request, pk=None):
+        """
+        Every matching clash as NDJSON, streamed without building the list.
 
+        Takes the same type/severity/element_class/group/ordering parameters
+        as clashes.
+        """
+        check = self.get_object()
+        ordering = request.query_params.get("ordering", "id")
+        if ordering not in ORDERINGS:
+            return Response(
+                {"error": f"ordering must be one of {', '.join(ORDERINGS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            queryset = filter_clashes(check.clash_records.all(), request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        response = StreamingHttpResponse(
+            export_ndjson(queryset, ordering), content_type="application/x-ndjson"
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="check_{check.id}_clashes.ndjson"'
+        )
+        return response
+
+    @action(detail=True, methods=["get"], url_path="clash_groups")
+    def clash_groups(self, request, pk=None):
+        """
+        Clash groups of a check: count, extent, worst severity and one
+        representative clash each. Filter with type and element_class;
+        expand a group's members through clashes?group=<id>.
+        """
+        check = self.get_object()
+        groups = (check.clash_results or {}).get("groups", [])
+        clash_type = request.query_params.get("type")
+        element_class = (request.query_params.get("element_class") or "").lower()
+        groups = [
+            group
+            for group in groups
+            if (not clash_type or group["type"] == clash_type)
+            and (
+                not element_class
+                or element_class in (group["class_a"].lower(), group["class_b"].lower())
+            )
+        ]
+        return Response(
+            {
+                "count": len(groups),
+                "clashes": sum(group["count"] for group in groups),
+                "results": groups,
+            }
+        )
+
+    @action(detail=False, methods=["get"], url_path="results", url_name="all-results")
+    def all_results(self, request):
+        """
+        Rule outcomes across every check the user can see, newest first,
+        e.g. ?passed=false&severity=critical for all failed critical rules.
+        """
+        queryset = self._filter_results(
+            ComplianceResult.objects.filter(
+                compliance_check__generated_ifc__project__organization__in=self._user_organizations()
+            ),
+            request.query_params,
+        ).order_by("-compliance_check__checked_at", "id")
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(
+            ComplianceResultSerializer(page, many=True).data
+        )
+
+    def _get_evaluable_ifc(self, request, ifc_id):
+        """Return (generated_ifc, None) or (None, error response) for ifc_id."""
         try:
             # Verify user has access to this IFC through organization membership
             generated_ifc = GeneratedIFC.objects.get(id=ifc_id)
@@ -51,80 +213,560 @@ class ComplianceCheckViewSet(viewsets.ModelViewSet):
                 organization=generated_ifc.project.organization,
                 is_active=True,
             ).exists():
-                return Response(
+                return None, Response(
                     {"error": "IFC not found or access denied"},
                     status=status.HTTP_404_NOT_FOUND,
                 )
         except GeneratedIFC.DoesNotExist:
-            return Response(
+            return None, Response(
                 {"error": "IFC not found or access denied"},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
         if generated_ifc.status != "completed":
-            return Response(
+            return None, Response(
                 {"error": f"IFC must be completed (current: {generated_ifc.status})"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
         # Get IFC content
         if not generated_ifc.ifc_file:
-            return Response(
+            return None, Response(
                 {"error": "IFC file not available"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
+        return generated_ifc, None
 
-        ifc_string = (
-            generated_ifc.ifc_file.read().decode()
-            if hasattr(generated_ifc.ifc_file, "read")
-            else str(generated_ifc.ifc_file)
-        )
+    @action(detail=False, methods=["post"])
+    def evaluate_ifc(self, request):
+        """
+        Queue a compliance check and return 202 with the check and task ids.
+
+        rule_packs lists several pack names to evaluate off one parse, one
+        metrics index and one clash run; each pack gets its own check unless
+        combine=true, which puts every pack's results in a single check.
+
+        Results already computed for the same file content, rule pack,
+        tolerances and include_clash are returned at once with cached=true
+        unless use_cache=false.
 
+        Progress is streamed on ws/task/<task_id>/. Pass blocking=true to get
+        the results in the response instead; only models up to
+        BIMFLOW_BLOCKING_COMPLIANCE_MAX_MB are evaluated inline, larger ones
+        are always queued.
+        """
+        ifc_id = request.data.get("ifc_id")
+        rule_pack_name = request.data.get("rule_pack", None)
+        rule_pack_names = request.data.get("rule_packs", None)
+        combine = request.data.get("combine", False)
+        include_clash = request.data.get("include_clash", True)
+        incremental = request.data.get("incremental", True)
+        blocking = request.data.get("blocking", False)
+        use_cache = request.data.get("use_cache", True)
+
+        if not ifc_id:
+            return Response(
+                {"error": "ifc_id required"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        if rule_pack_names is not None and (
+            not isinstance(rule_pack_names, list) or not rule_pack_names
+        ):
+            return Response(
+                {"error": "rule_packs must be a non-empty list of names"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         try:
-            # Use asset_type for default
-            asset_type_code = generated_ifc.asset_type
+            tolerance_hard, tolerance_soft = self._tolerances(request.data)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+        generated_ifc, error = self._get_evaluable_ifc(request, ifc_id)
+        if error:
+            return error
+
+        # Use asset_type for default
+        asset_type_code = generated_ifc.asset_type
+        if rule_pack_names:
+            names = list(dict.fromkeys(rule_pack_names))
+            found = {p.name: p for p in RulePack.objects.filter(name__in=names)}
+            missing = [name for name in names if name not in found]
+            if missing:
+                return Response(
+                    {"error": f"No rule pack found for {', '.join(missing)}"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            rule_packs = [found[name] for name in names]
+        else:
             if rule_pack_name:
-                rule_pack = RulePack.objects.get(name=rule_pack_name)
+                rule_pack = RulePack.objects.filter(name=rule_pack_name).first()
             else:
                 rule_pack = RulePack.get_default_pack(asset_type_code)
 
             if not rule_pack:
                 return Response(
-                    {"error": f"No rule pack found for {asset_type_code}"},
+                    {
+                        "error": f"No rule pack found for {rule_pack_name or asset_type_code}"
+                    },
                     status=status.HTTP_404_NOT_FOUND,
                 )
+            rule_packs = [rule_pack]
+
+        # One check per pack, or a single check for the combined results
+        if combine and len(rule_packs) > 1:
+            check_packs = [rule_packs]
+        else:
+            check_packs = [[rule_pack] for rule_pack in rule_packs]
+
+        # Same file, pack(s), tolerances and clash flag give the same results
+        content_hash = generated_ifc.get_content_hash()
+        cache_keys = [
+            result_cache_key(
+                content_hash,
+                "\n---\n".join(p.yaml_content for p in packs),
+                tolerance_hard,
+                tolerance_soft,
+                include_clash,
+            )
+            for packs in check_packs
+        ]
+        cached = {}
+        if use_cache:
+            for i, cache_key in enumerate(cache_keys):
+                hit = get_cached_check(cache_key, generated_ifc)
+                if hit:
+                    cached[i] = hit
+        # Only packs without a cached result are evaluated
+        pending = [i for i in range(len(check_packs)) if i not in cached]
+        checks = {
+            i: ComplianceCheck.objects.create(
+                generated_ifc=generated_ifc,
+                rule_pack=", ".join(p.name for p in check_packs[i])[:255],
+                status="pending",
+            )
+            for i in pending
+        }
+        if not pending:
+            return Response(
+                self._evaluations_response(
+                    [cached[i] for i in range(len(check_packs))],
+                    include_clash,
+                    tolerance_hard,
+                    tolerance_soft,
+                    cached=set(cached),
+                ),
+                status=status.HTTP_200_OK,
+            )
+
+        # Combined evaluation is one check holding every pack
+        run_packs = [p for i in pending for p in check_packs[i]]
+        run_checks = [checks[i] for i in pending]
+        run_keys = [cache_keys[i] for i in pending]
+
+        file_size = generated_ifc.file_size or generated_ifc.ifc_file.size
+        if blocking and file_size <= settings.BIMFLOW_BLOCKING_COMPLIANCE_MAX_MB * (
+            1024 * 1024
+        ):
+            try:
+                run_compliance_check(
+                    run_checks,
+                    run_packs,
+                    include_clash,
+                    tolerance_hard,
+                    tolerance_soft,
+                    incremental,
+                    cache_keys=run_keys,
+                )
+            except Exception as e:
+                logger.error(f"Compliance check failed: {e}", exc_info=True)
+                for check in run_checks:
+                    save_failure(check, str(e))
+                return Response(
+                    {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                )
+
+            return Response(
+                self._evaluations_response(
+                    [cached.get(i) or checks[i] for i in range(len(check_packs))],
+                    include_clash,
+                    tolerance_hard,
+                    tolerance_soft,
+                    cached=set(cached),
+                ),
+                status=status.HTTP_200_OK,
+            )
+
+        try:
+            task = evaluate_compliance_task.delay(
+                [check.id for check in run_checks],
+                [rule_pack.id for rule_pack in run_packs],
+                include_clash=include_clash,
+                tolerance_hard=tolerance_hard,
+                tolerance_soft=tolerance_soft,
+                incremental=incremental,
+                cache_keys=run_keys,
+            )
+        except Exception as e:  # Broker unreachable: nothing will run the checks
+            for check in run_checks:
+                save_failure(check, f"Could not queue evaluation: {e}")
+            return self._queue_unavailable(e)
+        logger.info(
+            f"Compliance checks {[c.id for c in run_checks]} queued as task {task.id}"
+        )
+        response = {
+            "check_id": run_checks[0].id,
+            "ifc_id": generated_ifc.id,
+            "task_id": task.id,
+            "status": run_checks[0].status,
+        }
+        if len(check_packs) > 1:
+            response["checks"] = [
+                {
+                    "check_id": (cached.get(i) or checks[i]).id,
+                    "rule_pack": (cached.get(i) or checks[i]).rule_pack,
+                    "status": (cached.get(i) or checks[i]).status,
+                    "cached": i in cached,
+                }
+                for i in range(len(check_packs))
+            ]
+        return Response(response, status=status.HTTP_202_ACCEPTED)
+
+    @classmethod
+    def _evaluations_response(
+        cls, checks, include_clash, tolerance_hard, tolerance_soft, cached
+    ):
+        """A single check's response, or {"ifc_id", "checks"} for several."""
+        responses = [
+            cls._evaluation_response(
+                check, include_clash, tolerance_hard, tolerance_soft, i in cached
+            )
+            for i, check in enumerate(checks)
+        ]
+        if len(responses) == 1:
+            return responses[0]
+        return {"ifc_id": checks[0].generated_ifc_id, "checks": responses}
+
+    @staticmethod
+    def _tolerances(data):
+        """
+        tolerance_hard and tolerance_soft from request data, in meters.
+        Raises ValueError unless both are finite and not negative.
+        """
+        try:
+            tolerances = (
+                float(data.get("tolerance_hard", 0.01)),
+                float(data.get("tolerance_soft", 0.05)),
+            )
+        except (TypeError, ValueError):
+            raise ValueError("tolerance_hard and tolerance_soft must be numbers")
+        if not all(math.isfinite(t) and t >= 0 for t in tolerances):
+            raise ValueError(
+                "tolerance_hard and tolerance_soft must be finite and not negative"
+            )
+        return tolerances
 
-            # Initialize engine with custom tolerances
-            engine = RuleEngine(
-                rule_pack.yaml_content,
+    @staticmethod
+    def _queue_unavailable(error):
+        """503 for a task that could not be handed to the broker."""
+        logger.error(f"Could not queue Celery task: {error}", exc_info=True)
+        return Response(
+            {"error": "Task queue unavailable, try again later", "message": str(error)},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+    @staticmethod
+    def _evaluation_response(
+        check, include_clash, tolerance_hard, tolerance_soft, cached=False
+    ):
+        return {
+            "check_id": check.id,
+            "ifc_id": check.generated_ifc_id,
+            "rule_pack": check.rule_pack,
+            "status": check.status,
+            "results": check.results,
+            "clash_results": check.clash_results if include_clash else {},
+            "tolerances": {"hard": tolerance_hard, "soft": tolerance_soft},
+            "cached": cached,
+        }
+
+    @action(detail=False, methods=["post"])
+    def distributed_clash(self, request):
+        """Queue clash detection split over spatial grid cells on Celery workers."""
+        ifc_id = request.data.get("ifc_id")
+        if not ifc_id:
+            return Response(
+                {"error": "ifc_id required"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            tolerance_hard, tolerance_soft = self._tolerances(request.data)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        generated_ifc, error = self._get_evaluable_ifc(request, ifc_id)
+        if error:
+            return error
+
+        check = ComplianceCheck.objects.create(
+            generated_ifc=generated_ifc,
+            rule_pack="distributed_clash",
+            status="pending",
+            results=[],
+            ifc_content_hash=generated_ifc.get_content_hash(),
+        )
+        try:
+            task = distributed_clash_task.delay(
+                check.id,
+                clash_sets=request.data.get("clash_sets"),
                 tolerance_hard=tolerance_hard,
                 tolerance_soft=tolerance_soft,
+                soft_clearance=request.data.get("soft_clearance", True),
+                chunk_size=request.data.get("chunk_size"),
+                fan_out=request.data.get("fan_out"),
+            )
+        except Exception as e:
+            save_failure(check, f"Could not queue clash detection: {e}")
+            return self._queue_unavailable(e)
+        return Response(
+            {"check_id": check.id, "task_id": task.id, "status": "pending"},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    @action(detail=False, methods=["post"])
+    def tolerance_sweep(self, request):
+        """
+        Clash counts across tolerances without re-running geometry.
+
+        Pass tolerances, a list of numbers (used for both checks) or
+        [hard, soft] pairs, for the counts a clash run would report at each;
+        or bins for a histogram of box gaps and mesh distances instead.
+
+        Candidate-pair distances are computed once per model and clash_sets
+        up to max_tolerance (default BIMFLOW_CLASH_SWEEP_MAX_TOLERANCE, raised
+        to the largest tolerance asked for, at most
+        BIMFLOW_CLASH_SWEEP_TOLERANCE_LIMIT) and stored next to the geometry
+        sidecar, so later sweeps within that range only count. Until they are
+        stored, the computation is queued and 202 is returned with its
+        task_id; repeat the request once the task has finished.
+        """
+        ifc_id = request.data.get("ifc_id")
+        if not ifc_id:
+            return Response(
+                {"error": "ifc_id required"}, status=status.HTTP_400_BAD_REQUEST
             )
-            results = engine.evaluate(ifc_string, generated_ifc.id, include_clash)
+        tolerances = request.data.get("tolerances")
+        bins = request.data.get("bins")
+        try:
+            max_tolerance = float(
+                request.data.get(
+                    "max_tolerance", settings.BIMFLOW_CLASH_SWEEP_MAX_TOLERANCE
+                )
+            )
+            if tolerances is not None:
+                tolerances = parse_tolerances(tolerances)
+                max_tolerance = max(max_tolerance, *(max(t) for t in tolerances))
+            else:
+                bins = 20 if bins is None else int(bins)
+                if not 0 < bins <= MAX_BINS:
+                    raise ValueError(f"bins must be between 1 and {MAX_BINS}")
+            if max_tolerance <= 0:
+                raise ValueError("max_tolerance must be positive")
+            limit = settings.BIMFLOW_CLASH_SWEEP_TOLERANCE_LIMIT
+            if max_tolerance > limit:
+                raise ValueError(f"tolerances must not exceed {limit} m")
+        except (TypeError, ValueError) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Get latest check for response
-            check = ComplianceCheck.objects.filter(
-                generated_ifc_id=generated_ifc.id
-            ).latest("checked_at")
+        generated_ifc, error = self._get_evaluable_ifc(request, ifc_id)
+        if error:
+            return error
 
+        clash_sets = request.data.get("clash_sets")
+        table = tolerance_sweep_table(
+            generated_ifc, clash_sets, max_tolerance, compute=False
+        )
+        if table is None:
+            try:
+                task = tolerance_sweep_task.delay(
+                    generated_ifc.id, clash_sets, max_tolerance
+                )
+            except Exception as e:
+                return self._queue_unavailable(e)
             return Response(
                 {
-                    "check_id": check.id,
                     "ifc_id": generated_ifc.id,
-                    "status": check.status,
-                    "results": check.results,
-                    "clash_results": check.clash_results if include_clash else {},
-                    "tolerances": {"hard": tolerance_hard, "soft": tolerance_soft},
+                    "max_tolerance": max_tolerance,
+                    "task_id": task.id,
+                    "status": "pending",
                 },
-                status=status.HTTP_200_OK,
+                status=status.HTTP_202_ACCEPTED,
+            )
+        response = {
+            "ifc_id": generated_ifc.id,
+            "max_tolerance": table["max_tolerance"],
+            "pairs": len(table["distance"]),
+        }
+        if tolerances is not None:
+            response["results"] = sweep_counts(table, tolerances)
+        else:
+            response["histogram"] = distance_histogram(table, bins, max_tolerance)
+        return Response(response)
+
+    @action(detail=False, methods=["post"])
+    def batch_evaluate(self, request):
+        """
+        Evaluate one rule pack across every completed IFC the user can access,
+        optionally narrowed by project_id, asset_type and status.
+        """
+        rule_pack_name = request.data.get("rule_pack")
+        if not rule_pack_name:
+            return Response(
+                {"error": "rule_pack required"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            tolerance_hard, tolerance_soft = self._tolerances(request.data)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        rule_pack = RulePack.objects.filter(name=rule_pack_name).first()
+        if not rule_pack:
+            return Response(
+                {"error": f"No rule pack found for {rule_pack_name}"},
+                status=status.HTTP_404_NOT_FOUND,
             )
 
+        user_organizations = OrganizationMember.objects.filter(
+            user=request.user, is_active=True
+        ).values_list("organization", flat=True)
+        filters = {"status": request.data.get("status", "completed")}
+        for key in ("project_id", "asset_type"):
+            if request.data.get(key) is not None:
+                filters[key] = request.data[key]
+        ifc_ids = list(
+            GeneratedIFC.objects.filter(
+                project__organization__in=user_organizations, **filters
+            )
+            .exclude(ifc_file="")
+            .exclude(ifc_file__isnull=True)
+            .values_list("id", flat=True)
+        )
+        if not ifc_ids:
+            return Response(
+                {"error": "No IFC models match the filter"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        batch = ComplianceBatch.objects.create(
+            user=request.user,
+            rule_pack=rule_pack.name,
+            filters=filters,
+            total=len(ifc_ids),
+        )
+        try:
+            task = batch_evaluate_task.delay(
+                batch.id,
+                ifc_ids,
+                rule_pack.id,
+                include_clash=request.data.get("include_clash", False),
+                tolerance_hard=tolerance_hard,
+                tolerance_soft=tolerance_soft,
+                concurrency=request.data.get("concurrency"),
+            )
         except Exception as e:
-            logger.error(f"Compliance check failed: {e}", exc_info=True)
+            ComplianceBatch.objects.filter(id=batch.id).update(
+                status="failed", summary={"error": str(e)}
+            )
+            return self._queue_unavailable(e)
+        ComplianceBatch.objects.filter(id=batch.id).update(task_id=task.id)
+        return Response(
+            {"batch_id": batch.id, "task_id": task.id, "total": len(ifc_ids)},
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    @action(detail=False, methods=["get"], url_path=r"batches/(?P<batch_id>[0-9]+)")
+    def batch_status(self, request, batch_id=None):
+        """Progress and aggregate summary of a batch started by batch_evaluate."""
+        batch = ComplianceBatch.objects.filter(id=batch_id, user=request.user).first()
+        if not batch:
+            return Response(
+                {"error": "Batch not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+        return Response(ComplianceBatchSerializer(batch).data)
+
+    @action(detail=False, methods=["get"], url_path="profile")
+    def rule_profile(self, request):
+        """
+        Slowest rules of a rule pack across its recent checks.
+
+        Query parameters: rule_pack (required), checks (how many recent
+        checks to scan, 1 to 500, default 50) and limit (rules returned,
+        1 to 100, default 10). Times are in ms; metrics_ms is the part spent
+        resolving metrics, including building the model's metrics index.
+        """
+        rule_pack_name = request.query_params.get("rule_pack")
+        if not rule_pack_name:
             return Response(
-                {"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                {"error": "rule_pack required"}, status=status.HTTP_400_BAD_REQUEST
             )
+        try:
+            check_count = int(request.query_params.get("checks", 50))
+            limit = int(request.query_params.get("limit", 10))
+        except ValueError:
+            return Response(
+                {"error": "checks and limit must be integers"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if not 1 <= check_count <= 500 or not 1 <= limit <= 100:
+            return Response(
+                {"error": "checks must be 1 to 500 and limit 1 to 100"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        recent = list(
+            self.get_queryset()
+            .filter(rule_pack=rule_pack_name)
+            .exclude(timings={})
+            .order_by("-checked_at")
+            .values_list("id", "timings")[:check_count]
+        )
+        slowest = (
+            ComplianceResult.objects.filter(
+                compliance_check_id__in=[check_id for check_id, _ in recent],
+                total_ms__isnull=False,
+            )
+            .values("rule")
+            .annotate(
+                runs=Count("id"),
+                mean_ms=Avg("total_ms"),
+                max_ms=Max("total_ms"),
+                sum_ms=Sum("total_ms"),
+                mean_metrics_ms=Avg("metrics_ms"),
+            )
+            .order_by("-mean_ms")[:limit]
+        )
+        clash_ms = {}
+        for _, timings in recent:
+            for phase, ms in timings.get("clash_ms", {}).items():
+                clash_ms.setdefault(phase, []).append(ms)
+
+        return Response(
+            {
+                "rule_pack": rule_pack_name,
+                "checks": len(recent),
+                "slowest_rules": [
+                    {
+                        "rule": row["rule"],
+                        "runs": row["runs"],
+                        "total_ms": round(row["sum_ms"], 3),
+                        "max_ms": round(row["max_ms"], 3),
+                        "mean_ms": round(row["mean_ms"], 3),
+                        "mean_metrics_ms": round(row["mean_metrics_ms"] or 0.0, 3),
+                    }
+                    for row in slowest
+                ],
+                "clash_mean_ms": {
+                    phase: round(sum(values) / len(values), 3)
+                    for phase, values in clash_ms.items()
+                },
+            }
+        )
 
     @action(detail=False, methods=["post"])
     def upload_rulepack(self, request):
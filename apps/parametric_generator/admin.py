@@ -319,6 +319,7 @@ class GeneratedIFCAdmin(admin.ModelAdmin):
         "status",
         "ifc_file",
         "file_size",
+        "content_hash",
         "error_message",
         "created_at",
         "updated_at",
@@ -342,7 +343,7 @@ class GeneratedIFCAdmin(admin.ModelAdmin):
         (
             "File Details",
             {
-                "fields": ("ifc_file", "file_size"),
+                "fields": ("ifc_file", "file_size", "content_hash"),
             },
         ),
         (
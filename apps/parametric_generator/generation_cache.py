@@ -0,0 +1,125 @@
+# parametric_generator/generation_cache.py
+"""
+Content-addressed cache of generated IFC files.
+
+Generators are deterministic: the same project, asset type and
+specifications always give byte-identical output. A generation is therefore
+keyed by everything the generators read plus GENERATOR_VERSION, and a later
+generation with the same key points its GeneratedIFC at the stored file
+instead of running the generator again.
+
+Cached files are shared by storage key, not copied. The total size of the
+cached files is bounded by BIMFLOW_GENERATION_CACHE_MAX_MB; the least
+recently used entries are dropped, and their file is deleted from storage
+once no GeneratedIFC references it any more.
+"""
+
+import hashlib
+import json
+import logging
+
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+
+from .generators.reproducible import spec_hash
+from .models import GeneratedIFC, GenerationCacheEntry
+
+logger = logging.getLogger(__name__)
+
+GENERATOR_VERSION = 1  # Bump when a generator's output for the same inputs changes
+
+# Project attributes the generators read (absent ones hash as null)
+PROJECT_INPUTS = (
+    "name",
+    "location",
+    "stories",
+    "height",
+    "structural_frame",
+    "span",
+    "length",
+    "lanes",
+    "created_at",
+)
+
+
+def generation_key(project, asset_type: str, specifications) -> str:
+    """SHA-256 over every input the generated file depends on."""
+    payload = {
+        "version": GENERATOR_VERSION,
+        "asset_type": asset_type,
+        "specifications": spec_hash(specifications),
+        # GlobalIds are seeded by the project's primary key
+        "project": project.pk,
+        "project_inputs": {
+            field: getattr(project, field, None) for field in PROJECT_INPUTS
+        },
+    }
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def use_cached_file(ifc: GeneratedIFC, key: str) -> bool:
+    """
+    Point ifc at the cached file for key and mark it completed. Returns
+    False, leaving ifc untouched, on a miss.
+    """
+    entry = GenerationCacheEntry.objects.filter(key=key).first()
+    if entry is None:
+        return False
+    if not entry.file.storage.exists(entry.file.name):
+        logger.warning(f"Cached IFC {entry.file.name} is missing from storage")
+        entry.delete()
+        return False
+
+    now = timezone.now()
+    ifc.ifc_file.name = entry.file.name
+    ifc.file_size = entry.file_size
+    # Another record sharing the file may already have hashed it
+    ifc.content_hash = (
+        GeneratedIFC.objects.filter(ifc_file=entry.file.name)
+        .exclude(content_hash="")
+        .values_list("content_hash", flat=True)
+        .first()
+        or ""
+    )
+    ifc.status = "completed"
+    ifc.completed_at = now
+    ifc.error_message = None
+    ifc.save()
+    GenerationCacheEntry.objects.filter(id=entry.id).update(last_used_at=now)
+    logger.info(f"Generation cache hit {key[:12]} -> IFC {ifc.id}")
+    return True
+
+
+def store_file(ifc: GeneratedIFC, key: str):
+    """Register the freshly generated file of ifc under key, then enforce the quota."""
+    GenerationCacheEntry.objects.update_or_create(
+        key=key,
+        defaults={
+            "file": ifc.ifc_file.name,
+            "file_size": ifc.file_size,
+            "last_used_at": timezone.now(),
+        },
+    )
+    evict(settings.BIMFLOW_GENERATION_CACHE_MAX_MB * 1024 * 1024)
+
+
+def evict(max_bytes: int):
+    """Drop least recently used entries until the cached files fit in max_bytes."""
+    total = GenerationCacheEntry.objects.aggregate(total=Sum("file_size"))["total"]
+    if not total or total <= max_bytes:
+        return
+    evicted = 0
+    for entry in GenerationCacheEntry.objects.order_by("last_used_at").iterator():
+        if total <= max_bytes:
+            break
+        total -= entry.file_size
+        name = entry.file.name
+        entry.delete()
+        evicted += 1
+        # Records still pointing at the file keep it; it is theirs now
+        if not GeneratedIFC.objects.filter(ifc_file=name).exists():
+            entry.file.storage.delete(name)
+    logger.info(f"Evicted {evicted} cached IFC files")
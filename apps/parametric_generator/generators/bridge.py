@@ -1,67 +1,65 @@
-from ifcopenshell import file as ifc_file, util
-import uuid
+from .ifc_builder import IfcBuilder
+from .relationships import RelationshipBuilder
+from .reproducible import GuidProvider, stamp_header
 
 
-def generate_bridge_ifc(project, specifications):
+def generate_bridge_ifc(project, specifications, asset_type="bridge"):
     """
     Generate bridge IFC from project metadata and specifications.
     Args:
         project: Project model instance with metadata
         specifications: Dict with generation specs (span_length, piers, load_class, etc.)
+        asset_type: Asset type code, part of the GlobalId seed
+    Returns:
+        ifcopenshell.file, written out with GeneratedIFC.write_ifc
     """
-    ifc = ifc_file(schema="IFC4X3")
+    builder = IfcBuilder(schema="IFC4X3")
+    ifc = builder.file
+    guids = GuidProvider.for_project(project, asset_type, specifications)
+    relationships = RelationshipBuilder(ifc, guids)
 
     project_ifc = ifc.createIfcProject(
-        ifc.guid.compress(uuid.uuid4()), project.name or "Bridge Project"
+        GlobalId=guids("project"), Name=project.name or "Bridge Project"
     )
+    project_ifc.RepresentationContexts = [builder.model_context]
     site = ifc.createIfcSite(
-        ifc.guid.compress(uuid.uuid4()), project.location or "Bridge Site"
-    )
-    ifc.createIfcRelAggregates(
-        ifc.guid.compress(uuid.uuid4()), None, None, None, [site], project_ifc
+        GlobalId=guids("site"), Name=project.location or "Bridge Site"
     )
+    site.ObjectPlacement = builder.local_placement()
+    relationships.aggregate(project_ifc, site)
 
     bridge = ifc.createIfcBridge(
-        ifc.guid.compress(uuid.uuid4()), project.name or "Highway Bridge"
-    )
-    ifc.createIfcRelAggregates(
-        ifc.guid.compress(uuid.uuid4()), None, None, None, [bridge], site
+        GlobalId=guids("bridge"), Name=project.name or "Highway Bridge"
     )
+    bridge.ObjectPlacement = builder.local_placement(site.ObjectPlacement)
+    relationships.aggregate(site, bridge)
 
     span_length = specifications.get("span_length", project.span or 50)
     piers = specifications.get("piers", 2)
+    # All piers instance one circular column, spaced evenly along the span
+    pier_shape = builder.shape(
+        [builder.extrusion(builder.circle_profile(1.0), span_length / (piers + 1))]
+    )
+    pier_ids = guids.batch("pier", piers + 1)
     for i in range(piers + 1):
-        pier = ifc.createIfcColumn(ifc.guid.compress(uuid.uuid4()), f"Pier {i + 1}")
-        profile = ifc.createIfcCircleProfileDef(None, None, 1.0)
-        extrusion = ifc.createIfcExtrudedAreaSolid(
-            profile, ifc.createIfcAxis2Placement2D(), span_length / (piers + 1)
-        )
-        rep = ifc.createIfcShapeRepresentation(
-            ifc.createIfcGeometricRepresentationContext(),
-            "Body",
-            "SweptSolid",
-            [extrusion],
-        )
-        pier.Representation = rep
-        ifc.createIfcRelAggregates(
-            ifc.guid.compress(uuid.uuid4()), None, None, None, [pier], bridge
+        pier = ifc.createIfcColumn(GlobalId=pier_ids[i], Name=f"Pier {i + 1}")
+        pier.ObjectPlacement = builder.local_placement(
+            bridge.ObjectPlacement, x=i * span_length / max(piers, 1)
         )
+        pier.Representation = pier_shape
+        relationships.contain(bridge, pier)
 
-    deck = ifc.createIfcSlab(ifc.guid.compress(uuid.uuid4()), "Bridge Deck", "ROOF")
-    ifc.createIfcRelAggregates(
-        ifc.guid.compress(uuid.uuid4()), None, None, None, [deck], bridge
+    deck = ifc.createIfcSlab(
+        GlobalId=guids("deck"), Name="Bridge Deck", PredefinedType="ROOF"
     )
+    relationships.contain(bridge, deck)
 
-    pset = ifc.createIfcPropertySet(
-        ifc.guid.compress(uuid.uuid4()), "Pset_BridgeCommon", None
-    )
-    load_prop = ifc.createIfcPropertySingleValue(
-        "LoadClass",
-        None,
-        ifc.createIfcLabel(specifications.get("load_class", "A")),
-        None,
+    relationships.define_properties(
+        bridge,
+        "Pset_BridgeCommon",
+        {"LoadClass": ifc.createIfcLabel(specifications.get("load_class", "A"))},
     )
-    ifc.createIfcRelDefinesByProperties(None, None, None, [bridge], pset)
-    pset.HasProperties = [load_prop]
 
-    return ifc.to_string()
+    relationships.emit()
+    stamp_header(ifc, project)
+    return ifc
@@ -1,83 +1,81 @@
-from ifcopenshell import file as ifc_file, util
-import uuid
+from .ifc_builder import IfcBuilder
+from .relationships import RelationshipBuilder
+from .reproducible import GuidProvider, stamp_header
 
 
-def generate_building_ifc(project, specifications):
+def generate_building_ifc(project, specifications, asset_type="building"):
     """
     Generate building IFC from project metadata and specifications.
     Args:
         project: Project model instance with metadata
         specifications: Dict with generation specs (floors, height, materials, etc.)
+        asset_type: Asset type code, part of the GlobalId seed
+    Returns:
+        ifcopenshell.file, written out with GeneratedIFC.write_ifc
     """
-    ifc = ifc_file(schema="IFC4X3")
+    builder = IfcBuilder(schema="IFC4X3")
+    ifc = builder.file
+    guids = GuidProvider.for_project(project, asset_type, specifications)
+    relationships = RelationshipBuilder(ifc, guids)
 
     # Project/Site boilerplate
     project_ifc = ifc.createIfcProject(
-        ifc.guid.compress(uuid.uuid4()), project.name or "Building Project"
-    )
-    site = ifc.createIfcSite(
-        ifc.guid.compress(uuid.uuid4()), project.location or "Site"
-    )
-    ifc.createIfcRelAggregates(
-        ifc.guid.compress(uuid.uuid4()), None, None, None, [site], project_ifc
+        GlobalId=guids("project"), Name=project.name or "Building Project"
     )
+    project_ifc.RepresentationContexts = [builder.model_context]
+    site = ifc.createIfcSite(GlobalId=guids("site"), Name=project.location or "Site")
+    site.ObjectPlacement = builder.local_placement()
+    relationships.aggregate(project_ifc, site)
 
     # Building with basic swept solid for walls
     building = ifc.createIfcBuilding(
-        ifc.guid.compress(uuid.uuid4()), project.name or "Office Building"
-    )
-    ifc.createIfcRelAggregates(
-        ifc.guid.compress(uuid.uuid4()), None, None, None, [building], site
+        GlobalId=guids("building"), Name=project.name or "Office Building"
     )
+    building.ObjectPlacement = builder.local_placement(site.ObjectPlacement)
+    relationships.aggregate(site, building)
 
     floors = specifications.get("floors", project.stories or 1)
     height_per_floor = specifications.get("height", project.height or 15) / floors
+    # Every floor's wall is the same solid: 10.0 long, 0.2 thick, 3.0 high,
+    # extruded along X from a thickness x height profile standing on the floor
+    wall_shape = builder.shape(
+        [
+            builder.extrusion(
+                builder.rectangle_profile(0.2, 3.0, y=1.5),
+                10.0,
+                builder.placement_3d(axis=(1, 0, 0), ref_direction=(0, 1, 0)),
+            )
+        ]
+    )
+    wall_material = ifc.createIfcLabel(
+        specifications.get("materials", {}).get(
+            "wall", project.structural_frame or "concrete"
+        )
+    )
+    storey_ids = guids.batch("storey", floors)
+    wall_ids = guids.batch("wall", floors)
     for i in range(floors):
         storey = ifc.createIfcBuildingStorey(
-            ifc.guid.compress(uuid.uuid4()),
-            f"Floor {i + 1}",
-            None,
-            i * height_per_floor,
+            GlobalId=storey_ids[i],
+            Name=f"Floor {i + 1}",
+            Elevation=i * height_per_floor,
         )
-        ifc.createIfcRelAggregates(
-            ifc.guid.compress(uuid.uuid4()), None, None, None, [storey], building
+        storey.ObjectPlacement = builder.local_placement(
+            building.ObjectPlacement, z=i * height_per_floor
         )
+        relationships.aggregate(building, storey)
 
-        # Wall with extrusion (simple rect)
-        wall = ifc.createIfcWall(ifc.guid.compress(uuid.uuid4()), "Exterior Wall")
-        # Add representation: SweptAreaSolid
-        profile = ifc.createIfcRectangleProfileDef(
-            None, None, 0.2, 3.0
-        )  # Thickness x height
-        extrusion = ifc.createIfcExtrudedAreaSolid(
-            profile, ifc.createIfcAxis2Placement2D(), 10.0
-        )  # Length
-        rep = ifc.createIfcShapeRepresentation(
-            ifc.createIfcGeometricRepresentationContext(),
-            "Body",
-            "SweptSolid",
-            [extrusion],
-        )
-        wall.Representation = rep
-        ifc.createIfcRelAggregates(
-            ifc.guid.compress(uuid.uuid4()), None, None, None, [wall], storey
-        )
+        # Wall instancing the shared swept solid
+        wall = ifc.createIfcWall(GlobalId=wall_ids[i], Name="Exterior Wall")
+        wall.ObjectPlacement = builder.local_placement(storey.ObjectPlacement)
+        wall.Representation = wall_shape
+        relationships.contain(storey, wall)
 
-        # Pset
-        pset = ifc.createIfcPropertySet(
-            ifc.guid.compress(uuid.uuid4()), "Pset_WallCommon", None
-        )
-        mat_prop = ifc.createIfcPropertySingleValue(
-            "Material",
-            None,
-            ifc.createIfcLabel(
-                specifications.get("materials", {}).get(
-                    "wall", project.structural_frame or "concrete"
-                )
-            ),
-            None,
+        # Pset, shared by every wall of the same material
+        relationships.define_properties(
+            wall, "Pset_WallCommon", {"Material": wall_material}
         )
-        ifc.createIfcRelDefinesByProperties(None, None, None, [wall], pset)
-        pset.HasProperties = [mat_prop]
 
-    return ifc.to_string()  # Enhanced with geometry for clashes
+    relationships.emit()
+    stamp_header(ifc, project)
+    return ifc
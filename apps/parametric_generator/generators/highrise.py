@@ -1,81 +1,76 @@
-from ifcopenshell import file as ifc_file, util
-import uuid
+from .ifc_builder import IfcBuilder
+from .relationships import RelationshipBuilder
+from .reproducible import GuidProvider, stamp_header
 
 
-def generate_highrise_ifc(project, specifications):
+def generate_highrise_ifc(project, specifications, asset_type="highrise"):
     """
     Generate highrise building IFC from project metadata and specifications.
     Args:
         project: Project model instance with metadata
         specifications: Dict with generation specs (total_floors, core_count, facade_type, etc.)
+        asset_type: Asset type code, part of the GlobalId seed
+    Returns:
+        ifcopenshell.file, written out with GeneratedIFC.write_ifc
     """
-    ifc = ifc_file(schema="IFC4X3")
+    builder = IfcBuilder(schema="IFC4X3")
+    ifc = builder.file
+    guids = GuidProvider.for_project(project, asset_type, specifications)
+    relationships = RelationshipBuilder(ifc, guids)
 
     project_ifc = ifc.createIfcProject(
-        ifc.guid.compress(uuid.uuid4()), project.name or "Highrise Project"
+        GlobalId=guids("project"), Name=project.name or "Highrise Project"
     )
+    project_ifc.RepresentationContexts = [builder.model_context]
     site = ifc.createIfcSite(
-        ifc.guid.compress(uuid.uuid4()), project.location or "Highrise Site"
-    )
-    ifc.createIfcRelAggregates(
-        ifc.guid.compress(uuid.uuid4()), None, None, None, [site], project_ifc
+        GlobalId=guids("site"), Name=project.location or "Highrise Site"
     )
+    site.ObjectPlacement = builder.local_placement()
+    relationships.aggregate(project_ifc, site)
 
     highrise = ifc.createIfcBuilding(
-        ifc.guid.compress(uuid.uuid4()), project.name or "Office Highrise"
-    )
-    ifc.createIfcRelAggregates(
-        ifc.guid.compress(uuid.uuid4()), None, None, None, [highrise], site
+        GlobalId=guids("building"), Name=project.name or "Office Highrise"
     )
+    highrise.ObjectPlacement = builder.local_placement(site.ObjectPlacement)
+    relationships.aggregate(site, highrise)
 
     floors = specifications.get("total_floors", project.stories or 20)
     height_per_floor = 3.5
+    storey_ids = guids.batch("storey", floors)
     for i in range(floors):
         storey = ifc.createIfcBuildingStorey(
-            ifc.guid.compress(uuid.uuid4()),
-            f"Floor {i + 1}",
-            None,
-            i * height_per_floor,
+            GlobalId=storey_ids[i],
+            Name=f"Floor {i + 1}",
+            Elevation=i * height_per_floor,
         )
-        ifc.createIfcRelAggregates(
-            ifc.guid.compress(uuid.uuid4()), None, None, None, [storey], highrise
+        storey.ObjectPlacement = builder.local_placement(
+            highrise.ObjectPlacement, z=i * height_per_floor
         )
+        relationships.aggregate(highrise, storey)
 
     cores = specifications.get("core_count", 1)
+    core_ids = guids.batch("core", cores)
     for c in range(cores):
         core = ifc.createIfcSpace(
-            ifc.guid.compress(uuid.uuid4()), f"Core {c + 1}", "CORE"
-        )
-        ifc.createIfcRelAggregates(
-            ifc.guid.compress(uuid.uuid4()), None, None, None, [core], highrise
+            GlobalId=core_ids[c], Name=f"Core {c + 1}", ObjectType="CORE"
         )
+        relationships.aggregate(highrise, core)
 
-    facade = ifc.createIfcCurtainWall(ifc.guid.compress(uuid.uuid4()), "Glass Facade")
+    facade = ifc.createIfcCurtainWall(GlobalId=guids("facade"), Name="Glass Facade")
+    facade.ObjectPlacement = builder.local_placement(highrise.ObjectPlacement)
     # Simple polyline for facade
-    poly = ifc.createIfcPolyline(
-        [
-            ifc.createIfcCartesianPoint(0, 0, 0),
-            ifc.createIfcCartesianPoint(0, 0, floors * height_per_floor),
-        ]
-    )
-    rep = ifc.createIfcShapeRepresentation(
-        ifc.createIfcGeometricRepresentationContext(), "Axis", "Polyline", [poly]
-    )
-    facade.Representation = rep
-    ifc.createIfcRelAggregates(
-        ifc.guid.compress(uuid.uuid4()), None, None, None, [facade], highrise
+    poly = builder.polyline((0, 0, 0), (0, 0, floors * height_per_floor))
+    facade.Representation = builder.shape(
+        [poly], "Axis", "Curve3D", target_view="GRAPH_VIEW"
     )
+    relationships.contain(highrise, facade)
 
-    pset = ifc.createIfcPropertySet(
-        ifc.guid.compress(uuid.uuid4()), "Pset_CurtainWallCommon", None
-    )
-    facade_prop = ifc.createIfcPropertySingleValue(
-        "FacadeType",
-        None,
-        ifc.createIfcLabel(specifications.get("facade_type", "glass")),
-        None,
+    relationships.define_properties(
+        facade,
+        "Pset_CurtainWallCommon",
+        {"FacadeType": ifc.createIfcLabel(specifications.get("facade_type", "glass"))},
     )
-    ifc.createIfcRelDefinesByProperties(None, None, None, [facade], pset)
-    pset.HasProperties = [facade_prop]
 
-    return ifc.to_string()
+    relationships.emit()
+    stamp_header(ifc, project)
+    return ifc
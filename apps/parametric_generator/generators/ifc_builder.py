@@ -0,0 +1,169 @@
+from ifcopenshell import file as ifc_file
+
+
+class IfcBuilder:
+    """
+    Per-file interning of shared IFC resources for the generators.
+
+    Representation contexts, points, directions, placements, profiles and
+    solids are created once per distinct value and reused. Element geometry
+    goes through shape(): every product with the same solids shares one
+    IfcRepresentationMap and is instanced through an IfcMappedItem, so a
+    storey repeated a hundred times carries its geometry once.
+
+    Args:
+        schema: IFC schema of the generated file
+    """
+
+    def __init__(self, schema="IFC4X3"):
+        self.file = ifc_file(schema=schema)
+        self._interned = {}
+
+    def _intern(self, key, create):
+        entity = self._interned.get(key)
+        if entity is None:
+            entity = self._interned[key] = create()
+        return entity
+
+    @property
+    def model_context(self):
+        """The 3D model context; add it to IfcProject.RepresentationContexts."""
+        return self._intern(
+            ("context",),
+            lambda: self.file.createIfcGeometricRepresentationContext(
+                None, "Model", 3, 1.0e-5, self.placement_3d()
+            ),
+        )
+
+    def subcontext(self, identifier="Body", target_view="MODEL_VIEW"):
+        """Model subcontext for identifier (Body, Axis, ...)."""
+        return self._intern(
+            ("subcontext", identifier, target_view),
+            lambda: self.file.createIfcGeometricRepresentationSubContext(
+                identifier,
+                "Model",
+                ParentContext=self.model_context,
+                TargetView=target_view,
+            ),
+        )
+
+    def point(self, *coordinates):
+        coordinates = tuple(float(c) for c in coordinates)
+        return self._intern(
+            ("point", coordinates),
+            lambda: self.file.createIfcCartesianPoint(coordinates),
+        )
+
+    def direction(self, *ratios):
+        ratios = tuple(float(r) for r in ratios)
+        return self._intern(
+            ("direction", ratios),
+            lambda: self.file.createIfcDirection(ratios),
+        )
+
+    def placement_2d(self, x=0.0, y=0.0):
+        return self._intern(
+            ("placement_2d", float(x), float(y)),
+            lambda: self.file.createIfcAxis2Placement2D(self.point(x, y)),
+        )
+
+    def placement_3d(self, x=0.0, y=0.0, z=0.0, axis=None, ref_direction=None):
+        """
+        Axis placement at (x, y, z); axis and ref_direction are optional
+        (x, y, z) ratios for the local Z and X axes.
+        """
+        axis = tuple(float(r) for r in axis) if axis else None
+        ref_direction = (
+            tuple(float(r) for r in ref_direction) if ref_direction else None
+        )
+        return self._intern(
+            ("placement_3d", float(x), float(y), float(z), axis, ref_direction),
+            lambda: self.file.createIfcAxis2Placement3D(
+                self.point(x, y, z),
+                self.direction(*axis) if axis else None,
+                self.direction(*ref_direction) if ref_direction else None,
+            ),
+        )
+
+    def local_placement(self, relative_to=None, x=0.0, y=0.0, z=0.0):
+        """A product's own IfcLocalPlacement; only its axis placement is shared."""
+        return self.file.createIfcLocalPlacement(
+            relative_to, self.placement_3d(x, y, z)
+        )
+
+    def rectangle_profile(self, x_dim, y_dim, x=0.0, y=0.0):
+        """Rectangle of x_dim by y_dim centred on (x, y)."""
+        return self._intern(
+            ("rectangle", float(x_dim), float(y_dim), float(x), float(y)),
+            lambda: self.file.createIfcRectangleProfileDef(
+                "AREA", None, self.placement_2d(x, y), float(x_dim), float(y_dim)
+            ),
+        )
+
+    def circle_profile(self, radius):
+        return self._intern(
+            ("circle", float(radius)),
+            lambda: self.file.createIfcCircleProfileDef(
+                "AREA", None, self.placement_2d(), float(radius)
+            ),
+        )
+
+    def extrusion(self, profile, depth, position=None):
+        """Extrude profile by depth along the local Z axis of position."""
+        position = position or self.placement_3d()
+        return self._intern(
+            ("extrusion", profile.id(), position.id(), float(depth)),
+            lambda: self.file.createIfcExtrudedAreaSolid(
+                profile, position, self.direction(0, 0, 1), float(depth)
+            ),
+        )
+
+    def polyline(self, *points):
+        """Polyline through (x, y, z) points."""
+        points = tuple(tuple(float(c) for c in p) for p in points)
+        return self._intern(
+            ("polyline", points),
+            lambda: self.file.createIfcPolyline([self.point(*p) for p in points]),
+        )
+
+    def shape(
+        self,
+        items,
+        identifier="Body",
+        representation_type="SweptSolid",
+        target_view="MODEL_VIEW",
+    ):
+        """
+        IfcProductDefinitionShape instancing items through a shared
+        IfcRepresentationMap; the same items always give the same shape.
+        """
+        key = ("shape", identifier, representation_type, *(i.id() for i in items))
+
+        def create():
+            context = self.subcontext(identifier, target_view)
+            mapped = self.file.createIfcRepresentationMap(
+                self.placement_3d(),
+                self.file.createIfcShapeRepresentation(
+                    context, identifier, representation_type, list(items)
+                ),
+            )
+            instance = self.file.createIfcMappedItem(
+                mapped,
+                self._intern(
+                    ("identity",),
+                    lambda: self.file.createIfcCartesianTransformationOperator3D(
+                        None, None, self.point(0, 0, 0), None, None
+                    ),
+                ),
+            )
+            return self.file.createIfcProductDefinitionShape(
+                None,
+                None,
+                [
+                    self.file.createIfcShapeRepresentation(
+                        context, identifier, "MappedRepresentation", [instance]
+                    )
+                ],
+            )
+
+        return self._intern(key, create)
@@ -0,0 +1,82 @@
+import ifcopenshell.guid
+
+
+class RelationshipBuilder:
+    """
+    Collects decomposition, containment and property relationships while a
+    generator builds its objects, and emits them in batches with emit().
+
+    Children are grouped per parent into one IfcRelAggregates, elements per
+    spatial structure into one IfcRelContainedInSpatialStructure, and equal
+    property sets are created once and attached to all their objects
+    through a single IfcRelDefinesByProperties.
+
+    Args:
+        ifc: ifcopenshell file the relationships are created in
+        guids: GuidProvider (or any callable mapping an element path to a
+            GlobalId); relationships are named after the objects they
+            relate. Random GlobalIds when omitted.
+    """
+
+    def __init__(self, ifc, guids=None):
+        self.ifc = ifc
+        self.guids = guids or (lambda path: ifcopenshell.guid.new())
+        self._aggregates = {}
+        self._containment = {}
+        self._property_sets = {}
+
+    def aggregate(self, parent, *children):
+        """Decompose parent into children (spatial breakdown, alignments)."""
+        self._aggregates.setdefault(parent, []).extend(children)
+
+    def contain(self, structure, *elements):
+        """Place elements in a spatial structure (storey, building, facility)."""
+        self._containment.setdefault(structure, []).extend(elements)
+
+    def define_properties(self, obj, name, properties):
+        """
+        Attach the property set name to obj; properties maps property names
+        to IFC values, e.g. {"Material": ifc.createIfcLabel("concrete")}.
+        """
+        key = (
+            name,
+            tuple(
+                (prop, value.is_a(), value.wrappedValue)
+                for prop, value in properties.items()
+            ),
+        )
+        entry = self._property_sets.get(key)
+        if entry is None:
+            entry = self._property_sets[key] = (name, dict(properties), [])
+        entry[2].append(obj)
+
+    def emit(self):
+        """Create every collected relationship; call once, before serializing."""
+        for parent, children in self._aggregates.items():
+            self.ifc.createIfcRelAggregates(
+                GlobalId=self.guids(f"aggregates/{parent.GlobalId}"),
+                RelatingObject=parent,
+                RelatedObjects=children,
+            )
+        for structure, elements in self._containment.items():
+            self.ifc.createIfcRelContainedInSpatialStructure(
+                GlobalId=self.guids(f"contains/{structure.GlobalId}"),
+                RelatedElements=elements,
+                RelatingStructure=structure,
+            )
+        for name, properties, objects in self._property_sets.values():
+            path = f"{name}/{objects[0].GlobalId}"
+            pset = self.ifc.createIfcPropertySet(
+                GlobalId=self.guids(f"pset/{path}"),
+                Name=name,
+                HasProperties=[
+                    self.ifc.createIfcPropertySingleValue(Name=prop, NominalValue=value)
+                    for prop, value in properties.items()
+                ],
+            )
+            self.ifc.createIfcRelDefinesByProperties(
+                GlobalId=self.guids(f"defines/{path}"),
+                RelatedObjects=objects,
+                RelatingPropertyDefinition=pset,
+            )
+        self._aggregates, self._containment, self._property_sets = {}, {}, {}
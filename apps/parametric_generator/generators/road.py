@@ -1,73 +1,79 @@
-from ifcopenshell import file as ifc_file, util
-import uuid
+from .ifc_builder import IfcBuilder
+from .relationships import RelationshipBuilder
+from .reproducible import GuidProvider, stamp_header
 
 
-def generate_road_ifc(project, specifications):
+def generate_road_ifc(project, specifications, asset_type="road"):
     """
     Generate road IFC from project metadata and specifications.
     Args:
         project: Project model instance with metadata
         specifications: Dict with generation specs (alignment_length, lanes, crossfall, etc.)
+        asset_type: Asset type code, part of the GlobalId seed
+    Returns:
+        ifcopenshell.file, written out with GeneratedIFC.write_ifc
     """
-    ifc = ifc_file(schema="IFC4X3")
+    builder = IfcBuilder(schema="IFC4X3")
+    ifc = builder.file
+    guids = GuidProvider.for_project(project, asset_type, specifications)
+    relationships = RelationshipBuilder(ifc, guids)
 
     project_ifc = ifc.createIfcProject(
-        ifc.guid.compress(uuid.uuid4()), project.name or "Road Project"
+        GlobalId=guids("project"), Name=project.name or "Road Project"
     )
+    project_ifc.RepresentationContexts = [builder.model_context]
     site = ifc.createIfcSite(
-        ifc.guid.compress(uuid.uuid4()), project.location or "Road Site"
-    )
-    ifc.createIfcRelAggregates(
-        ifc.guid.compress(uuid.uuid4()), None, None, None, [site], project_ifc
+        GlobalId=guids("site"), Name=project.location or "Road Site"
     )
+    relationships.aggregate(project_ifc, site)
 
     road = ifc.createIfcRoad(
-        ifc.guid.compress(uuid.uuid4()), project.name or "Highway Road"
-    )
-    ifc.createIfcRelAggregates(
-        ifc.guid.compress(uuid.uuid4()), None, None, None, [road], site
+        GlobalId=guids("road"), Name=project.name or "Highway Road"
     )
+    relationships.aggregate(site, road)
 
     length = specifications.get("alignment_length", project.length or 1000)
     alignment = ifc.createIfcAlignment(
-        ifc.guid.compress(uuid.uuid4()), "Road Alignment"
+        GlobalId=guids("alignment"), Name="Road Alignment"
     )
-    # Add segment curve
-    curve = ifc.createIfcCompositeCurve(
-        [
-            [
-                ifc.createIfcPolyline(
-                    [
-                        [ifc.createIfcCartesianPoint(0, 0, 0)],
-                        [ifc.createIfcCartesianPoint(length, 0, 0)],
-                    ]
-                )
-            ]
-        ]
+    # Alignment axis curve
+    alignment.Representation = builder.shape(
+        [builder.polyline((0, 0, 0), (length, 0, 0))],
+        "Axis",
+        "Curve3D",
+        target_view="GRAPH_VIEW",
     )
     segment = ifc.createIfcAlignmentSegment(
-        ifc.guid.compress(uuid.uuid4()), f"Segment 1", curve
-    )
-    ifc.createIfcRelAggregates(
-        ifc.guid.compress(uuid.uuid4()), None, None, None, [segment], alignment
+        GlobalId=guids("alignment/segment/0"),
+        Name="Segment 1",
+        DesignParameters=ifc.createIfcAlignmentHorizontalSegment(
+            StartPoint=builder.point(0, 0),
+            StartDirection=0.0,
+            StartRadiusOfCurvature=0.0,
+            EndRadiusOfCurvature=0.0,
+            SegmentLength=float(length),
+            PredefinedType="LINE",
+        ),
     )
+    relationships.aggregate(alignment, segment)
 
     lanes = specifications.get("lanes", project.lanes or 2)
+    lane_ids = guids.batch("lane", lanes)
     for i in range(lanes):
-        lane = ifc.createIfcRoadSegment(
-            ifc.guid.compress(uuid.uuid4()), f"Lane {i + 1}"
-        )
-        ifc.createIfcRelAggregates(
-            ifc.guid.compress(uuid.uuid4()), None, None, None, [lane], road
+        lane = ifc.createIfcRoadPart(
+            GlobalId=lane_ids[i],
+            Name=f"Lane {i + 1}",
+            UsageType="LONGITUDINAL",
+            PredefinedType="TRAFFICLANE",
         )
+        relationships.aggregate(road, lane)
 
-    pset = ifc.createIfcPropertySet(
-        ifc.guid.compress(uuid.uuid4()), "Pset_RoadCommon", None
-    )
-    crossfall_prop = ifc.createIfcPropertySingleValue(
-        "Crossfall", None, ifc.createIfcReal(specifications.get("crossfall", 2.0)), None
+    relationships.define_properties(
+        road,
+        "Pset_RoadCommon",
+        {"Crossfall": ifc.createIfcReal(specifications.get("crossfall", 2.0))},
     )
-    ifc.createIfcRelDefinesByProperties(None, None, None, [road], pset)
-    pset.HasProperties = [crossfall_prop]
 
-    return ifc.to_string()
+    relationships.emit()
+    stamp_header(ifc, project)
+    return ifc
@@ -1,82 +1,94 @@
-from ifcopenshell import file as ifc_file, util
-import uuid
+from .ifc_builder import IfcBuilder
+from .relationships import RelationshipBuilder
+from .reproducible import GuidProvider, stamp_header
 
 
-def generate_tunnel_ifc(project, specifications):
+def generate_tunnel_ifc(project, specifications, asset_type="tunnel"):
     """
     Generate tunnel IFC from project metadata and specifications.
     Args:
         project: Project model instance with metadata
         specifications: Dict with generation specs (length, diameter, materials, etc.)
+        asset_type: Asset type code, part of the GlobalId seed
+    Returns:
+        ifcopenshell.file, written out with GeneratedIFC.write_ifc
     """
-    ifc = ifc_file(schema="IFC4X3")
+    builder = IfcBuilder(schema="IFC4X3")
+    ifc = builder.file
+    guids = GuidProvider.for_project(project, asset_type, specifications)
+    relationships = RelationshipBuilder(ifc, guids)
 
     project_ifc = ifc.createIfcProject(
-        ifc.guid.compress(uuid.uuid4()), project.name or "Tunnel Project"
+        GlobalId=guids("project"), Name=project.name or "Tunnel Project"
     )
+    project_ifc.RepresentationContexts = [builder.model_context]
     site = ifc.createIfcSite(
-        ifc.guid.compress(uuid.uuid4()), project.location or "Tunnel Site"
-    )
-    ifc.createIfcRelAggregates(
-        ifc.guid.compress(uuid.uuid4()), None, None, None, [site], project_ifc
+        GlobalId=guids("site"), Name=project.location or "Tunnel Site"
     )
+    site.ObjectPlacement = builder.local_placement()
+    relationships.aggregate(project_ifc, site)
 
-    tunnel = ifc.createIfcTunnel(
-        ifc.guid.compress(uuid.uuid4()), project.name or "Subway Tunnel"
-    )  # IFC4.3 infra type
-    ifc.createIfcRelAggregates(
-        ifc.guid.compress(uuid.uuid4()), None, None, None, [tunnel], site
+    # IFC4X3 has no dedicated tunnel entity; a typed facility stands in
+    tunnel = ifc.createIfcFacility(
+        GlobalId=guids("tunnel"),
+        Name=project.name or "Subway Tunnel",
+        ObjectType="TUNNEL",
     )
+    tunnel.ObjectPlacement = builder.local_placement(site.ObjectPlacement)
+    relationships.aggregate(site, tunnel)
 
     length = specifications.get("length", project.length or 500)
     # Simple alignment for tunnel
     alignment = ifc.createIfcAlignment(
-        ifc.guid.compress(uuid.uuid4()), "Tunnel Alignment"
+        GlobalId=guids("alignment"), Name="Tunnel Alignment"
     )
-    curve = ifc.createIfcPolyline(
-        [
-            [ifc.createIfcCartesianPoint(0, 0, 0)],
-            [ifc.createIfcCartesianPoint(length, 0, -10)],
-        ]
-    )  # Slight grade
-    segment = ifc.createIfcAlignmentSegment(
-        ifc.guid.compress(uuid.uuid4()), "Tunnel Segment", curve
+    curve = builder.polyline((0, 0, 0), (length, 0, -10))  # Slight grade
+    alignment.Representation = builder.shape(
+        [curve], "Axis", "Curve3D", target_view="GRAPH_VIEW"
     )
-    ifc.createIfcRelAggregates(
-        ifc.guid.compress(uuid.uuid4()), None, None, None, [segment], alignment
+    segment = ifc.createIfcAlignmentSegment(
+        GlobalId=guids("alignment/segment/0"),
+        Name="Tunnel Segment",
+        DesignParameters=ifc.createIfcAlignmentHorizontalSegment(
+            StartPoint=builder.point(0, 0),
+            StartDirection=0.0,
+            StartRadiusOfCurvature=0.0,
+            EndRadiusOfCurvature=0.0,
+            SegmentLength=float(length),
+            PredefinedType="LINE",
+        ),
     )
+    relationships.aggregate(alignment, segment)
 
     # Lining wall (example element)
-    lining = ifc.createIfcWall(ifc.guid.compress(uuid.uuid4()), "Tunnel Lining")
-    profile = ifc.createIfcCircleProfileDef(
-        None, None, specifications.get("diameter", 5.0)
-    )  # Radius
-    extrusion = ifc.createIfcExtrudedAreaSolid(
-        profile, ifc.createIfcAxis2Placement2D(), length
-    )
-    rep = ifc.createIfcShapeRepresentation(
-        ifc.createIfcGeometricRepresentationContext(), "Body", "SweptSolid", [extrusion]
-    )
-    lining.Representation = rep
-    ifc.createIfcRelAggregates(
-        ifc.guid.compress(uuid.uuid4()), None, None, None, [lining], tunnel
+    lining = ifc.createIfcWall(GlobalId=guids("lining"), Name="Tunnel Lining")
+    lining.ObjectPlacement = builder.local_placement(tunnel.ObjectPlacement)
+    # Radius, extruded along the alignment (X)
+    profile = builder.circle_profile(specifications.get("diameter", 5.0))
+    lining.Representation = builder.shape(
+        [
+            builder.extrusion(
+                profile,
+                length,
+                builder.placement_3d(axis=(1, 0, 0), ref_direction=(0, 1, 0)),
+            )
+        ]
     )
+    relationships.contain(tunnel, lining)
 
     # Pset
-    pset = ifc.createIfcPropertySet(
-        ifc.guid.compress(uuid.uuid4()), "Pset_TunnelCommon", None
-    )
-    mat_prop = ifc.createIfcPropertySingleValue(
-        "Material",
-        None,
-        ifc.createIfcLabel(
-            specifications.get("materials", {}).get(
-                "lining", project.structural_frame or "reinforced_concrete"
+    relationships.define_properties(
+        tunnel,
+        "Pset_TunnelCommon",
+        {
+            "Material": ifc.createIfcLabel(
+                specifications.get("materials", {}).get(
+                    "lining", project.structural_frame or "reinforced_concrete"
+                )
             )
-        ),
-        None,
+        },
     )
-    ifc.createIfcRelDefinesByProperties(None, None, None, [tunnel], pset)
-    pset.HasProperties = [mat_prop]
 
-    return ifc.to_string()
+    relationships.emit()
+    stamp_header(ifc, project)
+    return ifc
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-17 17:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "parametric_generator",
+            "0005_remove_project_address_remove_project_angle_unit_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="generatedifc",
+            name="content_hash",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="SHA-256 of the stored IFC file, filled on first use",
+                max_length=64,
+            ),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("parametric_generator", "0006_generatedifc_content_hash"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GenerationCacheEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "key",
+                    models.CharField(
+                        help_text="SHA-256 of the generator inputs and generator version",
+                        max_length=64,
+                        unique=True,
+                    ),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        help_text="Stored IFC file shared by the records generated from this key",
+                        upload_to="ifc_files/%Y/%m/%d/",
+                    ),
+                ),
+                (
+                    "file_size",
+                    models.BigIntegerField(default=0, help_text="File size in bytes"),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "last_used_at",
+                    models.DateTimeField(
+                        db_index=True,
+                        help_text="Last time the file was stored or reused",
+                    ),
+                ),
+            ],
+        ),
+    ]
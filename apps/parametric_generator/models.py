@@ -1,5 +1,10 @@
 from django.db import models
 from django.conf import settings
+from django.core.files import File
+import hashlib
+import os
+import tempfile
+import ifcopenshell
 from apps.users.models import Organization
 
 
@@ -499,6 +504,12 @@ class GeneratedIFC(models.Model):
         help_text="Generated IFC file (supports S3 or local storage)",
     )
     file_size = models.BigIntegerField(default=0, help_text="File size in bytes")
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text="SHA-256 of the stored IFC file, filled on first use",
+    )
 
     # Error Tracking
     error_message = models.TextField(
@@ -522,3 +533,83 @@ class GeneratedIFC(models.Model):
     def __str__(self):
         name = self.name or f"{self.project.name} - {self.get_asset_type_display()}"
         return name
+
+    def get_content_hash(self):
+        """Return the SHA-256 of the stored IFC file, computing and saving it on first use."""
+        if not self.content_hash and self.ifc_file:
+            digest = hashlib.sha256()
+            with self.ifc_file.storage.open(self.ifc_file.name, "rb") as f:
+                for chunk in f.chunks():
+                    digest.update(chunk)
+            self.content_hash = digest.hexdigest()
+            self.save(update_fields=["content_hash"])
+        return self.content_hash
+
+    def open_ifc(self):
+        """
+        Parse the stored IFC file into an ifcopenshell.file.
+
+        Local files are opened by path so no decoded copy is held in Python;
+        remote storage is streamed to a temporary file first.
+        """
+        storage, name = self.ifc_file.storage, self.ifc_file.name
+        try:
+            return ifcopenshell.open(storage.path(name))
+        except NotImplementedError:
+            pass  # Remote storage (e.g. S3) has no local path
+        with tempfile.NamedTemporaryFile(suffix=".ifc") as tmp:
+            with storage.open(name, "rb") as f:
+                for chunk in f.chunks():
+                    tmp.write(chunk)
+            tmp.flush()
+            return ifcopenshell.open(tmp.name)
+
+    def write_ifc(self, model, filename):
+        """
+        Store an ifcopenshell.file as ifc_file without serializing it in memory.
+
+        The model is written to a temporary file, which is hashed and handed
+        to storage as a file handle, so peak memory stays at the model itself
+        plus one chunk. Sets ifc_file, file_size and content_hash; the caller
+        saves the record.
+        """
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "model.ifc")
+            model.write(path)
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(File.DEFAULT_CHUNK_SIZE), b""):
+                    digest.update(chunk)
+                self.file_size = f.tell()
+                f.seek(0)
+                self.ifc_file.save(filename, File(f), save=False)
+        self.content_hash = digest.hexdigest()
+
+
+class GenerationCacheEntry(models.Model):
+    """
+    A generated IFC file reusable by every generation with the same inputs.
+
+    The entry holds the storage key of the file, so GeneratedIFC records
+    produced from identical inputs all point at one stored file. Files are
+    never written in place (a new generation saves under a new name), so a
+    shared key is never modified under the records referencing it.
+    """
+
+    key = models.CharField(
+        max_length=64,
+        unique=True,
+        help_text="SHA-256 of the generator inputs and generator version",
+    )
+    file = models.FileField(
+        upload_to="ifc_files/%Y/%m/%d/",
+        help_text="Stored IFC file shared by the records generated from this key",
+    )
+    file_size = models.BigIntegerField(default=0, help_text="File size in bytes")
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(
+        db_index=True, help_text="Last time the file was stored or reused"
+    )
+
+    def __str__(self):
+        return f"{self.key[:12]} -> {self.file.name}"
@@ -1,9 +1,7 @@
 from celery import shared_task
-from ifcopenshell import file as ifc_file
-import base64
-from io import BytesIO
-from django.core.files.base import ContentFile
+from django.utils import timezone
 from .models import GeneratedIFC
+from .generation_cache import generation_key, store_file, use_cached_file
 from .generators import (
     building,
     bridge,
@@ -24,11 +22,21 @@ logger = logging.getLogger(__name__)
 def generate_ifc_task(self, model_id, asset_type_code, spec_json, scenario_id=None):
     try:
         model = GeneratedIFC.objects.get(id=model_id)
+        channel_layer = get_channel_layer()
+
+        # Identical inputs already generated: reuse that file
+        cache_key = generation_key(model.project, asset_type_code, spec_json)
+        if not scenario_id and use_cached_file(model, cache_key):
+            async_to_sync(channel_layer.group_send)(
+                f"task_{self.request.id}",
+                {"type": "task_update", "status": "completed", "progress": 100},
+            )
+            return {"status": "success", "model_id": model_id, "cached": True}
+
         model.status = "generating"
         model.save()
 
         # Broadcast progress
-        channel_layer = get_channel_layer()
         async_to_sync(channel_layer.group_send)(
             f"task_{self.request.id}",
             {"type": "task_update", "status": "generating", "progress": 30},
@@ -50,19 +58,24 @@ def generate_ifc_task(self, model_id, asset_type_code, spec_json, scenario_id=No
             logger.warning(
                 f"Using generic fallback for {asset_type_code}; implement custom generator."
             )
-            ifc_string = generic.generate_generic_ifc(spec_json, asset_type_code)
+            gen_func = generic.generate_generic_ifc
+        ifc_model = gen_func(model.project, spec_json, asset_type=asset_type_code)
+        if gen_func is generic.generate_generic_ifc:
             spec_json["_fallback_used"] = True  # Flag in results
-        else:
-            ifc_string = gen_func(spec_json)
 
         # Federated merge if scenario
         if scenario_id:
             # Placeholder: Merge with baseline IFC
             pass
 
-        # Use new method to save
-        base64_data = base64.b64encode(ifc_string.encode()).decode()
-        model.save_ifc_from_base64(base64_data, f"{model.id}.ifc")
+        # Stream the IFC file to storage
+        model.write_ifc(ifc_model, f"{model.id}.ifc")
+        model.status = "completed"
+        model.completed_at = timezone.now()
+        model.error_message = None
+        model.save()
+        if not scenario_id:
+            store_file(model, cache_key)
 
         async_to_sync(channel_layer.group_send)(
             f"task_{self.request.id}",
@@ -0,0 +1,75 @@
+import datetime
+import time
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+
+from .generation_cache import generation_key
+from .generators import bridge, building, generic, highrise, road, tunnel
+
+GENERATORS = [
+    ("building", building.generate_building_ifc, {"floors": 3, "height": 9}),
+    ("bridge", bridge.generate_bridge_ifc, {"span_length": 40, "piers": 3}),
+    ("road", road.generate_road_ifc, {"alignment_length": 200, "lanes": 2}),
+    ("highrise", highrise.generate_highrise_ifc, {"total_floors": 5}),
+    ("tunnel", tunnel.generate_tunnel_ifc, {"length": 100, "diameter": 6.0}),
+    ("railway", generic.generate_generic_ifc, {"dimensions": {"length": 80}}),
+]
+
+
+def make_project(pk=1, **fields):
+    """Stand-in for a Project with every attribute the generators read."""
+    values = dict(
+        name="Test project",
+        location="Site",
+        stories=None,
+        height=None,
+        structural_frame=None,
+        span=None,
+        length=None,
+        lanes=None,
+        created_at=datetime.datetime(2024, 5, 1, 12, 0, tzinfo=datetime.timezone.utc),
+    )
+    values.update(fields)
+    return SimpleNamespace(pk=pk, **values)
+
+
+class ReproducibleGenerationTests(SimpleTestCase):
+    def test_identical_inputs_give_identical_files(self):
+        first = [
+            generate(make_project(), specifications, asset_type=asset_type).to_string()
+            for asset_type, generate, specifications in GENERATORS
+        ]
+        time.sleep(1)  # Would show in a wall-clock header timestamp
+        for (asset_type, generate, specifications), expected in zip(GENERATORS, first):
+            with self.subTest(asset_type=asset_type):
+                # Same specs with their keys in the other order
+                reordered = dict(reversed(list(specifications.items())))
+                second = generate(make_project(), reordered, asset_type=asset_type)
+                self.assertEqual(second.to_string(), expected)
+
+    def test_other_project_gives_other_global_ids(self):
+        asset_type, generate, specifications = GENERATORS[0]
+        files = [
+            generate(make_project(pk=pk), specifications, asset_type=asset_type)
+            for pk in (1, 2)
+        ]
+        ids = [{e.GlobalId for e in f.by_type("IfcRoot")} for f in files]
+        self.assertTrue(ids[0])
+        self.assertFalse(ids[0] & ids[1])
+
+    def test_generation_key(self):
+        project = make_project()
+        key = generation_key(project, "building", {"floors": 3, "height": 9})
+        self.assertEqual(
+            key, generation_key(project, "building", {"height": 9, "floors": 3})
+        )
+        for other in (
+            generation_key(project, "building", {"floors": 4, "height": 9}),
+            generation_key(project, "highrise", {"floors": 3, "height": 9}),
+            generation_key(make_project(pk=2), "building", {"floors": 3, "height": 9}),
+            generation_key(
+                make_project(stories=2), "building", {"floors": 3, "height": 9}
+            ),
+        ):
+            self.assertNotEqual(key, other)
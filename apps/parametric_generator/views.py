@@ -7,6 +7,7 @@ from django.utils import timezone
 import logging
 
 from .models import Project, GeneratedIFC, Site
+from .generation_cache import generation_key, store_file, use_cached_file
 from .serializers import (
     ProjectSerializer,
     ProjectDetailSerializer,
@@ -262,8 +263,17 @@ class GeneratedIFCViewSet(viewsets.ModelViewSet):
         ifc.status = "pending"
         ifc.error_message = None
         ifc.ifc_file = None
+        ifc.content_hash = ""
         ifc.completed_at = None
-        ifc.save(update_fields=["status", "error_message", "ifc_file", "completed_at"])
+        ifc.save(
+            update_fields=[
+                "status",
+                "error_message",
+                "ifc_file",
+                "content_hash",
+                "completed_at",
+            ]
+        )
 
         logger.info(f"IFC regeneration requested: {ifc.id}")
 
@@ -319,7 +329,13 @@ class GeneratedIFCViewSet(viewsets.ModelViewSet):
         detail=True, methods=["post"], permission_classes=[permissions.IsAuthenticated]
     )
     def generate(self, request, pk=None):
-        """Generate IFC file for a GeneratedIFC record"""
+        """
+        Generate IFC file for a GeneratedIFC record
+
+        When a file was already generated from the same project, asset type
+        and specifications, the record reuses it at once (cached=true)
+        unless use_cache=false.
+        """
         ifc = self.get_object()
         self.check_object_permissions(request, ifc)
 
@@ -329,6 +345,20 @@ class GeneratedIFCViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        cache_key = generation_key(ifc.project, ifc.asset_type, ifc.specifications)
+        if request.data.get("use_cache", True) and use_cached_file(ifc, cache_key):
+            return Response(
+                {
+                    "message": "IFC generated successfully",
+                    "id": ifc.id,
+                    "status": ifc.status,
+                    "file_size": ifc.file_size,
+                    "completed_at": ifc.completed_at,
+                    "cached": True,
+                },
+                status=status.HTTP_200_OK,
+            )
+
         # Update status to generating
         ifc.status = "generating"
         ifc.save(update_fields=["status"])
@@ -383,21 +413,21 @@ class GeneratedIFCViewSet(viewsets.ModelViewSet):
             if not generator:
                 raise ValueError(f"No generator for asset type: {ifc.asset_type}")
 
-            # Call generator with project and specifications
-            ifc_content = generator(ifc.project, ifc.specifications)
+            # Call generator with project and specifications; the asset type
+            # seeds the GlobalIds, so identical inputs give identical files
+            model = generator(
+                ifc.project, ifc.specifications, asset_type=ifc.asset_type
+            )
 
-            # Save IFC file
+            # Stream the IFC file to storage
             filename = f"{ifc.project.project_number}_{ifc.asset_type}_{ifc.id}.ifc"
-            from django.core.files.base import ContentFile
+            ifc.write_ifc(model, filename)
 
-            ifc.ifc_file.save(filename, ContentFile(ifc_content), save=False)
-            ifc.file_size = len(
-                ifc_content.encode() if isinstance(ifc_content, str) else ifc_content
-            )
             ifc.status = "completed"
             ifc.completed_at = timezone.now()
             ifc.error_message = None
             ifc.save()
+            store_file(ifc, cache_key)
 
             logger.info(f"IFC generation completed: {ifc.id}")
 
@@ -408,6 +438,7 @@ class GeneratedIFCViewSet(viewsets.ModelViewSet):
                     "status": ifc.status,
                     "file_size": ifc.file_size,
                     "completed_at": ifc.completed_at,
+                    "cached": False,
                 },
                 status=status.HTTP_200_OK,
             )
@@ -0,0 +1,18 @@
+"""
+Celery application for bimflow.
+
+Settings prefixed CELERY_ in the Django settings configure it (broker,
+result backend, CELERY_TASK_ALWAYS_EAGER, ...). Start a worker with:
+
+    celery -A config worker -l info
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.local")
+
+app = Celery("bimflow")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
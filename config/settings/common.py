@@ -170,6 +170,10 @@ CELERY_ACCEPT_CONTENT = ["json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = TIME_ZONE
+# Run tasks in-process (no broker needed) for local development
+CELERY_TASK_ALWAYS_EAGER = (
+    os.getenv("CELERY_TASK_ALWAYS_EAGER", "False").lower() == "true"
+)
 
 # Channels
 CHANNEL_LAYERS = {
@@ -194,7 +198,32 @@ BIMFLOW_IFC_VERSION = "IFC4X3"
 BIMFLOW_OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 BIMFLOW_GROQ_API_KEY = os.getenv("BIMFLOW_GROQ_API_KEY", "")
 BIMFLOW_MAX_IFC_SIZE_MB = 100
+# Largest model evaluate_ifc will check inside the request when blocking=true
+BIMFLOW_BLOCKING_COMPLIANCE_MAX_MB = int(
+    os.getenv("BIMFLOW_BLOCKING_COMPLIANCE_MAX_MB", 10)
+)
 BIMFLOW_RULEPACKS_DIR = BASE_DIR / "compliance_engine" / "rulepacks"
+BIMFLOW_CLASH_WORKERS = int(os.getenv("BIMFLOW_CLASH_WORKERS", os.cpu_count() or 1))
+BIMFLOW_GEOMETRY_CACHE_DIR = Path(
+    os.getenv("BIMFLOW_GEOMETRY_CACHE_DIR", BASE_DIR / "cache" / "geometry")
+)
+BIMFLOW_GEOMETRY_CACHE_MAX_MB = int(os.getenv("BIMFLOW_GEOMETRY_CACHE_MAX_MB", 20480))
+BIMFLOW_COMPLIANCE_CACHE_MAX_ENTRIES = int(
+    os.getenv("BIMFLOW_COMPLIANCE_CACHE_MAX_ENTRIES", 1000)
+)
+BIMFLOW_BATCH_CONCURRENCY = int(os.getenv("BIMFLOW_BATCH_CONCURRENCY", 8))
+BIMFLOW_CLASH_CHUNK_SIZE = int(os.getenv("BIMFLOW_CLASH_CHUNK_SIZE", 5000))
+BIMFLOW_CLASH_FAN_OUT = int(os.getenv("BIMFLOW_CLASH_FAN_OUT", 16))
+BIMFLOW_CLASH_GROUP_RADIUS = float(os.getenv("BIMFLOW_CLASH_GROUP_RADIUS", 0.5))
+BIMFLOW_CLASH_SWEEP_MAX_TOLERANCE = float(
+    os.getenv("BIMFLOW_CLASH_SWEEP_MAX_TOLERANCE", 0.2)
+)
+BIMFLOW_CLASH_SWEEP_TOLERANCE_LIMIT = float(
+    os.getenv("BIMFLOW_CLASH_SWEEP_TOLERANCE_LIMIT", 1.0)
+)
+BIMFLOW_GENERATION_CACHE_MAX_MB = int(
+    os.getenv("BIMFLOW_GENERATION_CACHE_MAX_MB", 10240)
+)
 BIMFLOW_HUGGINGFACE_MODEL = "microsoft/DialoGPT-medium"
 
 # Security
@@ -23,6 +23,7 @@ class TaskProgressConsumer(AsyncWebsocketConsumer):
             'type': 'task_update',
             'status': event['status'],
             'progress': event['progress'],
+            'phase': event.get('phase'),
         }))
 
 # Broadcast from Celery (in tasks.py)
@@ -3,5 +3,5 @@ from django.urls import re_path
 from . import consumers  # Task progress consumer
 
 websocket_urlpatterns = [
-    re_path(r'ws/task/(?P<task_id>\w+)/$', consumers.TaskProgressConsumer.as_asgi()),
+    re_path(r'ws/task/(?P<task_id>[\w-]+)/$', consumers.TaskProgressConsumer.as_asgi()),
 ]
\ No newline at end of file
@@ -209,7 +209,7 @@ echo -e "   npm run dev\n"
 echo -e "${YELLOW}3. Celery Worker (for async tasks):${NC}"
 echo -e "   cd bimflowsuite"
 echo -e "   source .venv/bin/activate"
-echo -e "   celery -A bimflowsuite worker -l info\n"
+echo -e "   celery -A config worker -l info\n"
 
 echo -e "${YELLOW}4. Redis Server (for cache/queue):${NC}"
 echo -e "   redis-server\n"